@@ -0,0 +1,102 @@
+"""initial schema
+
+Baseline matching the tables Base.metadata.create_all() built before
+migrations were introduced. Databases created that way are brought
+under Alembic with `alembic stamp 0001` and then upgraded as usual.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 04:39:48.409627
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('first_name', sa.String(), nullable=False),
+        sa.Column('last_name', sa.String(), nullable=False),
+        sa.Column('graduation_year', sa.Integer(), nullable=True),
+        sa.Column('major', sa.String(), nullable=True),
+        sa.Column('profile_image_url', sa.String(), nullable=True),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('job_title', sa.String(), nullable=True),
+        sa.Column('company', sa.String(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column('is_admin', sa.Boolean(), nullable=True),
+        sa.Column('reset_token', sa.String(), nullable=True),
+        sa.Column('reset_token_expiry', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table(
+        'events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('event_date', sa.DateTime(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('is_members_only', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_events_id', 'events', ['id'], unique=False)
+
+    op.create_table(
+        'registrations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('event_id', sa.Integer(), nullable=True),
+        sa.Column('payment_status', sa.String(), nullable=False),
+        sa.Column('payment_intent_id', sa.String(), nullable=True),
+        sa.Column('amount_paid', sa.Float(), nullable=False),
+        sa.Column('registered_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('attended', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_registrations_id', 'registrations', ['id'], unique=False)
+
+    op.create_table(
+        'memberships',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('membership_type', sa.String(), nullable=False),
+        sa.Column('payment_id', sa.String(), nullable=True),
+        sa.Column('amount_paid', sa.Float(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_memberships_id', 'memberships', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('memberships')
+    op.drop_table('registrations')
+    op.drop_table('events')
+    op.drop_table('users')
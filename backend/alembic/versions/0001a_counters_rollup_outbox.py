@@ -0,0 +1,118 @@
+"""counters, membership rollup and webhook outbox
+
+Schema added on top of the pre-migration baseline: users.token_version,
+events.registered_count, the membership_daily_stats rollup, the
+webhook_events outbox and, on Postgres, the directory search indexes.
+registered_count and the rollup are backfilled from the existing rows.
+
+Databases upgraded while 0001 still created these objects already have
+them; anything present is left as it is and not backfilled again.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-17 09:12:40.275311
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001a'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Directory search indexes (Postgres only), as in app.services.search_service
+SEARCH_FIELDS = ('first_name', 'last_name', 'major', 'company', 'location')
+SEARCH_INDEX_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    *(
+        f'CREATE INDEX IF NOT EXISTS ix_users_{field}_trgm ON users USING gin ({field} gin_trgm_ops)'
+        for field in SEARCH_FIELDS
+    ),
+    "CREATE INDEX IF NOT EXISTS ix_users_search_document ON users USING gin ("
+    "to_tsvector('simple'::regconfig, "
+    + " || ' ' || ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+    + '))',
+]
+
+# As event_service.reconcile_registration_counts
+BACKFILL_REGISTERED_COUNT = (
+    'UPDATE events SET registered_count = ('
+    'SELECT count(*) FROM registrations WHERE registrations.event_id = events.id)'
+)
+
+# As membership_service.rebuild_membership_stats
+BACKFILL_MEMBERSHIP_STATS = (
+    'INSERT INTO membership_daily_stats (day, membership_type, new_count, revenue, ending_count) '
+    'SELECT day, membership_type, sum(new_count), sum(revenue), sum(ending_count) FROM ('
+    'SELECT start_date AS day, membership_type, count(id) AS new_count, '
+    'coalesce(sum(amount_paid), 0) AS revenue, 0 AS ending_count '
+    'FROM memberships GROUP BY start_date, membership_type '
+    'UNION ALL '
+    'SELECT end_date, membership_type, 0, 0, count(id) '
+    'FROM memberships WHERE is_active = TRUE GROUP BY end_date, membership_type'
+    ') AS parts GROUP BY day, membership_type'
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+
+    if 'token_version' not in {c['name'] for c in inspector.get_columns('users')}:
+        op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+    if bind.dialect.name == 'postgresql':
+        for statement in SEARCH_INDEX_DDL:
+            op.execute(statement)
+
+    if 'registered_count' not in {c['name'] for c in inspector.get_columns('events')}:
+        op.add_column('events', sa.Column('registered_count', sa.Integer(), server_default='0', nullable=False))
+        op.execute(BACKFILL_REGISTERED_COUNT)
+
+    if 'membership_daily_stats' not in tables:
+        op.create_table(
+            'membership_daily_stats',
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('membership_type', sa.String(), nullable=False),
+            sa.Column('new_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('revenue', sa.Float(), server_default='0', nullable=False),
+            sa.Column('ending_count', sa.Integer(), server_default='0', nullable=False),
+            sa.PrimaryKeyConstraint('day', 'membership_type'),
+        )
+        op.execute(BACKFILL_MEMBERSHIP_STATS)
+
+    if 'webhook_events' not in tables:
+        op.create_table(
+            'webhook_events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('stripe_event_id', sa.String(), nullable=False),
+            sa.Column('event_type', sa.String(), nullable=False),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(), server_default='pending', nullable=False),
+            sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('claim_token', sa.String(), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('stripe_event_id'),
+        )
+        op.create_index('ix_webhook_events_claim_token', 'webhook_events', ['claim_token'], unique=False)
+        op.create_index('ix_webhook_events_id', 'webhook_events', ['id'], unique=False)
+        op.create_index('ix_webhook_events_status', 'webhook_events', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('webhook_events')
+    op.drop_table('membership_daily_stats')
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('registered_count')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_users_search_document')
+        for field in reversed(SEARCH_FIELDS):
+            op.execute(f'DROP INDEX IF EXISTS ix_users_{field}_trgm')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,58 @@
+"""hot query indexes
+
+Composite indexes for the hot filters and a unique (event_id, user_id)
+on registrations, so the duplicate-registration check is an index
+lookup and concurrent signups cannot double-register.
+
+Duplicate registrations left by earlier races are removed first,
+keeping the oldest, and events.registered_count is recomputed.
+
+On Postgres the plain indexes are built CONCURRENTLY, outside the
+migration transaction, so the tables stay writable while they build.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-17 05:02:11.118402
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001a'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_registrations_user_id', 'registrations', ['user_id']),
+    ('ix_memberships_user_active_end', 'memberships', ['user_id', 'is_active', 'end_date']),
+    ('ix_events_members_only_date', 'events', ['is_members_only', 'event_date', 'id']),
+    ('ix_events_date_id', 'events', ['event_date', 'id']),
+]
+
+
+def upgrade() -> None:
+    op.execute(
+        'DELETE FROM registrations WHERE id NOT IN ('
+        'SELECT min(id) FROM registrations GROUP BY event_id, user_id)'
+    )
+    op.execute(
+        'UPDATE events SET registered_count = ('
+        'SELECT count(*) FROM registrations WHERE registrations.event_id = events.id)'
+    )
+    op.create_index('uq_registrations_event_user', 'registrations', ['event_id', 'user_id'], unique=True)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_index('uq_registrations_event_user', table_name='registrations')
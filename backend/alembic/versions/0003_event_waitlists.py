@@ -0,0 +1,55 @@
+"""event waitlists
+
+waitlist_entries holds users' places in line for full events, and
+events gains the counters the waitlist service maintains: positions
+handed out, the highest position offered a seat, and cancelled seats
+held for the waitlist.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 06:41:27.530118
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+EVENT_COUNTERS = ('waitlist_issued', 'waitlist_offered_through', 'seats_held')
+
+
+def upgrade() -> None:
+    for name in EVENT_COUNTERS:
+        op.add_column('events', sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table(
+        'waitlist_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), server_default='waiting', nullable=False),
+        sa.Column('offer_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_waitlist_entries_id', 'waitlist_entries', ['id'], unique=False)
+    op.create_index('uq_waitlist_entries_event_user', 'waitlist_entries', ['event_id', 'user_id'], unique=True)
+    op.create_index(
+        'ix_waitlist_entries_event_status_position', 'waitlist_entries', ['event_id', 'status', 'position'],
+    )
+    op.create_index('ix_waitlist_entries_status_expires', 'waitlist_entries', ['status', 'offer_expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('waitlist_entries')
+    with op.batch_alter_table('events') as batch_op:
+        for name in reversed(EVENT_COUNTERS):
+            batch_op.drop_column(name)
@@ -1,25 +1,125 @@
 # File: app/api/auth.py
-from datetime import timedelta
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from jose import jwt, JWTError
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import models, schemas
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, get_password_hash
-from app.database import get_db
+from app.core.principal import Principal, is_token_version_current, note_token_version
+from app.core.hashing import get_password_hash_async, verify_password_async
+from app.core.security import create_access_token
+from app.database import get_request_db, run_db
+from app.services import search_service
+from app.services.membership_service import get_active_membership_end, principal_has_membership
 from app.schemas.token import Token, TokenPayload
 from app.schemas.user import UserCreate, User
 router = APIRouter(prefix="/auth")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def decode_access_token(token: str) -> schemas.TokenPayload:
+    """
+    Decode and validate an access token
+    
+    Args:
+        token: JWT token from the Authorization header
+        
+    Returns:
+        The token payload
+        
+    Raises:
+        HTTPException: If the token is invalid or has no subject
+    """
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+        token_data = schemas.TokenPayload(**payload)
+    except (JWTError, ValidationError):
+        raise _credentials_exception()
+    if token_data.sub is None:
+        raise _credentials_exception()
+    return token_data
+
+def _load_user(db: Session, token_data: schemas.TokenPayload) -> models.User:
+    user = db.query(models.User).filter(models.User.id == token_data.sub).first()
+    if user is None:
+        raise _credentials_exception()
+    
+    # Reject tokens issued before the user's last version bump
+    if token_data.ver is not None and token_data.ver != user.token_version:
+        raise _credentials_exception()
+    note_token_version(user.id, user.token_version or 0)
+    return user
+
+def _get_user_by_email(db: Session, email: str) -> models.User:
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def _create_user(db: Session, user_in: schemas.UserCreate, hashed_password: str) -> models.User:
+    db_user = models.User(
+        email=user_in.email,
+        hashed_password=hashed_password,
+        first_name=user_in.first_name,
+        last_name=user_in.last_name,
+        graduation_year=user_in.graduation_year,
+        major=user_in.major,
+        profile_image_url=user_in.profile_image_url,
+        bio=user_in.bio,
+        job_title=user_in.job_title,
+        company=user_in.company,
+        location=user_in.location,
+        is_admin=False,
+    )
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+def create_user_access_token(db: Session, user: models.User) -> Dict[str, str]:
+    """
+    Issue an access token carrying the claims needed for stateless auth
+    
+    Args:
+        db: Database session
+        user: The user to issue the token for
+        
+    Returns:
+        Token response body
+    """
+    membership_end = None if user.is_admin else get_active_membership_end(db, user.id)
+    claims = {
+        "adm": bool(user.is_admin),
+        "ver": user.token_version or 0,
+        "mexp": membership_end.isoformat() if membership_end else None,
+    }
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        subject=user.id, expires_delta=access_token_expires, claims=claims
+    )
+    
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+    }
 
 # Dependency to get current user from token
 async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: Session = Depends(get_request_db), token: str = Depends(oauth2_scheme)
 ) -> models.User:
     """
     Dependency that returns the current authenticated user
@@ -34,25 +134,72 @@ async def get_current_user(
     Raises:
         HTTPException: If authentication fails
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    user = await run_db(db, _load_user, decode_access_token(token))
+    if isinstance(db, AsyncSession):
+        # Handlers that still use get_db add the user to their own session
+        db.expunge(user)
+    return user
+
+# Dependency to get the current principal, skipping the user lookup when possible
+async def get_current_principal(
+    db: Session = Depends(get_request_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    Dependency that returns a lightweight principal for the current user
+    
+    With STATELESS_AUTH enabled, tokens carrying the adm/ver claims are
+    trusted without a database query. Older tokens, or the setting being
+    off, fall back to loading the user.
+    
+    Args:
+        db: Database session
+        token: JWT token from the Authorization header
+        
+    Returns:
+        The current principal
+        
+    Raises:
+        HTTPException: If authentication fails or the token was revoked
+    """
+    token_data = decode_access_token(token)
+    
+    if settings.STATELESS_AUTH and token_data.adm is not None and token_data.ver is not None:
+        # The published version may live in redis; look it up off the event loop
+        if not await run_in_threadpool(is_token_version_current, token_data.sub, token_data.ver):
+            raise _credentials_exception()
+        return Principal(
+            id=token_data.sub,
+            is_admin=token_data.adm,
+            token_version=token_data.ver,
+            membership_expires=token_data.mexp,
+            issued_at=(
+                datetime.fromtimestamp(token_data.iat, tz=timezone.utc)
+                if token_data.iat is not None else None
+            ),
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    
+    return Principal.from_user(await run_db(db, _load_user, token_data))
+
+# Dependency for endpoints that also serve anonymous visitors
+async def get_optional_principal(
+    db: Session = Depends(get_request_db), token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> Optional[Principal]:
+    """
+    Dependency that returns the current principal, or None without a token
+    
+    Args:
+        db: Database session
+        token: JWT token from the Authorization header, if any
         
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    Returns:
+        The current principal, or None for anonymous requests
+        
+    Raises:
+        HTTPException: If a token is sent but is invalid or revoked
+    """
+    if token is None:
+        return None
+    return await get_current_principal(db, token)
 
 # Dependency to verify user has admin role
 def get_current_admin(
@@ -79,18 +226,18 @@ def get_current_admin(
 
 # Dependency to check if user has membership
 async def check_membership(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    db: Session = Depends(get_request_db),
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     """
     Dependency that ensures the current user has an active membership
     
     Args:
         db: Database session
-        current_user: The current authenticated user
+        current_user: The current authenticated principal
         
     Returns:
-        The current authenticated user with membership
+        The current authenticated principal with membership
         
     Raises:
         HTTPException: If the user doesn't have an active membership
@@ -100,17 +247,7 @@ async def check_membership(
         return current_user
         
     # Check for active membership
-    membership = (
-        db.query(models.Membership)
-        .filter(
-            models.Membership.user_id == current_user.id,
-            models.Membership.is_active == True,
-            models.Membership.end_date >= func.current_date()
-        )
-        .first()
-    )
-    
-    if not membership:
+    if not await run_db(db, principal_has_membership, current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Active membership required for this resource",
@@ -119,16 +256,16 @@ async def check_membership(
     return current_user
 
 @router.post("/register", response_model=schemas.Token, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_request_db),
     user_in: schemas.UserCreate,
 ) -> Any:
     """
     Register a new user
     """
     # Check if user with this email already exists
-    user = db.query(models.User).filter(models.User.email == user_in.email).first()
+    user = await run_db(db, _get_user_by_email, user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -136,86 +273,47 @@ def register(
         )
         
     # Create new user
-    hashed_password = get_password_hash(user_in.password)
-    db_user = models.User(
-        email=user_in.email,
-        hashed_password=hashed_password,
-        first_name=user_in.first_name,
-        last_name=user_in.last_name,
-        graduation_year=user_in.graduation_year,
-        major=user_in.major,
-        profile_image_url=user_in.profile_image_url,
-        bio=user_in.bio,
-        job_title=user_in.job_title,
-        company=user_in.company,
-        location=user_in.location,
-        is_admin=False,
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    hashed_password = await get_password_hash_async(user_in.password)
+    db_user = await run_db(db, _create_user, user_in, hashed_password)
+    await run_in_threadpool(search_service.index_user, db_user)
     
     # Generate access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=db_user.id, expires_delta=access_token_expires
-    )
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-    }
+    return await run_db(db, create_user_access_token, db_user)
 
 @router.post("/login", response_model=schemas.Token)
-def login(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login(
+    db: Session = Depends(get_request_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_db(db, _get_user_by_email, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
-    )
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-    }
+    return await run_db(db, create_user_access_token, user)
 
 @router.post("/login/direct", response_model=schemas.Token)
-def login_direct(
+async def login_direct(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_request_db),
     login_in: schemas.Login,
 ) -> Any:
     """
     Direct login with email/password, get an access token for future requests
     """
-    user = db.query(models.User).filter(models.User.email == login_in.email).first()
-    if not user or not verify_password(login_in.password, user.hashed_password):
+    user = await run_db(db, _get_user_by_email, login_in.email)
+    if not user or not await verify_password_async(login_in.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
         
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
-    )
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-    }
+    return await run_db(db, create_user_access_token, user)
 
 @router.get("/me", response_model=schemas.User)
 def read_users_me(current_user: models.User = Depends(get_current_user)) -> Any:
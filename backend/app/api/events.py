@@ -1,63 +1,106 @@
 # File: app/api/events.py
+from datetime import datetime, timezone
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from app import models, schemas
 from app.database import get_db
-from app.api.auth import get_current_user, get_current_admin, check_membership
+from app.api.auth import get_current_admin, get_current_principal, get_optional_principal
+from app.core.cache import conditional_response, get_cached_document, make_etag, set_cached_document
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_paginate
+from app.core.principal import Principal
+from app.services.event_service import (
+    dump_events,
+    event_cache_key,
+    event_rows,
+    invalidate_event_cache,
+    personalize_event_body,
+)
+from app.services.membership_service import principal_has_membership
+from app.services.waiting_room_service import QUEUE_TOKEN_HEADER, RoomConfig, waiting_room
+from app.services.waitlist_service import join_waitlist, leave_waitlist, waitlist_status
 
 router = APIRouter()
 
+def _event_response(
+    request: Request,
+    db: Session,
+    current_user: Optional[Principal],
+    body: bytes,
+    etag: str,
+    headers: Optional[dict] = None,
+) -> Response:
+    """
+    Serve a cached event body, personalized for authenticated users.
+    
+    Anonymous responses are identical for everyone and may be stored by
+    shared caches; personalized ones are private and always revalidated.
+    """
+    if current_user is None:
+        return conditional_response(
+            request,
+            body,
+            etag=etag,
+            cache_control=f"public, max-age={settings.EVENT_CACHE_MAX_AGE_SECONDS}",
+            headers=headers,
+        )
+    return conditional_response(
+        request,
+        personalize_event_body(db, body, current_user.id),
+        cache_control="private, no-cache",
+        headers=headers,
+    )
+
 @router.get("/", response_model=List[schemas.Event])
 def read_events(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: Optional[models.User] = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    current_user: Optional[Principal] = Depends(get_optional_principal),
 ) -> Any:
     """
-    Retrieve events.
+    Retrieve events, ordered by date.
+    
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    Responses carry an ETag; send it back in If-None-Match to get a 304.
     """
-    # Base query for all events
-    query = db.query(models.Event)
+    # Admins and members see members-only events, everyone else only public ones
+    show_members_only = current_user is not None and (
+        current_user.is_admin or principal_has_membership(db, current_user)
+    )
+    audience = "members" if show_members_only else "public"
     
-    # For unauthenticated users, show only public events
-    if current_user is None:
-        query = query.filter(models.Event.is_members_only == False)
-    # For regular users without membership, also show only public events
-    elif not current_user.is_admin:
-        # Check if user has active membership
-        membership = db.query(models.Membership).filter(
-            models.Membership.user_id == current_user.id,
-            models.Membership.is_active == True,
-            models.Membership.end_date >= func.current_date()
-        ).first()
-        
-        if not membership:
+    # Pages are cached per audience and query, without per-user fields
+    key = event_cache_key("list", audience, skip, limit, cursor or "")
+    cached = get_cached_document(key)
+    if cached is None:
+        query = event_rows.query(db)
+        if not show_members_only:
             query = query.filter(models.Event.is_members_only == False)
+        
+        # Apply pagination
+        events = keyset_paginate(
+            query,
+            [models.Event.event_date, models.Event.id],
+            key="events",
+            response=response,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+        )
+        body = dump_events(events)
+        meta = {"etag": make_etag(body), "next_cursor": response.headers.get(NEXT_CURSOR_HEADER)}
+        set_cached_document(key, meta, body, ttl=settings.EVENT_CACHE_TTL_SECONDS)
+    else:
+        meta, body = cached
     
-    # Apply pagination
-    events = query.offset(skip).limit(limit).all()
-    
-    # Add additional information for authenticated users
-    if current_user:
-        for event in events:
-            # Get registration count
-            event.registered_count = db.query(models.Registration).filter(
-                models.Registration.event_id == event.id
-            ).count()
-            
-            # Check if current user is registered
-            registration = db.query(models.Registration).filter(
-                models.Registration.event_id == event.id,
-                models.Registration.user_id == current_user.id
-            ).first()
-            
-            event.is_registered = registration is not None
-    
-    return events
+    headers = {NEXT_CURSOR_HEADER: meta["next_cursor"]} if meta["next_cursor"] else None
+    return _event_response(request, db, current_user, body, meta["etag"], headers)
 
 @router.post("/", response_model=schemas.Event, status_code=status.HTTP_201_CREATED)
 def create_event(
@@ -81,28 +124,38 @@ def create_event(
     )
     db.add(event)
     db.commit()
+    invalidate_event_cache()
     db.refresh(event)
     return event
 
 @router.get("/{event_id}", response_model=schemas.Event)
 def read_event(
     *,
+    request: Request,
     db: Session = Depends(get_db),
     event_id: int,
-    current_user: Optional[models.User] = Depends(get_current_user),
+    current_user: Optional[Principal] = Depends(get_optional_principal),
 ) -> Any:
     """
     Get event by ID.
     """
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
+    key = event_cache_key("detail", event_id)
+    cached = get_cached_document(key)
+    if cached is None:
+        event = db.query(models.Event).filter(models.Event.id == event_id).first()
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found",
+            )
+        body = dump_events(event)
+        meta = {"etag": make_etag(body), "is_members_only": bool(event.is_members_only)}
+        set_cached_document(key, meta, body, ttl=settings.EVENT_CACHE_TTL_SECONDS)
+    else:
+        meta, body = cached
     
     # Check access for members-only events
-    if event.is_members_only:
+    if meta["is_members_only"]:
         if not current_user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -111,34 +164,13 @@ def read_event(
         
         # If not admin, check membership
         if not current_user.is_admin:
-            membership = db.query(models.Membership).filter(
-                models.Membership.user_id == current_user.id,
-                models.Membership.is_active == True,
-                models.Membership.end_date >= func.current_date()
-            ).first()
-            
-            if not membership:
+            if not principal_has_membership(db, current_user):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Membership required for this event",
                 )
     
-    # Add additional information for authenticated users
-    if current_user:
-        # Get registration count
-        event.registered_count = db.query(models.Registration).filter(
-            models.Registration.event_id == event.id
-        ).count()
-        
-        # Check if current user is registered
-        registration = db.query(models.Registration).filter(
-            models.Registration.event_id == event.id,
-            models.Registration.user_id == current_user.id
-        ).first()
-        
-        event.is_registered = registration is not None
-    
-    return event
+    return _event_response(request, db, current_user, body, meta["etag"])
 
 @router.put("/{event_id}", response_model=schemas.Event)
 def update_event(
@@ -165,6 +197,7 @@ def update_event(
     
     db.add(event)
     db.commit()
+    invalidate_event_cache()
     db.refresh(event)
     return event
 
@@ -187,3 +220,213 @@ def delete_event(
     
     db.delete(event)
     db.commit()
+    invalidate_event_cache()
+
+def _waiting_room_body(event_id: int, config: RoomConfig) -> dict:
+    return {
+        "event_id": event_id,
+        "admit_per_second": config.admit_per_second,
+        "burst": config.burst,
+        "opened_at": datetime.fromtimestamp(config.opened_at, tz=timezone.utc),
+        "issued": waiting_room.issued(event_id),
+        "admitted": config.admitted_count(waiting_room.clock()),
+    }
+
+@router.put("/{event_id}/waiting-room", response_model=schemas.WaitingRoom)
+def open_waiting_room(
+    *,
+    db: Session = Depends(get_db),
+    event_id: int,
+    room_in: schemas.WaitingRoomOpen,
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Open a waiting room for an event, or change its admission rate (admin only).
+    
+    While it is open, payment intents and registrations for the event
+    require an admitted X-Queue-Token from the join endpoint.
+    """
+    event = db.query(models.Event.id).filter(models.Event.id == event_id).first()
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found",
+        )
+    
+    config = waiting_room.open(event_id, room_in.admit_per_second, room_in.burst)
+    return _waiting_room_body(event_id, config)
+
+@router.get("/{event_id}/waiting-room", response_model=schemas.WaitingRoom)
+def read_waiting_room(
+    *,
+    event_id: int,
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Get waiting room settings and progress (admin only).
+    """
+    config = waiting_room.config(event_id)
+    if config is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No waiting room is open for this event",
+        )
+    return _waiting_room_body(event_id, config)
+
+@router.delete("/{event_id}/waiting-room", status_code=status.HTTP_204_NO_CONTENT)
+def close_waiting_room(
+    *,
+    event_id: int,
+    current_admin: models.User = Depends(get_current_admin),
+) -> None:
+    """
+    Close an event's waiting room, letting everyone through (admin only).
+    """
+    waiting_room.close(event_id)
+
+@router.post("/{event_id}/waiting-room/join", response_model=schemas.QueueTicket)
+def join_waiting_room(
+    *,
+    event_id: int,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    queue_token: Optional[str] = Header(None, alias=QUEUE_TOKEN_HEADER),
+) -> Any:
+    """
+    Take a place in an event's waiting room.
+    
+    Send the returned token as X-Queue-Token to the status endpoint and,
+    once admitted, to /payments/create-intent and /registrations/.
+    Sending a current token back keeps its position.
+    """
+    token, queue_status = waiting_room.join(event_id, current_user.id, queue_token)
+    if not queue_status.admitted:
+        response.headers["Retry-After"] = str(queue_status.retry_after)
+    return {**queue_status.as_dict(), "token": token}
+
+# Polled by every queued user: async and free of database access, so
+# launch spikes cost a signature check per poll
+@router.get("/{event_id}/waiting-room/status", response_model=schemas.QueueStatus)
+async def read_queue_status(
+    *,
+    event_id: int,
+    response: Response,
+    queue_token: Optional[str] = Header(None, alias=QUEUE_TOKEN_HEADER),
+) -> Any:
+    """
+    Get the caller's place in an event's waiting room.
+    
+    Poll again after Retry-After seconds until `admitted` is true.
+    """
+    queue_status = waiting_room.status(event_id, queue_token)
+    if not queue_status.admitted:
+        response.headers["Retry-After"] = str(queue_status.retry_after)
+    return queue_status.as_dict()
+
+@router.post("/{event_id}/waitlist", response_model=schemas.WaitlistStatus)
+def join_event_waitlist(
+    *,
+    db: Session = Depends(get_db),
+    event_id: int,
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Join the waitlist of a full event.
+    
+    When a registration is cancelled the seat is held for the next
+    position and offered for WAITLIST_HOLD_SECONDS; register as usual
+    while the offer stands to take it.
+    """
+    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found",
+        )
+    
+    if event.is_members_only and not current_user.is_admin and not principal_has_membership(db, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Membership required for this event",
+        )
+    
+    registered = db.query(models.Registration.id).filter(
+        models.Registration.event_id == event_id,
+        models.Registration.user_id == current_user.id,
+    ).first()
+    if registered:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already registered for this event",
+        )
+    
+    return join_waitlist(db, event, current_user.id)
+
+@router.get("/{event_id}/waitlist/me", response_model=schemas.WaitlistStatus)
+def read_my_waitlist_status(
+    *,
+    db: Session = Depends(get_db),
+    event_id: int,
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Get the current user's waitlist position and offer status in one lookup.
+    
+    `status` becomes `offered` when a seat is held for the user, until
+    `offer_expires_at`.
+    """
+    waitlist = waitlist_status(db, event_id, current_user.id)
+    if waitlist is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not on the waitlist for this event",
+        )
+    return waitlist
+
+@router.delete("/{event_id}/waitlist/me", status_code=status.HTTP_204_NO_CONTENT)
+def leave_event_waitlist(
+    *,
+    db: Session = Depends(get_db),
+    event_id: int,
+    current_user: Principal = Depends(get_current_principal),
+) -> None:
+    """
+    Leave an event's waitlist, passing on a seat offered to you.
+    """
+    if not leave_waitlist(db, event_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not on the waitlist for this event",
+        )
+
+@router.get("/{event_id}/waitlist", response_model=List[schemas.WaitlistEntry])
+def read_event_waitlist(
+    *,
+    response: Response,
+    db: Session = Depends(get_db),
+    event_id: int,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Get an event's waitlist in position order (admin only).
+    
+    Filter with `status` (waiting, offered, claimed, expired). Pass the
+    X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    query = db.query(models.WaitlistEntry).filter(models.WaitlistEntry.event_id == event_id)
+    if status_filter is not None:
+        query = query.filter(models.WaitlistEntry.status == status_filter)
+    
+    return keyset_paginate(
+        query,
+        [models.WaitlistEntry.position],
+        key="waitlist",
+        response=response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
@@ -1,13 +1,24 @@
 # File: app/api/memberships.py
-from typing import Any, Dict, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 
 from app import models, schemas
 from app.database import get_db
-from app.api.auth import get_current_user, get_current_admin
+from app.api.auth import get_current_user, get_current_admin, get_current_principal
+from app.core.pagination import keyset_paginate
+from app.core.principal import Principal
+from app.services.export_service import export_response
+from app.services.membership_service import (
+    get_membership_stats as compute_membership_stats,
+    has_active_membership,
+    invalidate_membership,
+    membership_cache,
+    record_membership_cancelled,
+    record_membership_created,
+)
 
 router = APIRouter()
 
@@ -22,13 +33,7 @@ def create_membership(
     Create a new membership
     """
     # Check if user already has active membership
-    existing_membership = db.query(models.Membership).filter(
-        models.Membership.user_id == current_user.id,
-        models.Membership.end_date >= func.current_date(),
-        models.Membership.is_active == True
-    ).first()
-    
-    if existing_membership:
+    if has_active_membership(db, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You already have an active membership",
@@ -63,7 +68,9 @@ def create_membership(
     )
     
     db.add(membership)
+    record_membership_created(db, membership)
     db.commit()
+    invalidate_membership(current_user.id)
     db.refresh(membership)
     
     return membership
@@ -71,7 +78,7 @@ def create_membership(
 @router.get("/my-membership", response_model=Dict[str, Any])
 def read_user_membership(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get current user's active membership
@@ -119,25 +126,53 @@ def cancel_membership(
         )
     
     # Cancel membership
+    record_membership_cancelled(db, membership)
     membership.is_active = False
     db.add(membership)
     db.commit()
+    invalidate_membership(membership.user_id)
     db.refresh(membership)
     
     return membership
 
 @router.get("/", response_model=List[schemas.Membership])
 def read_memberships(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_admin: models.User = Depends(get_current_admin),
 ) -> Any:
     """
     Get all memberships (admin only)
+    
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
-    memberships = db.query(models.Membership).offset(skip).limit(limit).all()
-    return memberships
+    return keyset_paginate(
+        db.query(models.Membership),
+        [models.Membership.id],
+        key="memberships",
+        response=response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+@router.get("/export")
+def export_memberships(
+    active_only: bool = False,
+    format: str = "csv",
+    gzip: bool = False,
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Stream memberships, with user email, as CSV or NDJSON (admin only)
+    
+    Pass `active_only=true` for current memberships and `gzip=true` for a
+    compressed download.
+    """
+    return export_response("memberships", format, gzip, active_only=active_only)
 
 @router.get("/stats", response_model=Dict[str, Any])
 def get_membership_stats(
@@ -146,44 +181,16 @@ def get_membership_stats(
 ) -> Any:
     """
     Get membership statistics (admin only)
-    """
-    # Active memberships by type
-    type_stats = db.query(
-        models.Membership.membership_type,
-        func.count(models.Membership.id).label("count")
-    ).filter(
-        models.Membership.end_date >= func.current_date(),
-        models.Membership.is_active == True
-    ).group_by(models.Membership.membership_type).all()
     
-    # Total active memberships
-    active_count = db.query(models.Membership).filter(
-        models.Membership.end_date >= func.current_date(),
-        models.Membership.is_active == True
-    ).count()
-    
-    # New memberships in last 30 days
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    new_count = db.query(models.Membership).filter(
-        models.Membership.created_at >= thirty_days_ago
-    ).count()
-    
-    # Expiring memberships in next 30 days
-    thirty_days_from_now = date.today() + timedelta(days=30)
-    expiring_count = db.query(models.Membership).filter(
-        models.Membership.end_date <= thirty_days_from_now,
-        models.Membership.end_date >= func.current_date(),
-        models.Membership.is_active == True
-    ).count()
-    
-    # Total revenue
-    revenue_result = db.query(func.sum(models.Membership.amount_paid)).scalar()
-    total_revenue = float(revenue_result) if revenue_result else 0
-    
-    return {
-        "by_type": [{"type": t, "count": c} for t, c in type_stats],
-        "active_memberships": active_count,
-        "new_memberships": new_count,
-        "expiring_memberships": expiring_count,
-        "total_revenue": total_revenue
-    }
+    Served from the daily rollup table in a single query.
+    """
+    return compute_membership_stats(db)
+
+@router.get("/cache-stats", response_model=Dict[str, Any])
+def get_membership_cache_stats(
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Get membership status cache hit/miss counters (admin only)
+    """
+    return membership_cache.stats()
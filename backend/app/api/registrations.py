@@ -1,12 +1,20 @@
 # File: app/api/registrations.py
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.exc import IntegrityError
 
 from app import models, schemas
 from app.database import get_db
-from app.api.auth import get_current_user, get_current_admin
+from app.api.auth import get_current_user, get_current_admin, get_current_principal
+from app.core.pagination import keyset_paginate
+from app.core.principal import Principal
+from app.services.event_service import invalidate_event_cache, user_events
+from app.services.export_service import export_response
+from app.services.membership_service import has_active_membership
+from app.services.waiting_room_service import QUEUE_TOKEN_HEADER, waiting_room
+from app.services.waitlist_service import free_seat, take_seat, waitlist_worker
 
 router = APIRouter()
 
@@ -16,10 +24,18 @@ def create_registration(
     db: Session = Depends(get_db),
     registration_in: schemas.RegistrationCreate,
     current_user: models.User = Depends(get_current_user),
+    queue_token: Optional[str] = Header(None, alias=QUEUE_TOKEN_HEADER),
 ) -> Any:
     """
     Create a new registration after payment
+    
+    Events with an open waiting room need an admitted X-Queue-Token.
+    Users offered a seat from the waitlist register into the held seat.
     """
+    # Turn queued users away before any further queries
+    if not current_user.is_admin:
+        waiting_room.check_admission(registration_in.event_id, current_user.id, queue_token)
+    
     # Check if event exists
     event = db.query(models.Event).filter(models.Event.id == registration_in.event_id).first()
     if not event:
@@ -31,13 +47,7 @@ def create_registration(
     # Check if members-only event
     if event.is_members_only:
         # Check membership
-        membership = db.query(models.Membership).filter(
-            models.Membership.user_id == current_user.id,
-            models.Membership.is_active == True,
-            models.Membership.end_date >= func.current_date()
-        ).first()
-        
-        if not membership and not current_user.is_admin:
+        if not current_user.is_admin and not has_active_membership(db, current_user.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Membership required for this event",
@@ -55,17 +65,13 @@ def create_registration(
             detail="Already registered for this event",
         )
     
-    # Check event capacity
-    if event.capacity:
-        registration_count = db.query(models.Registration).filter(
-            models.Registration.event_id == event.id
-        ).count()
-        
-        if registration_count >= event.capacity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Event is at capacity",
-            )
+    # Claim a seat offered from the waitlist, or reserve one (atomic capacity check)
+    if not take_seat(db, event.id, current_user.id):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Event is at capacity",
+        )
     
     # Create registration
     registration = models.Registration(
@@ -77,7 +83,16 @@ def create_registration(
     )
     
     db.add(registration)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request registered first (unique event_id, user_id)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already registered for this event",
+        )
+    invalidate_event_cache()
     db.refresh(registration)
     
     return registration
@@ -85,25 +100,83 @@ def create_registration(
 @router.get("/my-events", response_model=List[schemas.Event])
 def read_user_registrations(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> Any:
     """
     Get current user's registered events
     """
-    # Get user's registrations with events
-    registrations = db.query(models.Registration).filter(
+    # Events joined to the user's registrations in one query
+    return user_events(db, current_user.id)
+
+@router.get("/my-registrations", response_model=List[schemas.RegistrationWithEvent])
+def read_my_registrations(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+) -> Any:
+    """
+    Get current user's registrations with event details
+    """
+    registrations = db.query(models.Registration).options(
+        joinedload(models.Registration.event)
+    ).filter(
         models.Registration.user_id == current_user.id
-    ).all()
+    ).order_by(models.Registration.id).all()
+    
+    for registration in registrations:
+        registration.event.is_registered = True
+    
+    return registrations
+
+@router.get("/", response_model=List[schemas.RegistrationDetail])
+def read_registrations(
+    response: Response,
+    db: Session = Depends(get_db),
+    event_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Get registrations with user and event details (admin only)
     
-    # Get events for these registrations
-    event_ids = [reg.event_id for reg in registrations]
-    events = db.query(models.Event).filter(models.Event.id.in_(event_ids)).all()
+    Filter by `event_id` and/or `user_id`. Registrations, users and events
+    are fetched in a single joined query. Pass the X-Next-Cursor response
+    header back as `cursor` for the next page.
+    """
+    query = db.query(models.Registration).options(
+        joinedload(models.Registration.event),
+        joinedload(models.Registration.user),
+    )
+    if event_id is not None:
+        query = query.filter(models.Registration.event_id == event_id)
+    if user_id is not None:
+        query = query.filter(models.Registration.user_id == user_id)
     
-    # Add registration status to events
-    for event in events:
-        event.is_registered = True
+    return keyset_paginate(
+        query,
+        [models.Registration.id],
+        key="registrations",
+        response=response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+@router.get("/export")
+def export_registrations(
+    event_id: Optional[int] = None,
+    format: str = "csv",
+    gzip: bool = False,
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Stream registrations, with event title and user email, as CSV or NDJSON (admin only)
     
-    return events
+    Filter to one event with `event_id`. Pass `gzip=true` for a compressed download.
+    """
+    return export_response("registrations", format, gzip, event_id=event_id)
 
 @router.get("/event/{event_id}", response_model=List[schemas.Registration])
 def read_event_registrations(
@@ -167,6 +240,8 @@ def delete_registration(
 ) -> None:
     """
     Cancel registration
+    
+    The freed seat is offered to the next person on the event's waitlist, if any.
     """
     # Check if event exists
     event = db.query(models.Event).filter(models.Event.id == event_id).first()
@@ -177,7 +252,7 @@ def delete_registration(
         )
     
     # Check if event date is in the future
-    if event.event_date <= func.now():
+    if event.event_date <= datetime.utcnow():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot cancel registration for past or ongoing events",
@@ -195,6 +270,10 @@ def delete_registration(
             detail="Registration not found",
         )
     
-    # Delete registration
+    # Delete registration and free the seat, holding it for the waitlist if anyone is waiting
     db.delete(registration)
+    held = free_seat(db, event_id)
     db.commit()
+    invalidate_event_cache()
+    if held:
+        waitlist_worker.notify()
@@ -1,26 +1,51 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import models, schemas
-from app.database import get_db
+from app.database import get_db, get_request_db, run_db
 from app.api.auth import get_current_user, get_current_admin, check_membership
-from app.core.security import get_password_hash
+from app.core.principal import Principal, bump_token_version, publish_token_version
+from app.core.hashing import get_password_hash_async
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_paginate
+from app.core.serialization import ORJSONResponse, RowSerializer
+from app.services import search_service
+from app.services.export_service import export_response
+from app.services.import_service import FORMATS, detect_format, import_users, read_records
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.User])
+user_rows = RowSerializer(schemas.User, models.User)
+
+@router.get("/", response_model=List[schemas.User], response_class=ORJSONResponse)
 def read_users(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_admin: models.User = Depends(get_current_admin),
 ) -> Any:
     """
     Get all users (admin only)
+    
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+    users = keyset_paginate(
+        user_rows.query(db),
+        [models.User.id],
+        key="users",
+        response=response,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+    next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    return ORJSONResponse(
+        user_rows.dump(users),
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+    )
 
 @router.get("/me", response_model=schemas.User)
 def read_user_me(
@@ -32,34 +57,52 @@ def read_user_me(
     return current_user
 
 @router.put("/me", response_model=schemas.User)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_request_db),
     user_in: schemas.UserUpdate,
     current_user: models.User = Depends(get_current_user),
 ) -> Any:
     """
     Update own user details
+    
+    A password change revokes the user's existing tokens. Profile fields
+    are not among the token claims, so other edits leave tokens valid.
     """
     user_data = user_in.dict(exclude_unset=True)
     
-    # If password is being updated, hash it
+    # If password is being updated, hash it and revoke existing tokens
+    token_version = None
     if "password" in user_data:
-        user_data["hashed_password"] = get_password_hash(user_data.pop("password"))
+        user_data["hashed_password"] = await get_password_hash_async(user_data.pop("password"))
+        token_version = bump_token_version(current_user)
     
     # Update attributes
     for key, value in user_data.items():
         setattr(current_user, key, value)
     
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    current_user = await run_db(db, _save_user, current_user)
+    await run_in_threadpool(_after_user_saved, current_user, token_version)
     return current_user
 
-@router.get("/search", response_model=List[schemas.User])
+def _after_user_saved(user: models.User, token_version: Optional[int]) -> None:
+    # The cache may be redis and the index takes a lock, so this runs off the loop
+    if token_version is not None:
+        publish_token_version(user.id, token_version)
+    search_service.index_user(user)
+
+def _save_user(db: Session, user: models.User) -> models.User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+@router.get("/search", response_model=List[schemas.User], response_class=ORJSONResponse)
 def search_users(
     *,
+    response: Response,
     db: Session = Depends(get_db),
+    q: str = None,
     name: str = None,
     graduation_year: int = None,
     major: str = None,
@@ -67,38 +110,82 @@ def search_users(
     location: str = None,
     skip: int = 0,
     limit: int = 20,
-    current_user: models.User = Depends(check_membership),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(check_membership),
 ) -> Any:
     """
     Search alumni directory (requires membership)
+    
+    Results are ordered by relevance; `q` is free text matched across
+    name, major, company and location. On Postgres each word of `q` must
+    match a whole word (full-text search); the in-memory index used
+    elsewhere also matches parts of words. The field filters match
+    substrings everywhere. Pass the X-Next-Cursor response header back as
+    `cursor` for the next page.
     """
-    query = db.query(models.User)
+    after = decode_cursor(cursor, "search") if cursor else None
+    users, next_key = search_service.search_users_page(
+        db,
+        q=q,
+        name=name,
+        graduation_year=graduation_year,
+        major=major,
+        company=company,
+        location=location,
+        skip=skip,
+        limit=limit,
+        after=tuple(after) if after else None,
+    )
+    if next_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor("search", next_key)
+    return users
+
+@router.get("/export")
+def export_users(
+    format: str = "csv",
+    gzip: bool = False,
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Stream the whole user directory as CSV or NDJSON (admin only)
     
-    # Apply filters if provided
-    if name:
-        query = query.filter(
-            (models.User.first_name.ilike(f"%{name}%")) | 
-            (models.User.last_name.ilike(f"%{name}%"))
+    Passwords and reset tokens are not included. Pass `gzip=true` for a
+    compressed download.
+    """
+    return export_response("users", format, gzip)
+
+@router.post("/import", response_model=schemas.UserImportReport)
+def import_users_file(
+    *,
+    db: Session = Depends(get_db),
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; guessed from the file name if omitted"),
+    dry_run: bool = False,
+    current_admin: models.User = Depends(get_current_admin),
+) -> Any:
+    """
+    Bulk import users from a CSV or NDJSON file (admin only)
+    
+    Rows use the registration fields. Invalid rows and emails that are
+    already registered are reported by line number and skipped; the rest
+    are created. Use `python -m app.cli import-users` for very large files.
+    """
+    fmt = format or detect_format(file.filename)
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown file format, pass format=csv or format=ndjson",
         )
-    if graduation_year:
-        query = query.filter(models.User.graduation_year == graduation_year)
-    if major:
-        query = query.filter(models.User.major.ilike(f"%{major}%"))
-    if company:
-        query = query.filter(models.User.company.ilike(f"%{company}%"))
-    if location:
-        query = query.filter(models.User.location.ilike(f"%{location}%"))
     
-    # Apply pagination
-    users = query.offset(skip).limit(limit).all()
-    return users
+    report = import_users(db, read_records(file.file, fmt), dry_run=dry_run)
+    return {**vars(report), "errors_truncated": report.errors_truncated}
 
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
-    current_user: models.User = Depends(check_membership),
+    current_user: Principal = Depends(check_membership),
 ) -> Any:
     """
     Get a specific user (requires membership)
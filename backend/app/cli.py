@@ -0,0 +1,272 @@
+# File: app/cli.py
+"""
+Maintenance commands for the Alumni Portal backend
+
+Usage:
+    python -m app.cli reconcile-counts
+    python -m app.cli create-search-indexes
+    python -m app.cli rebuild-membership-stats
+    python -m app.cli process-webhooks
+    python -m app.cli replay-webhooks [--status failed] [--event-id evt_...] [--since 2024-01-01]
+    python -m app.cli process-waitlists
+    python -m app.cli import-users alumni.csv [--format csv|ndjson] [--chunk-size 1000] [--dry-run]
+    python -m app.cli check-query-plans
+    python -m app.cli profile-imports [--module app.main] [--top 25] [--sort self]
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from app.database import SessionLocal
+import app.models.all_models  # Import all models to ensure they're registered with SQLAlchemy
+
+
+def reconcile_counts(args: argparse.Namespace) -> int:
+    """Recompute events.registered_count from the registrations table"""
+    from app.services.event_service import reconcile_registration_counts
+
+    db = SessionLocal()
+    try:
+        fixed = reconcile_registration_counts(db)
+    finally:
+        db.close()
+    print(f"Reconciled registration counters: {fixed} event(s) corrected")
+    return 0
+
+
+def create_search_indexes(args: argparse.Namespace) -> int:
+    """Create the Postgres trigram/full-text indexes used by directory search"""
+    from app.database import engine
+    from app.services.search_service import install_search_indexes
+
+    if engine.dialect.name != "postgresql":
+        print("Search indexes are Postgres-only; the in-memory index is used on this database")
+        return 0
+    with engine.begin() as connection:
+        install_search_indexes(connection)
+    print("Search indexes created")
+    return 0
+
+
+def rebuild_membership_stats(args: argparse.Namespace) -> int:
+    """Recompute the membership_daily_stats rollup from the memberships table"""
+    from app.services.membership_service import rebuild_membership_stats as rebuild
+
+    db = SessionLocal()
+    try:
+        rows = rebuild(db)
+    finally:
+        db.close()
+    print(f"Rebuilt membership statistics: {rows} daily row(s)")
+    return 0
+
+
+def process_webhooks(args: argparse.Namespace) -> int:
+    """Process every due webhook event, then exit"""
+    from app.services.webhook_service import drain
+
+    processed = drain(args.batch_size)
+    print(f"Processed {processed} webhook event(s)")
+    return 0
+
+
+def replay_webhooks(args: argparse.Namespace) -> int:
+    """Requeue stored webhook events with a fresh retry budget"""
+    from app.services.webhook_service import drain, replay_events
+
+    db = SessionLocal()
+    try:
+        requeued = replay_events(db, stripe_event_ids=args.event_id, status=args.status, since=args.since)
+    finally:
+        db.close()
+    print(f"Requeued {requeued} webhook event(s)")
+    if args.process:
+        print(f"Processed {drain()} webhook event(s)")
+    return 0
+
+
+def process_waitlists(args: argparse.Namespace) -> int:
+    """Offer held seats down event waitlists and expire lapsed offers, then exit"""
+    from app.services.waitlist_service import drain
+
+    changed = drain()
+    print(f"Processed waitlists: {changed} offer(s) made, expired or released")
+    return 0
+
+
+def import_users(args: argparse.Namespace) -> int:
+    """Bulk import users from a CSV or NDJSON file ("-" reads stdin)"""
+    from app.core.hashing import hashing_pool
+    from app.services.import_service import detect_format, import_users as run_import, read_records
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        print("Cannot tell the file format from its name, pass --format csv or --format ndjson")
+        return 2
+
+    # The hashing pool of this process only serves the import, so it may grow to --hash-workers
+    if args.hash_workers:
+        hashing_pool.max_workers = max(hashing_pool.max_workers, args.hash_workers)
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    db = SessionLocal()
+    try:
+        report = run_import(
+            db,
+            read_records(stream, fmt),
+            chunk_size=args.chunk_size,
+            hash_workers=args.hash_workers,
+            dry_run=args.dry_run,
+        )
+    finally:
+        db.close()
+        hashing_pool.shutdown()
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+    for error in report.errors:
+        print(f"line {error['line']}: {error['email'] or '-'}: {error['error']}")
+    if report.errors_truncated:
+        print(f"... {report.failed - len(report.errors)} more error(s) not shown")
+    action = "validated" if args.dry_run else "created"
+    print(f"Read {report.rows} row(s): {report.rows - report.failed if args.dry_run else report.created} "
+          f"{action}, {report.failed} rejected")
+    return 1 if report.failed else 0
+
+
+def check_query_plans(args: argparse.Namespace) -> int:
+    """Fail if a hot query no longer uses the index it was given"""
+    from app.core.query_plans import check_query_plans as run_checks
+    from app.database import engine
+
+    with engine.connect() as connection:
+        with connection.begin():
+            checks = run_checks(connection)
+    for check in checks:
+        print(f"{'ok  ' if check.ok else 'FAIL'} {check.name}: expected {check.index}")
+        if not check.ok or args.verbose:
+            for line in check.plan:
+                print(f"       {line}")
+    failed = sum(not check.ok for check in checks)
+    if failed:
+        print(f"{failed} query plan(s) regressed; run `alembic upgrade head` if indexes are missing")
+    return 1 if failed else 0
+
+
+def profile_imports(args: argparse.Namespace) -> int:
+    """Import a module in a fresh interpreter under -X importtime and list the slowest imports"""
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        print(result.stderr)
+        return result.returncode
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    if not rows:
+        print(result.stderr)
+        return 1
+
+    total = next((cumulative for _, cumulative, name in rows if name.strip() == args.module), None)
+    column = 0 if args.sort == "self" else 1
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[column], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name.strip() if args.sort == 'self' else name}")
+    if total is not None:
+        print(f"Importing {args.module} took {total / 1000:.1f} ms over {len(rows)} module(s)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reconcile = subparsers.add_parser(
+        "reconcile-counts", help="Recompute event registration counters"
+    )
+    reconcile.set_defaults(func=reconcile_counts)
+
+    search_indexes = subparsers.add_parser(
+        "create-search-indexes", help="Create pg_trgm/tsvector indexes for directory search"
+    )
+    search_indexes.set_defaults(func=create_search_indexes)
+
+    membership_stats = subparsers.add_parser(
+        "rebuild-membership-stats", help="Recompute the daily membership statistics rollup"
+    )
+    membership_stats.set_defaults(func=rebuild_membership_stats)
+
+    process = subparsers.add_parser(
+        "process-webhooks", help="Drain the webhook outbox (for deployments with WEBHOOK_WORKERS=0)"
+    )
+    process.add_argument("--batch-size", type=int, default=None)
+    process.set_defaults(func=process_webhooks)
+
+    replay = subparsers.add_parser(
+        "replay-webhooks", help="Requeue stored webhook events"
+    )
+    replay.add_argument("--status", default="failed",
+                        help="Requeue events in this status (default: failed)")
+    replay.add_argument("--event-id", action="append",
+                        help="Requeue this Stripe event id regardless of status; repeatable")
+    replay.add_argument("--since", type=datetime.fromisoformat,
+                        help="Only events received at or after this ISO timestamp")
+    replay.add_argument("--process", action="store_true",
+                        help="Process the requeued events right away")
+    replay.set_defaults(func=replay_webhooks)
+
+    waitlists = subparsers.add_parser(
+        "process-waitlists", help="Promote event waitlists (for deployments with WAITLIST_WORKERS=0)"
+    )
+    waitlists.set_defaults(func=process_waitlists)
+
+    import_parser = subparsers.add_parser(
+        "import-users", help="Bulk import users from a CSV or NDJSON file"
+    )
+    import_parser.add_argument("path", help="File to import, or - for stdin (needs --format)")
+    import_parser.add_argument("--format", choices=["csv", "ndjson"],
+                               help="File format (default: guessed from the extension)")
+    import_parser.add_argument("--chunk-size", type=int, default=None,
+                               help="Rows per transaction (default: IMPORT_CHUNK_SIZE)")
+    import_parser.add_argument("--hash-workers", type=int, default=None,
+                               help="Hashing processes to use (default: IMPORT_HASH_WORKERS)")
+    import_parser.add_argument("--dry-run", action="store_true",
+                               help="Validate the file and report errors without creating users")
+    import_parser.set_defaults(func=import_users)
+
+    plans = subparsers.add_parser(
+        "check-query-plans", help="Check that hot queries use their indexes"
+    )
+    plans.add_argument("--verbose", action="store_true", help="Print every plan, not only regressions")
+    plans.set_defaults(func=check_query_plans)
+
+    imports = subparsers.add_parser(
+        "profile-imports", help="List the slowest imports of the app (python -X importtime)"
+    )
+    imports.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    imports.add_argument("--top", type=int, default=25, help="Number of modules to list")
+    imports.add_argument("--sort", choices=["cumulative", "self"], default="cumulative",
+                         help="Order by time including submodules (default) or by own time")
+    imports.set_defaults(func=profile_imports)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
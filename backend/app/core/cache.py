@@ -0,0 +1,240 @@
+# File: app/core/cache.py
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Tuple, Union
+
+from fastapi import Request, Response, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CacheValue = Union[bytes, str, int, float]
+
+
+class CacheBackend(Protocol):
+    """
+    Minimal key/value interface for response caching
+
+    Method names and signatures follow redis-py, so a redis.Redis client
+    (or any fake exposing the same methods) can be used as a backend
+    without subclassing; subclasses must implement every method.
+    Values are stored as bytes; get returns bytes or None.
+    """
+
+    @abstractmethod
+    def get(self, name: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, name: str, value: CacheValue, ex: Optional[float] = None) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, *names: str) -> int:
+        ...
+
+    @abstractmethod
+    def incr(self, name: str, amount: int = 1) -> int:
+        ...
+
+
+def _to_bytes(value: CacheValue) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class MemoryCache(CacheBackend):
+    """Per-process LRU cache with optional per-key expiry"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[name]
+                return None
+            self._entries.move_to_end(name)
+            return value
+
+    def set(self, name: str, value: CacheValue, ex: Optional[float] = None) -> bool:
+        expires = time.monotonic() + ex if ex else None
+        with self._lock:
+            self._entries[name] = (expires, _to_bytes(value))
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._entries.pop(name, None) is not None for name in names)
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            expires, value = self._entries.get(name, (None, b"0"))
+            new_value = int(value) + amount
+            self._entries[name] = (expires, str(new_value).encode())
+            self._entries.move_to_end(name)
+            return new_value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class NullCache(CacheBackend):
+    """Backend that stores nothing, for disabling response caching"""
+
+    def get(self, name: str) -> Optional[bytes]:
+        return None
+
+    def set(self, name: str, value: CacheValue, ex: Optional[float] = None) -> bool:
+        return True
+
+    def delete(self, *names: str) -> int:
+        return 0
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        return 0
+
+
+def build_cache_backend(backend: str, max_entries: Optional[int] = None) -> CacheBackend:
+    """
+    Create a cache backend by name (RESPONSE_CACHE_BACKEND, WAITING_ROOM_BACKEND)
+
+    Args:
+        backend: "memory", "redis" (needs the redis package and REDIS_URL) or "none"
+        max_entries: Size of a memory backend, RESPONSE_CACHE_MAX_ENTRIES by default
+
+    Returns:
+        The cache backend
+
+    Raises:
+        ValueError: If the backend name is unknown or Redis is misconfigured
+    """
+    if backend == "memory":
+        return MemoryCache(max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if backend == "none":
+        return NullCache()
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("The redis backend requires REDIS_URL")
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("The redis backend requires the redis package")
+        return redis.Redis.from_url(settings.REDIS_URL)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+response_cache: CacheBackend = build_cache_backend(settings.RESPONSE_CACHE_BACKEND)
+
+
+def get_response_cache() -> CacheBackend:
+    return response_cache
+
+
+def set_response_cache(backend: CacheBackend) -> None:
+    """Swap the response cache backend, e.g. for a fake in tests"""
+    global response_cache
+    response_cache = backend
+
+
+def check_response_cache_backend() -> None:
+    """Warn at startup when several workers would each keep their own response cache"""
+    if settings.RESPONSE_CACHE_BACKEND == "memory" and settings.WEB_CONCURRENCY > 1:
+        logger.warning(
+            "RESPONSE_CACHE_BACKEND is memory with WEB_CONCURRENCY=%d: a change only invalidates the "
+            "cached event pages of the worker that made it, the others serve them for up to "
+            "EVENT_CACHE_TTL_SECONDS, and token revocations and membership changes do not reach them. "
+            "Set RESPONSE_CACHE_BACKEND=redis with REDIS_URL.",
+            settings.WEB_CONCURRENCY,
+        )
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def get_cached_document(key: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    Read a (metadata, body) pair stored by set_cached_document
+
+    Returns:
+        The metadata dict and the body bytes, or None on a miss
+    """
+    raw = response_cache.get(key)
+    if raw is None:
+        return None
+    meta, _, body = raw.partition(b"\n")
+    return json.loads(meta), body
+
+
+def set_cached_document(key: str, meta: Dict[str, Any], body: bytes, ttl: Optional[float] = None) -> None:
+    """
+    Store a response body with a small metadata header under one key
+
+    The body is kept as the exact bytes sent to clients, so a hit costs
+    no serialization. It must not contain raw newlines, which holds for
+    compact JSON.
+    """
+    response_cache.set(key, json.dumps(meta).encode() + b"\n" + body, ex=ttl)
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    *,
+    cache_control: str,
+    etag: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Build a JSON response that honours If-None-Match
+
+    Args:
+        request: The incoming request
+        body: Serialized JSON body
+        cache_control: Cache-Control header value
+        etag: Precomputed ETag of body, computed when omitted
+        headers: Extra response headers
+
+    Returns:
+        A 304 Not Modified response if the client's copy is current,
+        otherwise a 200 response with the body
+    """
+    etag = etag or make_etag(body)
+    response_headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+    response_headers.update(headers or {})
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+    return Response(content=body, media_type="application/json", headers=response_headers)
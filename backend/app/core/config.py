@@ -9,6 +9,21 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Alumni Portal"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Postgres statement_timeout per connection; 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Serve ported handlers through an AsyncEngine (asyncpg / aiosqlite). The async
+    # engine has its own pool of the same size, and a sync handler behind an async
+    # auth dependency holds a connection from each, so a worker may open up to
+    # 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_ASYNC: bool = False
+    # Defaults to DATABASE_URL with the async driver swapped in
+    ASYNC_DATABASE_URL: Optional[str] = None
     # DB_NAME: str
     # DB_USER: str
     # DB_PASSWORD: str
@@ -16,9 +31,90 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Trust id/role/membership claims in access tokens instead of loading the user.
+    # Revocations and membership changes reach other workers only through a shared
+    # RESPONSE_CACHE_BACKEND; with "memory" they keep trusting old tokens for up to
+    # ACCESS_TOKEN_EXPIRE_MINUTES
+    STATELESS_AUTH: bool = False
     STRIPE_SECRET_KEY: Optional[str] = None
     STRIPE_WEBHOOK_SECRET: Optional[str] = None
+    STRIPE_PUBLISHABLE_KEY: str = ""
+    # Override the Stripe API base URL, e.g. to point at a local stub server
+    STRIPE_API_BASE: Optional[str] = None
+    STRIPE_TIMEOUT_SECONDS: float = 10.0
+    STRIPE_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    STRIPE_MAX_RETRIES: int = 2
+    STRIPE_MAX_CONNECTIONS: int = 20
+    # Webhook outbox: background worker tasks per process (0 to run `python -m app.cli
+    # process-webhooks` elsewhere), batch size, idle poll interval, claim lease and retry backoff
+    WEBHOOK_WORKERS: int = 1
+    WEBHOOK_BATCH_SIZE: int = 100
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 1.0
+    WEBHOOK_LEASE_SECONDS: int = 300
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BASE_SECONDS: float = 5.0
+    WEBHOOK_RETRY_MAX_SECONDS: float = 3600.0
     FRONTEND_URL: str = "http://localhost:3000"
+    MEMBERSHIP_CACHE_TTL_SECONDS: float = 60.0
+    MEMBERSHIP_CACHE_MAX_SIZE: int = 10000
+    # bcrypt worker processes and how many extra requests may wait for one
+    HASH_POOL_SIZE: int = 2
+    HASH_QUEUE_SIZE: int = 32
+    HASH_RETRY_AFTER_SECONDS: int = 1
+    # Bulk user import: rows validated and inserted per transaction, processes of the
+    # shared hashing pool (HASH_POOL_SIZE) an import may keep busy, errors kept in the report
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_HASH_WORKERS: int = 2
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    # Rows fetched per server-side cursor round trip by the streaming exports
+    EXPORT_BATCH_SIZE: int = 5000
+    # Directory search: "auto" (postgres indexes, or the in-memory index elsewhere),
+    # "postgres", "memory" or "filter" (plain ILIKE). Free-text `q` matches whole words
+    # on Postgres (tsvector) but substrings with the memory index and filter on SQLite
+    SEARCH_BACKEND: str = "auto"
+    SEARCH_INDEX_REFRESH_SECONDS: float = 300.0
+    # Response cache for event listings: "memory" (per process), "redis" (REDIS_URL) or "none".
+    # It also carries cache invalidations, token revocations and membership changes between
+    # workers, so use redis when WEB_CONCURRENCY is above 1 (startup warns otherwise)
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    REDIS_URL: Optional[str] = None
+    # Worker processes serving the app (the variable uvicorn and gunicorn read for
+    # their worker count); startup warns about per-process state when it is above 1
+    WEB_CONCURRENCY: int = 1
+    # How long cached event pages live, and max-age sent to clients for public responses
+    EVENT_CACHE_TTL_SECONDS: float = 60.0
+    EVENT_CACHE_MAX_AGE_SECONDS: int = 0
+    # Startup check that the database is at the Alembic head: "error" (refuse to start),
+    # "warn" (log and start) or "off"
+    SCHEMA_CHECK: str = "error"
+    # Import stripe in a background thread once a worker is serving, rather
+    # than on the first payment request
+    WARM_UP_IMPORTS: bool = True
+    # Instrumentation middleware: per-route latency, SQL statement and database time
+    # histograms and N+1 detection
+    REQUEST_METRICS: bool = True
+    # Serve every process metric in Prometheus format at /metrics (keep it reachable
+    # from the internal network only); the request histograms need REQUEST_METRICS
+    METRICS_ENABLED: bool = True
+    # Flag a request as a likely N+1 when one statement runs this many times (0 disables)
+    N_PLUS_ONE_THRESHOLD: int = 10
+    # Return X-Query-Count and Server-Timing headers (development only)
+    DEBUG_QUERY_HEADERS: bool = False
+    # Waiting rooms for registration launches: where queue state lives ("memory" per
+    # process, or "redis" to share one queue across workers; by default redis when
+    # REDIS_URL is set), how long an admitted user may take to pay, the longest poll
+    # interval handed out, and how often each process re-reads room settings
+    WAITING_ROOM_BACKEND: Optional[str] = None
+    WAITING_ROOM_ADMISSION_SECONDS: int = 600
+    WAITING_ROOM_MAX_POLL_SECONDS: int = 30
+    WAITING_ROOM_CONFIG_TTL_SECONDS: float = 1.0
+    # Waitlists of full events: how long a seat freed by a cancellation is held for the
+    # next person in line, and the promotion worker's tasks per process (0 to run
+    # `python -m app.cli process-waitlists` elsewhere) and idle poll interval
+    WAITLIST_HOLD_SECONDS: int = 3600
+    WAITLIST_WORKERS: int = 1
+    WAITLIST_POLL_INTERVAL_SECONDS: float = 10.0
 
     class Config:
         env_file = ".env"
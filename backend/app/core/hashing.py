@@ -0,0 +1,160 @@
+# File: app/core/hashing.py
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+
+class HashingBusyError(Exception):
+    """
+    Raised when the hashing pool queue is full
+
+    Handlers let this propagate; app.main turns it into a 429 response
+    with a Retry-After header.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    """
+    Bounded process pool for bcrypt hashing and verification
+
+    bcrypt is deliberately CPU-heavy, so running it inline in request
+    handlers starves the worker during login spikes. Work is sent to a
+    process pool for parallelism across cores, and at most
+    max_workers + max_queue operations may be in flight; beyond that
+    callers get HashingBusyError instead of queueing unboundedly.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int = 1):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        # Started on first use so importing the app does not fork workers
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _acquire(self, bounded: bool = True) -> None:
+        with self._lock:
+            if bounded and self._pending >= self.capacity:
+                raise HashingBusyError(self.retry_after)
+            self._pending += 1
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, fn: Callable[..., Any], *args: Any, bounded: bool = True) -> Future:
+        self._acquire(bounded)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a hashing function in the pool and await its result
+
+        Raises:
+            HashingBusyError: If the pool queue is full
+        """
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any], concurrency: int) -> List[Any]:
+        """
+        Run a hashing function over items from synchronous code, e.g. a bulk import
+
+        At most `concurrency` calls (and never more than max_workers) are in
+        the pool at once, counted in pending like any other call, so
+        requests keep getting a turn instead of queueing behind the batch.
+        Blocks until every call has finished.
+
+        Returns:
+            The results, in the order of items
+        """
+        concurrency = max(1, min(concurrency, self.max_workers))
+        futures: List[Future] = []
+        running = set()
+        for item in items:
+            if len(running) >= concurrency:
+                _, running = wait(running, return_when=FIRST_COMPLETED)
+            future = self._submit(fn, item, bounded=False)
+            futures.append(future)
+            running.add(future)
+        return [future.result() for future in futures]
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.HASH_POOL_SIZE,
+    max_queue=settings.HASH_QUEUE_SIZE,
+    retry_after=settings.HASH_RETRY_AFTER_SECONDS,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a plain password against a hashed password in the hashing pool
+
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password to compare against
+
+    Returns:
+        True if the password matches, False otherwise
+
+    Raises:
+        HashingBusyError: If the hashing queue is full
+    """
+    return await hashing_pool.verify(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password in the hashing pool
+
+    Args:
+        password: Plain text password to hash
+
+    Returns:
+        Hashed password
+
+    Raises:
+        HashingBusyError: If the hashing queue is full
+    """
+    return await hashing_pool.hash(password)
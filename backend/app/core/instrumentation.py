@@ -0,0 +1,154 @@
+# File: app/core/instrumentation.py
+import logging
+import time
+from collections import Counter as StatementCounter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Statements per request: 0 (served from cache/token), a handful, then N+1 territory
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+
+_request_latency = registry.histogram_family(
+    "http_request_duration_seconds",
+    "Request latency by route template, method and status code",
+    ["method", "route", "status"],
+)
+_request_statements = registry.histogram_family(
+    "http_request_sql_statements",
+    "SQL statements executed per request",
+    ["method", "route"],
+    STATEMENT_BUCKETS,
+)
+_request_db_time = registry.histogram_family(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request",
+    ["method", "route"],
+)
+_n_plus_one = registry.counter_family(
+    "http_n_plus_one_total",
+    "Requests that ran the same SQL statement at least N_PLUS_ONE_THRESHOLD times",
+    ["method", "route"],
+)
+
+
+@dataclass
+class RequestStats:
+    """SQL activity of one request, filled in by the engine event hooks"""
+
+    statements: int = 0
+    db_seconds: float = 0.0
+    by_statement: StatementCounter = field(default_factory=StatementCounter)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least threshold times, most frequent first"""
+        return [(sql, count) for sql, count in self.by_statement.most_common() if count >= threshold]
+
+
+# Set by the middleware for the duration of a request. Handlers run in a
+# threadpool with a copy of the context, so they see (and mutate) the same
+# RequestStats object.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """SQL statistics of the request being served, if any"""
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        stats.db_seconds += time.perf_counter() - started.pop()
+    stats.statements += 1
+    # Bound parameters are not part of the text, so a per-row lookup in a
+    # loop shows up as one statement with a high count
+    stats.by_statement[statement] += 1
+
+
+def _route_label(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware recording per-route latency and SQL activity
+
+    Every request gets a latency observation labelled with the route
+    template (never the raw path), its SQL statement count and database
+    time, and a check for the same statement repeated N_PLUS_ONE_THRESHOLD
+    times or more, which is logged and counted as a likely N+1 query.
+    With DEBUG_QUERY_HEADERS the counts are also returned as X-Query-Count
+    and a Server-Timing header; streamed responses report the queries run
+    before the body started.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.DEBUG_QUERY_HEADERS:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(stats.statements).encode()))
+                    headers.append((
+                        b"server-timing",
+                        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+                        f"app;dur={elapsed_ms:.2f}".encode(),
+                    ))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._record(scope, stats, status_code, time.perf_counter() - start)
+
+    @staticmethod
+    def _record(scope: dict, stats: RequestStats, status_code: int, elapsed: float) -> None:
+        method, route = scope["method"], _route_label(scope)
+        _request_latency.labels(method, route, status_code).observe(elapsed)
+        _request_statements.labels(method, route).observe(stats.statements)
+        _request_db_time.labels(method, route).observe(stats.db_seconds)
+
+        repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD) if settings.N_PLUS_ONE_THRESHOLD else []
+        if repeated:
+            _n_plus_one.labels(method, route).inc()
+            sql, count = repeated[0]
+            logger.warning(
+                "Possible N+1 query on %s %s: statement ran %d times (%d statements in total): %s",
+                method, route, count, stats.statements, " ".join(sql.split())[:200],
+            )
@@ -0,0 +1,227 @@
+# File: app/core/metrics.py
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    """Monotonically increasing counter"""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"value": self.value}
+
+
+class Gauge:
+    """Value read from a callback at collection time"""
+
+    def __init__(self, name: str, description: str, callback: Callable[[], float]):
+        self.name = name
+        self.description = description
+        self.callback = callback
+
+    @property
+    def value(self) -> float:
+        return float(self.callback())
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"value": self.value}
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values"""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile: upper bound of the bucket holding it"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = q * self.count
+            running = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+                running += bucket_count
+                if running >= target:
+                    return bound
+            return float("inf")
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricFamily:
+    """
+    Metrics of one kind split by label values, e.g. latency per route
+
+    Children are created on first use of a label combination; keep label
+    values low-cardinality (route templates, not raw paths).
+    """
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str],
+                 factory: Callable[[], object], kind: str):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.kind = kind
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {",".join(key): child.snapshot() for key, child in self.children()}
+
+
+class MetricsRegistry:
+    """Process-wide collection of named metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str, callback: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(name, description, callback))
+
+    def histogram(self, name: str, description: str,
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._register(Histogram(name, description, buckets or DEFAULT_BUCKETS))
+
+    def counter_family(self, name: str, description: str, label_names: Sequence[str]) -> MetricFamily:
+        return self._register(MetricFamily(
+            name, description, label_names, lambda: Counter(name, description), "counter"
+        ))
+
+    def histogram_family(self, name: str, description: str, label_names: Sequence[str],
+                         buckets: Optional[Sequence[float]] = None) -> MetricFamily:
+        return self._register(MetricFamily(
+            name, description, label_names,
+            lambda: Histogram(name, description, buckets or DEFAULT_BUCKETS), "histogram",
+        ))
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def all(self) -> List[object]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Dict[str, float]]:
+        return {m.name: m.snapshot() for m in self.all() if m.name.startswith(prefix)}
+
+
+def _kind(metric) -> str:
+    if isinstance(metric, MetricFamily):
+        return metric.kind
+    if isinstance(metric, Histogram):
+        return "histogram"
+    return "gauge" if isinstance(metric, Gauge) else "counter"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _render_metric(lines: List[str], name: str, metric, labels: Sequence[Tuple[str, str]]) -> None:
+    if isinstance(metric, Histogram):
+        with metric._lock:
+            counts, total, count = list(metric.counts), metric.sum, metric.count
+        running = 0
+        for bound, bucket_count in zip(metric.buckets + (float("inf"),), counts):
+            running += bucket_count
+            bucket_labels = list(labels) + [("le", _format_value(bound))]
+            lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {running}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    else:
+        lines.append(f"{name}{_format_labels(labels)} {_format_value(metric.value)}")
+
+
+def render_prometheus(metrics_registry: "MetricsRegistry") -> str:
+    """
+    Render every metric in the Prometheus text exposition format (0.0.4)
+
+    Args:
+        metrics_registry: Registry to render
+
+    Returns:
+        The exposition text, ending with a newline
+    """
+    lines: List[str] = []
+    for metric in sorted(metrics_registry.all(), key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {_kind(metric)}")
+        if isinstance(metric, MetricFamily):
+            for key, child in sorted(metric.children()):
+                _render_metric(lines, metric.name, child, list(zip(metric.label_names, key)))
+        else:
+            _render_metric(lines, metric.name, metric, ())
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,104 @@
+# File: app/core/migrations.py
+import ast
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Optional
+
+from sqlalchemy import text
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+# `revision = '0002'` / `down_revision = '0001'` lines written by script.py.mako
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\s*(?::[^=]+)?=\s*(.+?)\s*$", re.MULTILINE)
+
+
+class SchemaRevisionError(RuntimeError):
+    """Raised at startup when the database is not at the migration head"""
+
+
+def _revision_ids(value: str) -> FrozenSet[str]:
+    parsed = ast.literal_eval(value)
+    if parsed is None:
+        return frozenset()
+    if isinstance(parsed, str):
+        return frozenset([parsed])
+    return frozenset(parsed)
+
+
+@lru_cache(maxsize=1)
+def head_revisions() -> FrozenSet[str]:
+    """
+    Find the head revision(s) of the migration scripts
+
+    The revision ids are read straight from the version files instead of
+    through alembic's ScriptDirectory, which would import alembic and
+    every migration module into each worker just to compare one string.
+
+    Returns:
+        Revision ids no other revision builds on
+    """
+    revisions, parents = set(), set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        fields = dict(_REVISION_LINE.findall(path.read_text(encoding="utf-8")))
+        if "revision" not in fields:
+            continue
+        revisions |= _revision_ids(fields["revision"])
+        parents |= _revision_ids(fields.get("down_revision", "None"))
+    return frozenset(revisions - parents)
+
+
+def current_revisions(engine: Engine) -> Optional[FrozenSet[str]]:
+    """
+    Read the revision(s) recorded in alembic_version
+
+    Args:
+        engine: Engine of the application database
+
+    Returns:
+        The recorded revisions, or None if the database was never migrated
+    """
+    with engine.connect() as connection:
+        try:
+            rows = connection.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+        except (sa_exc.OperationalError, sa_exc.ProgrammingError):
+            return None
+    return frozenset(rows)
+
+
+def check_schema_revision() -> None:
+    """
+    Make sure the database has been migrated to the code's head revision
+
+    Replaces Base.metadata.create_all() at startup: one SELECT instead of
+    reflecting every table in every worker. Behaviour follows SCHEMA_CHECK:
+    "error" refuses to start, "warn" logs and starts, "off" skips the check.
+
+    Raises:
+        SchemaRevisionError: If SCHEMA_CHECK is "error" and the revisions differ
+    """
+    if settings.SCHEMA_CHECK == "off":
+        return
+    from app.database import engine
+
+    expected = head_revisions()
+    current = current_revisions(engine)
+    if current == expected:
+        return
+    found = ", ".join(sorted(current)) if current else "not migrated"
+    message = (
+        f"Database schema is at {found}, the code expects {', '.join(sorted(expected))}; "
+        "run `alembic upgrade head` (or `alembic stamp 0001` first for databases whose tables "
+        "were built by create_all before migrations)"
+    )
+    if settings.SCHEMA_CHECK == "warn":
+        logger.warning(message)
+        return
+    raise SchemaRevisionError(message)
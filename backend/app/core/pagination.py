@@ -0,0 +1,113 @@
+# File: app/core/pagination.py
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Date, DateTime, tuple_
+from sqlalchemy.orm import Query
+
+# Response header carrying the opaque cursor for the next page. List
+# endpoints keep returning plain JSON arrays for backward compatibility.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: str, values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor
+
+    Args:
+        key: Name of the listing the cursor belongs to
+        values: Sort key values of the last row
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = {
+        "k": key,
+        "v": [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, key: str, types: Sequence[Any] = ()) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from the client
+        key: Name of the listing the cursor must belong to
+        types: Optional SQLAlchemy column types used to restore dates
+
+    Returns:
+        The sort key values
+
+    Raises:
+        HTTPException: If the cursor is malformed or from another listing
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["k"] != key:
+            raise ValueError("cursor belongs to another listing")
+        values = list(payload["v"])
+        for i, column_type in enumerate(types):
+            if isinstance(column_type, DateTime) and values[i] is not None:
+                values[i] = datetime.fromisoformat(values[i])
+            elif isinstance(column_type, Date) and values[i] is not None:
+                values[i] = date.fromisoformat(values[i])
+        return values
+    except (ValueError, KeyError, TypeError, IndexError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def keyset_paginate(
+    query: Query,
+    columns: Sequence[Any],
+    *,
+    key: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> list:
+    """
+    Fetch one page of a query ordered by a unique key
+
+    With a cursor, rows are selected with a row-value comparison on the
+    key, so deep pages cost the same as the first one. Without a cursor the
+    legacy skip/limit offset is applied. In both cases the cursor for the
+    next page, if any, is set on the X-Next-Cursor response header.
+
+    Args:
+        query: Query to paginate
+        columns: Mapped columns forming a unique ascending sort key
+        key: Name of the listing, embedded in the cursor
+        response: Response to set the next-cursor header on
+        cursor: Cursor from a previous page
+        skip: Legacy offset, ignored when a cursor is given
+        limit: Page size
+
+    Returns:
+        The rows of the page
+    """
+    query = query.order_by(*columns)
+    if cursor:
+        values = decode_cursor(cursor, key, [c.type for c in columns])
+        query = query.filter(tuple_(*columns) > tuple_(*values))
+    elif skip:
+        query = query.offset(skip)
+
+    items = query.limit(limit + 1).all()
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            key, [getattr(last, c.key) for c in columns]
+        )
+    return items
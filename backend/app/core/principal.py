@@ -0,0 +1,114 @@
+# File: app/core/principal.py
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from app.core.cache import get_response_cache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Lightweight authenticated identity built from token claims
+
+    Read-only endpoints that only need the caller's id and role depend on
+    this instead of a full models.User, so they can skip the user lookup.
+    """
+    id: int
+    is_admin: bool = False
+    token_version: int = 0
+    membership_expires: Optional[date] = None
+    issued_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: Any, membership_expires: Optional[date] = None) -> "Principal":
+        """Build a principal from a loaded models.User"""
+        return cls(
+            id=user.id,
+            is_admin=bool(user.is_admin),
+            token_version=user.token_version or 0,
+            membership_expires=membership_expires,
+        )
+
+
+# Latest token version seen per user in this process. Populated on full user
+# lookups and committed version bumps so stateless tokens issued before a
+# bump are rejected without a database query.
+_token_versions: Dict[int, int] = {}
+_token_versions_lock = threading.Lock()
+
+# Committed bumps are also published to the response cache, so other workers
+# sharing it (RESPONSE_CACHE_BACKEND=redis) reject the revoked tokens too
+TOKEN_VERSION_KEY = "auth:token_version:{}"
+
+
+def note_token_version(user_id: int, version: int) -> None:
+    """
+    Record the current token version of a user
+
+    Args:
+        user_id: ID of the user
+        version: The user's current token version
+    """
+    with _token_versions_lock:
+        if version > _token_versions.get(user_id, -1):
+            _token_versions[user_id] = version
+
+
+def publish_token_version(user_id: int, version: int) -> None:
+    """
+    Record a committed token version bump in this process and the response cache
+
+    Call after the bump is committed, so a rolled back change never
+    revokes tokens that are still valid. The cache entry expires with
+    the last token the bump revokes.
+
+    Args:
+        user_id: ID of the user
+        version: The user's new token version
+    """
+    note_token_version(user_id, version)
+    get_response_cache().set(
+        TOKEN_VERSION_KEY.format(user_id), version, ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+
+def is_token_version_current(user_id: int, version: int) -> bool:
+    """
+    Check a token's version against the latest one seen in this process or published
+
+    Args:
+        user_id: ID of the user
+        version: Version claimed by the token
+
+    Returns:
+        False if the user's tokens are known to have been revoked since
+    """
+    with _token_versions_lock:
+        if version < _token_versions.get(user_id, version):
+            return False
+    published = get_response_cache().get(TOKEN_VERSION_KEY.format(user_id))
+    if published is None:
+        return True
+    note_token_version(user_id, int(published))
+    return version >= int(published)
+
+
+def bump_token_version(user: Any) -> int:
+    """
+    Invalidate all previously issued tokens of a user
+
+    Call on a password change or on any change to a claim the tokens
+    carry, such as the admin role. The caller is responsible for committing the user, then
+    passing the returned version to publish_token_version.
+
+    Args:
+        user: The models.User to bump
+
+    Returns:
+        The new token version
+    """
+    user.token_version = (user.token_version or 0) + 1
+    return user.token_version
@@ -0,0 +1,150 @@
+# File: app/core/query_plans.py
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.engine import Connection
+
+from app import models
+
+
+def _registration_lookup() -> Select:
+    # Duplicate check in create_registration and the webhook handler
+    registration = models.Registration
+    return select(registration.id).where(registration.event_id == 1, registration.user_id == 1)
+
+
+def _my_events() -> Select:
+    # /registrations/my-events
+    return (
+        select(models.Event)
+        .join(models.Registration, models.Registration.event_id == models.Event.id)
+        .where(models.Registration.user_id == 1)
+        .order_by(models.Event.event_date, models.Event.id)
+    )
+
+
+def _active_membership() -> Select:
+    # membership_service.get_active_membership_end
+    membership = models.Membership
+    return select(func.max(membership.end_date)).where(
+        membership.user_id == 1,
+        membership.is_active == True,
+        membership.end_date >= date(2000, 1, 1),
+    )
+
+
+def _public_events() -> Select:
+    # First page of /events/ for anonymous users and non-members
+    return (
+        select(models.Event)
+        .where(models.Event.is_members_only == False)
+        .order_by(models.Event.event_date, models.Event.id)
+        .limit(100)
+    )
+
+
+def _member_events() -> Select:
+    # First page of /events/ for members and admins
+    return select(models.Event).order_by(models.Event.event_date, models.Event.id).limit(100)
+
+
+def _waitlist_status() -> Select:
+    # /events/{id}/waitlist/me, polled by everyone on a waitlist
+    entry = models.WaitlistEntry
+    return (
+        select(entry.position, entry.status, models.Event.waitlist_offered_through)
+        .join(models.Event, models.Event.id == entry.event_id)
+        .where(entry.event_id == 1, entry.user_id == 1)
+    )
+
+
+def _waitlist_next() -> Select:
+    # Next in line, in waitlist_service.promote
+    entry = models.WaitlistEntry
+    return (
+        select(entry.id, entry.position)
+        .where(entry.event_id == 1, entry.status == "waiting")
+        .order_by(entry.position)
+        .limit(1)
+    )
+
+
+# Hot query shapes and the index each one must use
+HOT_QUERIES: Dict[str, Tuple[Callable[[], Select], str]] = {
+    "registration lookup": (_registration_lookup, "uq_registrations_event_user"),
+    "my events": (_my_events, "ix_registrations_user_id"),
+    "active membership": (_active_membership, "ix_memberships_user_active_end"),
+    "public events page": (_public_events, "ix_events_members_only_date"),
+    "member events page": (_member_events, "ix_events_date_id"),
+    "waitlist status": (_waitlist_status, "uq_waitlist_entries_event_user"),
+    "waitlist next in line": (_waitlist_next, "ix_waitlist_entries_event_status_position"),
+}
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    index: str
+    plan: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return any(self.index in line for line in self.plan)
+
+
+def _postgres_plan_lines(node: dict) -> List[str]:
+    line = node["Node Type"]
+    if "Index Name" in node:
+        line += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        line += f" on {node['Relation Name']}"
+    lines = [line]
+    for child in node.get("Plans", []):
+        lines.extend(_postgres_plan_lines(child))
+    return lines
+
+
+def explain(connection: Connection, query: Select) -> List[str]:
+    """
+    Get the query plan of a statement as one line per plan step
+
+    Args:
+        connection: Database connection
+        query: Statement to explain; it is not executed
+
+    Returns:
+        Plan steps, naming the indexes used
+    """
+    sql = str(query.compile(connection, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "postgresql":
+        # Empty and small tables favour sequential scans; ask whether the
+        # planner can use an index at all rather than whether it is cheaper
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _postgres_plan_lines(plan[0]["Plan"])
+    if connection.dialect.name == "sqlite":
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in connection.execute(text(f"EXPLAIN {sql}"))]
+
+
+def check_query_plans(connection: Connection) -> List[PlanCheck]:
+    """
+    Explain every hot query shape and record whether it uses its index
+
+    Run inside a transaction: the Postgres planner setting is scoped to it.
+
+    Args:
+        connection: Database connection to a migrated database
+
+    Returns:
+        One PlanCheck per entry of HOT_QUERIES
+    """
+    return [
+        PlanCheck(name=name, index=index, plan=explain(connection, build()))
+        for name, (build, index) in HOT_QUERIES.items()
+    ]
@@ -1,16 +1,33 @@
 # File: app/core/security.py
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Union, Optional
 
 from jose import jwt
-from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> "CryptContext":
+    """
+    Return the bcrypt CryptContext, building it on first use
+
+    passlib is only needed by requests that hash or verify passwords (and
+    by the hashing pool processes), so workers do not import it at startup.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
     """
     Create a JWT token with the given subject and expiration
@@ -18,6 +35,7 @@ def create_access_token(
     Args:
         subject: The subject of the token (typically user ID)
         expires_delta: Optional custom expiration time
+        claims: Optional extra claims to embed (e.g. adm, ver, mexp)
         
     Returns:
         Encoded JWT token as string
@@ -28,7 +46,8 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = dict(claims or {})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "sub": str(subject)})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -43,7 +62,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if the password matches, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """
@@ -55,4 +74,4 @@ def get_password_hash(password: str) -> str:
     Returns:
         Hashed password
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
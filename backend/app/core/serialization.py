@@ -0,0 +1,84 @@
+# File: app/core/serialization.py
+from typing import Any, Iterable, List, Sequence, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, EmailStr, TypeAdapter, create_model
+from sqlalchemy.orm import Query, Session
+
+
+def dumps(data: Any) -> bytes:
+    """Compact JSON, as FastAPI's JSONResponse encodes it, via orjson"""
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+def loads(body: bytes) -> Any:
+    return orjson.loads(body)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson
+
+    Use as a route's response_class so FastAPI's validated output is
+    encoded without the stdlib encoder. Bytes are sent as they are, so a
+    route can also return ORJSONResponse(RowSerializer.dump(rows)).
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def _row_model(schema: Type[BaseModel]) -> Type[BaseModel]:
+    # Rows were validated on the way in; re-checking stored emails costs a
+    # Python call per row, so they are read back as plain strings
+    overrides = {
+        name: (str, ... if field.is_required() else field.default)
+        for name, field in schema.model_fields.items()
+        if field.annotation is EmailStr
+    }
+    if not overrides:
+        return schema
+    return create_model(f"{schema.__name__}Row", __base__=schema, **overrides)
+
+
+class RowSerializer:
+    """
+    Build JSON straight from query rows for one response schema
+
+    The query selects only the model columns the schema declares, and a
+    TypeAdapter compiled once per schema validates and encodes a whole
+    page of row tuples in pydantic-core, instead of FastAPI validating ORM
+    objects one attribute at a time and encoding the result with the
+    stdlib. The output is the same JSON the schema produces as a
+    response_model. Schema fields that are not columns keep their
+    defaults.
+
+    Args:
+        schema: Response schema, e.g. schemas.User
+        model: Mapped model the rows come from
+    """
+
+    def __init__(self, schema: Type[BaseModel], model: Any):
+        table_columns = model.__table__.columns
+        self.columns = [getattr(model, name) for name in schema.model_fields if name in table_columns]
+        self._keys = [column.key for column in self.columns]
+        row_model = _row_model(schema)
+        self._one = TypeAdapter(row_model)
+        self._many = TypeAdapter(List[row_model])
+
+    def query(self, db: Session) -> Query:
+        """A query selecting the schema's columns, in the order dump expects"""
+        return db.query(*self.columns)
+
+    def dump(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        """Serialize rows of query() to a JSON array"""
+        keys = self._keys
+        # Plain dicts validate several times faster than attribute lookups on Row
+        return self._many.dump_json(self._many.validate_python([dict(zip(keys, row)) for row in rows]))
+
+    def dump_one(self, obj: Any) -> bytes:
+        """Serialize one ORM object to a JSON object"""
+        return self._one.dump_json(self._one.validate_python(obj, from_attributes=True))
@@ -0,0 +1,77 @@
+# File: app/core/workers.py
+import asyncio
+import logging
+from typing import Callable, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class PollingWorker:
+    """
+    Background tasks that repeatedly run a blocking drain function
+
+    Each task runs the drain function in the threadpool, so the event loop
+    stays free, and runs it again straight away while it reports work done.
+    Otherwise tasks wake up when notify() is called in this process and
+    poll every poll_interval seconds, which also picks up work that became
+    due or was queued by other processes. notify() may be called from any
+    thread, including sync handlers running in the threadpool.
+    """
+
+    def __init__(self, name: str, drain: Callable[[], int], concurrency: int, poll_interval: float):
+        self.name = name
+        self.drain = drain
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._tasks or self.concurrency <= 0:
+            return
+        self._stopping = False
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    def notify(self) -> None:
+        """Wake the workers after queuing work"""
+        if self._wakeup is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._wakeup.set()
+        else:
+            # asyncio.Event is not thread-safe; hand the set() to the workers' loop
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                done = await run_in_threadpool(self.drain)
+            except Exception:
+                logger.exception("%s worker failed to process a batch", self.name)
+                done = 0
+            if done:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self.notify()
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._wakeup = self._loop = None
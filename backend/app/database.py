@@ -1,26 +1,303 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar, Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.metrics import registry
+
+_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+)
+_checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS",
+)
+_connection_hold = registry.histogram(
+    "db_pool_connection_hold_seconds",
+    "Time a connection stays checked out before being returned",
+)
+_sessions_opened = registry.counter(
+    "db_sessions_total",
+    "Request sessions opened by get_db",
+)
+_sessions_unused = registry.counter(
+    "db_sessions_without_connection_total",
+    "Request sessions closed without ever checking out a connection",
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            _checkout_timeouts.inc()
+            raise
+        finally:
+            _checkout_wait.observe(time.perf_counter() - start)
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool variant for AsyncEngine"""
+
+
+# Async drivers used when DB_ASYNC is on and ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def engine_options(database_url: str, asyncio: bool = False) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments from settings
+
+    SQLite keeps SQLAlchemy's defaults; server databases get a sized,
+    instrumented connection pool and an optional statement timeout.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedAsyncQueuePool if asyncio else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+
+def async_database_url() -> str:
+    """
+    URL of the async engine: ASYNC_DATABASE_URL, or DATABASE_URL with its
+    driver swapped for asyncpg (Postgres) or aiosqlite (SQLite)
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(
+            f"No async driver known for {url.get_backend_name()}; set ASYNC_DATABASE_URL"
+        )
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    started = connection_record.info.pop("checked_out_at", None)
+    if started is not None:
+        _connection_hold.observe(time.perf_counter() - started)
+
+
+# Engine and session factory, created on first use so that importing the
+# app (or running a CLI command that never queries) does not load the
+# database driver or build a pool
+_engine: Optional[Engine] = None
+_sessionmaker: Optional[sessionmaker] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """Return the process-wide Engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                new_engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+                event.listen(new_engine, "checkout", _on_checkout)
+                event.listen(new_engine, "checkin", _on_checkin)
+                _engine = new_engine
+    return _engine
+
+
+def SessionLocal() -> Session:
+    """Create a Session bound to the engine"""
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _sessionmaker()
+
+
+def __getattr__(name: str) -> Any:
+    # `from app.database import engine` keeps working and creates the engine
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Also fires for the sync sessions that back each AsyncSession
+@event.listens_for(Session, "after_begin")
+def _on_session_connection(session, transaction, connection):
+    session.info["used_connection"] = True
+
+
+# Async engine and session factory, created on first use so that sync
+# deployments do not need an async driver installed
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
 
-# Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL)
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_async_engine() -> AsyncEngine:
+    """Return the process-wide AsyncEngine, creating it on first use"""
+    global _async_engine
+    if _async_engine is None:
+        url = async_database_url()
+        _async_engine = create_async_engine(url, **engine_options(url, asyncio=True))
+        event.listen(_async_engine.sync_engine, "checkout", _on_checkout)
+        event.listen(_async_engine.sync_engine, "checkin", _on_checkin)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Create an AsyncSession bound to the async engine"""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        # Objects outlive commits in handlers; expiring them would force
+        # implicit (and in async code, impossible) lazy reloads
+        _async_sessionmaker = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker()
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections, if it was created"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
+
 
 # Create Base class for models
 Base = declarative_base()
 
+
+def _pool_value(method: str) -> float:
+    if _engine is None:
+        return 0.0
+    fn = getattr(_engine.pool, method, None)
+    return float(fn()) if fn else 0.0
+
+
+def pool_capacity() -> float:
+    """Maximum number of connections the pool can hand out"""
+    max_overflow = getattr(_engine.pool, "_max_overflow", 0) if _engine is not None else 0
+    return _pool_value("size") + max(max_overflow, 0)
+
+
+def pool_saturation() -> float:
+    """Fraction of pool capacity currently checked out"""
+    capacity = pool_capacity()
+    return _pool_value("checkedout") / capacity if capacity else 0.0
+
+
+registry.gauge("db_pool_size", "Configured pool size", lambda: _pool_value("size"))
+registry.gauge("db_pool_checked_out", "Connections currently checked out", lambda: _pool_value("checkedout"))
+registry.gauge("db_pool_overflow", "Connections open beyond pool_size", lambda: max(_pool_value("overflow"), 0.0))
+registry.gauge("db_pool_saturation", "Checked-out connections / pool capacity", pool_saturation)
+
+
+def pool_status() -> Dict[str, Any]:
+    """Snapshot of connection pool usage and checkout wait times"""
+    status = {
+        "pool": get_engine().pool.status(),
+        "metrics": registry.snapshot(prefix="db_"),
+    }
+    if _async_engine is not None:
+        status["async_pool"] = _async_engine.pool.status()
+    return status
+
+
 # DB Session Dependency
 def get_db():
     """
     Dependency for getting DB session.
     Yields a SQLAlchemy session and ensures it's closed after use.
+
+    The session checks a connection out of the pool only when it runs its
+    first query, so requests that never touch the database (for example
+    ones served from token claims or caches) do not hold a connection.
     """
     db = SessionLocal()
+    _sessions_opened.inc()
     try:
         yield db
     finally:
+        if not db.info.get("used_connection"):
+            _sessions_unused.inc()
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency for getting an AsyncSession.
+    Yields an AsyncSession and ensures it's closed after use.
+    """
+    db = AsyncSessionLocal()
+    _sessions_opened.inc()
+    try:
+        yield db
+    finally:
+        if not db.info.get("used_connection"):
+            _sessions_unused.inc()
+        await db.close()
+
+
+# Session dependency for handlers ported to run_db: an AsyncSession when
+# DB_ASYNC is on, otherwise the regular sync session
+get_request_db = get_async_db if settings.DB_ASYNC else get_db
+
+T = TypeVar("T")
+
+
+async def run_db(db: Union[Session, AsyncSession], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run synchronous ORM code against a session from get_request_db
+
+    On an AsyncSession the function runs through run_sync, so every query
+    it makes awaits the async driver instead of blocking the event loop.
+    On a sync Session it runs in the threadpool, as a sync handler would,
+    so async handlers and dependencies never query on the event loop.
+
+    Args:
+        db: Session from get_request_db
+        fn: Function taking a sync Session as its first argument
+        *args: Further positional arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        Whatever fn returns
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
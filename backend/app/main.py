@@ -1,40 +1,111 @@
-from fastapi import FastAPI, Depends, HTTPException
+import logging
+
+from fastapi import APIRouter, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.api import auth, users, events, registrations, memberships, payments
+from app.core.cache import check_response_cache_backend
 from app.core.config import settings
-from app.database import engine, Base, get_db
+from app.core.hashing import HashingBusyError, hashing_pool
+from app.core.instrumentation import InstrumentationMiddleware
+from app.core.metrics import registry, render_prometheus
+from app.core.migrations import check_schema_revision
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.database import dispose_async_engine, pool_status
+from app.services.stripe_service import stripe_gateway
+from app.services.waiting_room_service import check_waiting_room_backend
+from app.services.waitlist_service import waitlist_worker
+from app.services.webhook_service import webhook_worker
 import app.models.all_models  # Import all models to ensure they're registered with SQLAlchemy
 
-# Create database tables (in production, use Alembic migrations instead)
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title="Alumni Portal API",
-    description="API for alumni management with events, memberships, and directory",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[settings.FRONTEND_URL],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router, tags=["authentication"])
-app.include_router(users.router, prefix="/users", tags=["users"])
-app.include_router(events.router, prefix="/events", tags=["events"])
-app.include_router(registrations.router, prefix="/registrations", tags=["registrations"])
-app.include_router(memberships.router, prefix="/memberships", tags=["memberships"])
-app.include_router(payments.router, prefix="/payments", tags=["payments"])
-
-@app.get("/", tags=["health"])
+logger = logging.getLogger(__name__)
+
+health_router = APIRouter()
+
+@health_router.get("/")
 def health_check():
     """Health check endpoint"""
     return {"status": "ok", "message": "Alumni Portal API is running"}
+
+@health_router.get("/health/db")
+def database_health():
+    """Connection pool usage, checkout wait times and session counters"""
+    return pool_status()
+
+def metrics():
+    """Every process metric in the Prometheus text format"""
+    return PlainTextResponse(render_prometheus(registry), media_type="text/plain; version=0.0.4")
+
+async def hashing_busy_handler(request: Request, exc: HashingBusyError) -> JSONResponse:
+    """Shed load when the password hashing queue is full"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many login attempts in progress, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+def warm_up() -> None:
+    """Import deferred dependencies in the background once the worker is serving"""
+    if settings.WARM_UP_IMPORTS:
+        stripe_gateway.warm_up()
+
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application
+
+    Nothing here touches the database or imports the heavy optional
+    dependencies: the engine, the Stripe client and the bcrypt context are
+    created on first use, and startup only checks the schema revision.
+    """
+    application = FastAPI(
+        title="Alumni Portal API",
+        description="API for alumni management with events, memberships, and directory",
+        version="1.0.0"
+    )
+
+    # Configure CORS
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=[settings.FRONTEND_URL],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
+
+    # Added last so it is the outermost middleware and times CORS as well
+    if settings.REQUEST_METRICS:
+        application.add_middleware(InstrumentationMiddleware)
+
+    application.add_exception_handler(HashingBusyError, hashing_busy_handler)
+
+    # Tables are created by `alembic upgrade head`; startup only checks the revision
+    application.add_event_handler("startup", check_schema_revision)
+    application.add_event_handler("startup", check_response_cache_backend)
+    application.add_event_handler("startup", check_waiting_room_backend)
+    application.add_event_handler("startup", webhook_worker.start)
+    application.add_event_handler("startup", waitlist_worker.start)
+    application.add_event_handler("startup", warm_up)
+    application.add_event_handler("shutdown", webhook_worker.stop)
+    application.add_event_handler("shutdown", waitlist_worker.stop)
+    application.add_event_handler("shutdown", hashing_pool.shutdown)
+    application.add_event_handler("shutdown", dispose_async_engine)
+    application.add_event_handler("shutdown", stripe_gateway.aclose)
+
+    # Include routers
+    application.include_router(health_router, tags=["health"])
+    if settings.METRICS_ENABLED:
+        application.add_api_route("/metrics", metrics, methods=["GET"], tags=["health"], include_in_schema=False)
+        if not settings.REQUEST_METRICS:
+            logger.warning("METRICS_ENABLED is on but REQUEST_METRICS is off: /metrics has no per-request metrics")
+    application.include_router(auth.router, tags=["authentication"])
+    application.include_router(users.router, prefix="/users", tags=["users"])
+    application.include_router(events.router, prefix="/events", tags=["events"])
+    application.include_router(registrations.router, prefix="/registrations", tags=["registrations"])
+    application.include_router(memberships.router, prefix="/memberships", tags=["memberships"])
+    application.include_router(payments.router, prefix="/payments", tags=["payments"])
+
+    return application
+
+app = create_app()
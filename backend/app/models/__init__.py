@@ -1 +1 @@
-from app.models.all_models import Base, User, Event, Registration, Membership
+from app.models.all_models import Base, User, Event, Registration, Membership, MembershipDailyStat, WebhookEvent, WaitlistEntry
@@ -1,5 +1,5 @@
 # File: app/models/all_models.py
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, Text, DateTime, Date
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Float, Text, DateTime, Date
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -20,6 +20,8 @@ class User(Base):
     company = Column(String)
     location = Column(String)
     is_admin = Column(Boolean, default=False)
+    # Bumped to revoke previously issued access tokens
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     reset_token = Column(String)
     reset_token_expiry = Column(DateTime)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -32,6 +34,12 @@ class User(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Public listing: filter on is_members_only, keyset order by (event_date, id)
+        Index("ix_events_members_only_date", "is_members_only", "event_date", "id"),
+        # Member/admin listing: keyset order by (event_date, id) without a filter
+        Index("ix_events_date_id", "event_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -42,6 +50,14 @@ class Event(Base):
     capacity = Column(Integer)
     image_url = Column(String)
     is_members_only = Column(Boolean, default=False)
+    # Maintained by app.services.event_service; reconcile with `python -m app.cli reconcile-counts`
+    registered_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Waitlist counters maintained by app.services.waitlist_service: positions handed
+    # out, the highest position offered a seat, and cancelled seats (still counted in
+    # registered_count) held for the waitlist but not yet offered
+    waitlist_issued = Column(Integer, nullable=False, default=0, server_default="0")
+    waitlist_offered_through = Column(Integer, nullable=False, default=0, server_default="0")
+    seats_held = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -51,6 +67,11 @@ class Event(Base):
 
 class Registration(Base):
     __tablename__ = "registrations"
+    __table_args__ = (
+        # One registration per user and event; also serves per-event lookups
+        Index("uq_registrations_event_user", "event_id", "user_id", unique=True),
+        Index("ix_registrations_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
@@ -66,8 +87,40 @@ class Registration(Base):
     event = relationship("Event", back_populates="registrations")
 
 
+class WaitlistEntry(Base):
+    """
+    A user's place in the waitlist of a full event, managed by app.services.waitlist_service
+
+    waiting -> offered when a cancelled seat is held for them until
+    offer_expires_at -> claimed by registering, or expired and the seat is
+    offered to the next position.
+    """
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        Index("uq_waitlist_entries_event_user", "event_id", "user_id", unique=True),
+        # Next in line: lowest waiting position of an event
+        Index("ix_waitlist_entries_event_status_position", "event_id", "status", "position"),
+        # Promotion worker: offers past their hold window
+        Index("ix_waitlist_entries_status_expires", "status", "offer_expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # 1-based, in joining order; compare with events.waitlist_offered_through
+    position = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="waiting", server_default="waiting")
+    offer_expires_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
 class Membership(Base):
     __tablename__ = "memberships"
+    __table_args__ = (
+        # Active-membership lookup: user_id, is_active = true, max(end_date)
+        Index("ix_memberships_user_active_end", "user_id", "is_active", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
@@ -82,3 +135,40 @@ class Membership(Base):
 
     # Relationships
     user = relationship("User", back_populates="memberships")
+
+
+class MembershipDailyStat(Base):
+    """
+    Per-day, per-type membership rollup maintained by app.services.membership_service
+
+    new_count/revenue count memberships starting on `day`; ending_count
+    counts active memberships whose end_date is `day`. Rebuild with
+    `python -m app.cli rebuild-membership-stats`.
+    """
+    __tablename__ = "membership_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    membership_type = Column(String, primary_key=True)
+    new_count = Column(Integer, nullable=False, default=0, server_default="0")
+    revenue = Column(Float, nullable=False, default=0.0, server_default="0")
+    ending_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class WebhookEvent(Base):
+    """Outbox of verified Stripe webhook events, processed by app.services.webhook_service"""
+    __tablename__ = "webhook_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Stripe's event id; the unique constraint drops redelivered events
+    stripe_event_id = Column(String, unique=True, nullable=False)
+    event_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    # pending -> processing -> done, or failed after WEBHOOK_MAX_ATTEMPTS
+    status = Column(String, nullable=False, default="pending", server_default="pending", index=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    # When the event may next be claimed; doubles as the lease of a claimed event
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    claim_token = Column(String, index=True)
+    last_error = Column(Text)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True))
@@ -1,15 +1,21 @@
 # Import schemas to make them available when importing from app.schemas
-from app.schemas.user import User, UserCreate, UserUpdate, UserInDB
+from app.schemas.user import User, UserCreate, UserUpdate, UserInDB, UserImportError, UserImportReport
 from app.schemas.token import Token, TokenPayload, Login
 from app.schemas.event import Event, EventCreate, EventUpdate
-from app.schemas.registration import Registration, RegistrationCreate, RegistrationUpdate
+from app.schemas.registration import Registration, RegistrationCreate, RegistrationUpdate, RegistrationWithEvent, RegistrationDetail
 from app.schemas.membership import Membership, MembershipCreate, MembershipUpdate
+from app.schemas.payment import PaymentIntentCreate, PaymentIntentResponse
+from app.schemas.waiting_room import WaitingRoom, WaitingRoomOpen, QueueStatus, QueueTicket
+from app.schemas.waitlist import WaitlistStatus, WaitlistEntry
 
 # This makes "from app.schemas import Token" work
 __all__ = [
-    "User", "UserCreate", "UserUpdate", "UserInDB",
+    "User", "UserCreate", "UserUpdate", "UserInDB", "UserImportError", "UserImportReport",
     "Token", "TokenPayload", "Login",
     "Event", "EventCreate", "EventUpdate",
-    "Registration", "RegistrationCreate", "RegistrationUpdate",
-    "Membership", "MembershipCreate", "MembershipUpdate"
+    "Registration", "RegistrationCreate", "RegistrationUpdate", "RegistrationWithEvent", "RegistrationDetail",
+    "Membership", "MembershipCreate", "MembershipUpdate",
+    "PaymentIntentCreate", "PaymentIntentResponse",
+    "WaitingRoom", "WaitingRoomOpen", "QueueStatus", "QueueTicket",
+    "WaitlistStatus", "WaitlistEntry"
 ]
@@ -3,6 +3,7 @@ from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
 from app.schemas.event import Event
+from app.schemas.user import User
 # Shared properties
 class RegistrationBase(BaseModel):
     event_id: int
@@ -35,4 +36,8 @@ class Registration(RegistrationInDBBase):
 
 # With event details
 class RegistrationWithEvent(Registration):
-    event: Event
\ No newline at end of file
+    event: Event
+
+# With event and attendee details
+class RegistrationDetail(RegistrationWithEvent):
+    user: User
@@ -1,5 +1,6 @@
 
 # File: app/schemas/token.py
+from datetime import date
 from typing import Optional
 from pydantic import BaseModel
 from pydantic.networks import  EmailStr
@@ -9,6 +10,11 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
+    iat: Optional[int] = None
+    # Claims used for stateless authentication
+    adm: Optional[bool] = None
+    ver: Optional[int] = None
+    mexp: Optional[date] = None
 
 # For login
 class Login(BaseModel):
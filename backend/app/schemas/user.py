@@ -50,3 +50,18 @@ class User(UserInDBBase):
 # Properties stored in DB but not returned
 class UserInDB(UserInDBBase):
     hashed_password: str
+
+# A row rejected by a bulk import
+class UserImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    error: str
+
+# Summary returned by a bulk import
+class UserImportReport(BaseModel):
+    rows: int
+    created: int
+    failed: int
+    dry_run: bool = False
+    errors: List[UserImportError] = []
+    errors_truncated: bool = False
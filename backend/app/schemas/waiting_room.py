@@ -0,0 +1,31 @@
+# File: app/schemas/waiting_room.py
+from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+# Properties to receive via API when opening a waiting room
+class WaitingRoomOpen(BaseModel):
+    admit_per_second: float = Field(..., gt=0)
+    burst: int = Field(0, ge=0)
+
+# Waiting room settings and progress of an event
+class WaitingRoom(BaseModel):
+    event_id: int
+    admit_per_second: float
+    burst: int
+    opened_at: datetime
+    issued: int
+    admitted: int
+
+# Where a queued user stands
+class QueueStatus(BaseModel):
+    event_id: int
+    position: int
+    ahead: int
+    admitted: bool
+    retry_after: int
+    admitted_until: Optional[datetime] = None
+
+# Returned when joining the queue; send the token back as X-Queue-Token
+class QueueTicket(QueueStatus):
+    token: str
@@ -0,0 +1,25 @@
+# File: app/schemas/waitlist.py
+from typing import Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+# Where a user stands in an event's waitlist; status is waiting, offered, claimed or expired
+class WaitlistStatus(BaseModel):
+    event_id: int
+    position: int
+    ahead: int
+    status: str
+    offer_expires_at: Optional[datetime] = None
+
+# Waitlist entries as admins see them
+class WaitlistEntry(BaseModel):
+    id: int
+    event_id: int
+    user_id: int
+    position: int
+    status: str
+    offer_expires_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,209 @@
+# File: app/services/event_service.py
+from typing import Any, List, Sequence, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.cache import get_response_cache
+from app.core.serialization import RowSerializer, dumps, loads
+
+# Columns of schemas.Event; event listings are serialized from these rows
+event_rows = RowSerializer(schemas.Event, models.Event)
+
+# Bumped on every event or registration change; cache keys embed the
+# current value, so one increment retires every cached event response.
+EVENT_CACHE_GENERATION_KEY = "events:generation"
+
+
+def user_events(db: Session, user_id: int) -> List[models.Event]:
+    """
+    Get the events a user is registered for, in date order
+
+    One join against the user's registrations; every event returned is
+    marked is_registered.
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+
+    Returns:
+        The user's registered events
+    """
+    events = db.query(models.Event).join(
+        models.Registration, models.Registration.event_id == models.Event.id
+    ).filter(
+        models.Registration.user_id == user_id
+    ).order_by(models.Event.event_date, models.Event.id).all()
+
+    for event in events:
+        event.is_registered = True
+    return events
+
+
+def registered_event_ids(db: Session, user_id: int, event_ids: Sequence[int]) -> Set[int]:
+    """
+    Find which of the given events a user is registered for
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+        event_ids: Events to check
+
+    Returns:
+        The subset of event_ids the user has a registration for
+    """
+    if not event_ids:
+        return set()
+    return {
+        event_id
+        for (event_id,) in db.query(models.Registration.event_id).filter(
+            models.Registration.user_id == user_id,
+            models.Registration.event_id.in_(event_ids),
+        )
+    }
+
+
+def dump_events(events: Any) -> bytes:
+    """
+    Serialize an event or a page of events as the API returns them
+
+    Per-user fields are left unset so the result can be cached and shared
+    between users; see personalize_event_body.
+
+    Args:
+        events: An event, or a list of rows of event_rows.query()
+
+    Returns:
+        The JSON response body
+    """
+    if isinstance(events, list):
+        return event_rows.dump(events)
+    return event_rows.dump_one(events)
+
+
+def personalize_event_body(db: Session, body: bytes, user_id: int) -> bytes:
+    """
+    Fill is_registered into a cached event response body for one user
+
+    Args:
+        db: Database session
+        body: Body produced by dump_events
+        user_id: ID of the current user
+
+    Returns:
+        The personalized JSON response body
+    """
+    data = loads(body)
+    items = data if isinstance(data, list) else [data]
+    registered_ids = registered_event_ids(db, user_id, [item["id"] for item in items])
+    for item in items:
+        item["is_registered"] = item["id"] in registered_ids
+    return dumps(data)
+
+
+def event_cache_key(*parts: Any) -> str:
+    """
+    Build a response cache key in the current event cache generation
+
+    Args:
+        parts: Values identifying the response, e.g. audience and query parameters
+
+    Returns:
+        Cache key string
+    """
+    generation = get_response_cache().get(EVENT_CACHE_GENERATION_KEY) or b"0"
+    return ":".join(["events", generation.decode(), *(str(part) for part in parts)])
+
+
+def invalidate_event_cache() -> None:
+    """Retire every cached event response, after events or registrations change"""
+    get_response_cache().incr(EVENT_CACHE_GENERATION_KEY)
+
+
+def has_capacity(event: models.Event) -> bool:
+    """
+    Check whether an event still has free seats, without querying registrations
+
+    Args:
+        event: The event to check
+
+    Returns:
+        True if the event is unlimited or below capacity
+    """
+    if not event.capacity:
+        return True
+    return (event.registered_count or 0) < event.capacity
+
+
+def reserve_seat(db: Session, event_id: int) -> bool:
+    """
+    Atomically take a seat on an event
+
+    Issues a conditional UPDATE that only increments registered_count while
+    it is below capacity, so concurrent signups cannot oversell. The row lock
+    is held until the caller commits the registration in the same transaction.
+
+    Args:
+        db: Database session
+        event_id: ID of the event
+
+    Returns:
+        True if a seat was reserved, False if the event is full or missing
+    """
+    result = db.execute(
+        update(models.Event)
+        .where(
+            models.Event.id == event_id,
+            or_(
+                models.Event.capacity.is_(None),
+                models.Event.capacity == 0,
+                models.Event.registered_count < models.Event.capacity,
+            ),
+        )
+        .values(registered_count=models.Event.registered_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def release_seat(db: Session, event_id: int) -> None:
+    """
+    Give back a seat on an event after a registration is removed
+
+    Args:
+        db: Database session
+        event_id: ID of the event
+    """
+    db.execute(
+        update(models.Event)
+        .where(models.Event.id == event_id, models.Event.registered_count > 0)
+        .values(registered_count=models.Event.registered_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_registration_counts(db: Session) -> int:
+    """
+    Recompute registered_count for every event from the registrations table
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of events whose counter had drifted and was corrected
+    """
+    actual_count = (
+        select(func.count(models.Registration.id))
+        .where(models.Registration.event_id == models.Event.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(models.Event)
+        .where(models.Event.registered_count != actual_count)
+        .values(registered_count=actual_count)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    invalidate_event_cache()
+    return result.rowcount
@@ -0,0 +1,172 @@
+# File: app/services/export_service.py
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+
+from app import models
+from app.core.config import settings
+from app.database import SessionLocal
+
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _users_query() -> Select:
+    user = models.User
+    # Credentials and reset tokens are never exported
+    return select(
+        user.id, user.email, user.first_name, user.last_name, user.graduation_year, user.major,
+        user.job_title, user.company, user.location, user.is_admin, user.created_at,
+    ).order_by(user.id)
+
+
+def _registrations_query(event_id: Optional[int] = None) -> Select:
+    registration = models.Registration
+    query = (
+        select(
+            registration.id, registration.event_id, models.Event.title.label("event_title"),
+            registration.user_id, models.User.email.label("user_email"), registration.payment_status,
+            registration.payment_intent_id, registration.amount_paid, registration.registered_at,
+            registration.attended,
+        )
+        .outerjoin(models.Event, models.Event.id == registration.event_id)
+        .outerjoin(models.User, models.User.id == registration.user_id)
+        .order_by(registration.id)
+    )
+    if event_id is not None:
+        query = query.where(registration.event_id == event_id)
+    return query
+
+
+def _memberships_query(active_only: bool = False) -> Select:
+    membership = models.Membership
+    query = (
+        select(
+            membership.id, membership.user_id, models.User.email.label("user_email"),
+            membership.membership_type, membership.start_date, membership.end_date,
+            membership.amount_paid, membership.payment_id, membership.is_active, membership.created_at,
+        )
+        .outerjoin(models.User, models.User.id == membership.user_id)
+        .order_by(membership.id)
+    )
+    if active_only:
+        query = query.where(membership.is_active == True, membership.end_date >= date.today())
+    return query
+
+
+DATASETS: Dict[str, Callable[..., Select]] = {
+    "users": _users_query,
+    "registrations": _registrations_query,
+    "memberships": _memberships_query,
+}
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(columns: Sequence[str], batches: Iterable[Sequence[Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([_plain(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+# Shared encoder: json.dumps with options builds a new encoder on every call
+_json_encoder = json.JSONEncoder(ensure_ascii=False, default=_plain)
+
+
+def _encode_ndjson(columns: Sequence[str], batches: Iterable[Sequence[Any]]) -> Iterator[str]:
+    encode = _json_encoder.encode
+    for batch in batches:
+        yield "".join(encode(dict(zip(columns, row))) + "\n" for row in batch)
+
+
+def stream_export(
+    dataset: str,
+    fmt: str,
+    *,
+    compress: bool = False,
+    batch_size: Optional[int] = None,
+    **filters: Any,
+) -> Iterator[bytes]:
+    """
+    Stream a dataset as CSV or NDJSON, optionally gzipped
+
+    Rows are read as plain tuples through a server-side cursor in batches
+    of EXPORT_BATCH_SIZE and encoded batch by batch, so memory use does
+    not depend on table size. The generator owns its database session,
+    because it runs after the request's dependencies have been closed.
+
+    Args:
+        dataset: "users", "registrations" or "memberships"
+        fmt: "csv" or "ndjson"
+        compress: Gzip the output on the fly
+        batch_size: Rows fetched per round trip, EXPORT_BATCH_SIZE by default
+        filters: Dataset filters, e.g. event_id for registrations
+
+    Returns:
+        Iterator of encoded chunks
+    """
+    query = DATASETS[dataset](**filters).execution_options(
+        yield_per=batch_size or settings.EXPORT_BATCH_SIZE
+    )
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    # wbits=31 writes a gzip header and trailer rather than a raw zlib stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    db = SessionLocal()
+    try:
+        result = db.execute(query)
+        for text in encode(list(result.keys()), result.partitions()):
+            chunk = text.encode()
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+def export_response(dataset: str, fmt: str, compress: bool = False, **filters: Any) -> StreamingResponse:
+    """
+    Build a download response streaming a dataset export
+
+    Args:
+        dataset: "users", "registrations" or "memberships"
+        fmt: "csv" or "ndjson"
+        compress: Gzip the output; the file name gets a .gz suffix
+        filters: Dataset filters
+
+    Returns:
+        The streaming response
+
+    Raises:
+        HTTPException: If the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown export format, use one of: {', '.join(FORMATS)}",
+        )
+    filename = f"{dataset}-{date.today().isoformat()}.{fmt}" + (".gz" if compress else "")
+    return StreamingResponse(
+        stream_export(dataset, fmt, compress=compress, **filters),
+        media_type="application/gzip" if compress else FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,239 @@
+# File: app/services/import_service.py
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.config import settings
+from app.core.hashing import hashing_pool
+from app.core.security import get_password_hash
+from app.services import search_service
+
+FORMATS = ("csv", "ndjson")
+
+# (line number, parsed row or None, parse error or None)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import; only the first IMPORT_MAX_REPORTED_ERRORS errors are kept"""
+
+    rows: int = 0
+    created: int = 0
+    failed: int = 0
+    dry_run: bool = False
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, line: int, email: Optional[str], error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "email": email, "error": error})
+
+    @property
+    def errors_truncated(self) -> bool:
+        return self.failed > len(self.errors)
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """
+    Guess the import format from a file name
+
+    Args:
+        filename: Name of the uploaded or local file
+
+    Returns:
+        "csv", "ndjson", or None if the extension is not recognised
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def read_records(stream: BinaryIO, fmt: str) -> Iterator[Record]:
+    """
+    Stream rows from a CSV (with a header row) or NDJSON file
+
+    Rows are parsed lazily, so memory use does not depend on file size.
+    Empty CSV cells are dropped so optional fields fall back to None.
+
+    Args:
+        stream: Binary file object, UTF-8 encoded
+        fmt: "csv" or "ndjson"
+
+    Returns:
+        Iterator of (line number, row, parse error)
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    line_number = 0
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                line_number = reader.line_num
+                yield line_number, {k: v for k, v in row.items() if k is not None and v not in ("", None)}, None
+            return
+
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, row, None
+    except (UnicodeDecodeError, csv.Error) as e:
+        # The rest of the file cannot be read reliably; report and stop
+        yield line_number + 1, None, f"Unreadable file, stopped here: {e}"
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    # Never echo input values: rows carry plain text passwords
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _validate_chunk(
+    db: Session, chunk: List[Record], report: ImportReport, seen: Optional[Dict[str, int]] = None
+) -> List[Tuple[int, schemas.UserCreate]]:
+    """
+    Validate a chunk, reporting bad rows and emails that already exist
+
+    Emails accepted from earlier chunks are recorded in `seen` (email to
+    line), when given, and repeats of them reported as duplicates.
+    """
+    seen = {} if seen is None else seen
+    valid: Dict[str, Tuple[int, schemas.UserCreate]] = {}
+    for line, row, parse_error in chunk:
+        report.rows += 1
+        if parse_error:
+            report.add_error(line, None, parse_error)
+            continue
+        try:
+            user_in = schemas.UserCreate.model_validate(row)
+        except ValidationError as e:
+            email = row.get("email")
+            report.add_error(line, email if isinstance(email, str) else None, _format_validation_error(e))
+            continue
+        first_line = valid[user_in.email][0] if user_in.email in valid else seen.get(user_in.email)
+        if first_line is not None:
+            report.add_error(line, user_in.email, f"Duplicate email, first seen on line {first_line}")
+            continue
+        valid[user_in.email] = (line, user_in)
+
+    # Committed chunks are found here too; a dry run commits nothing, so it relies on seen
+    existing = {
+        email for (email,) in db.query(models.User.email).filter(models.User.email.in_(list(valid)))
+    } if valid else set()
+    for email in existing:
+        line, _ = valid.pop(email)
+        report.add_error(line, email, "Email already registered")
+    seen.update((email, line) for email, (line, _) in valid.items())
+    return sorted(valid.values(), key=lambda item: item[0])
+
+
+def _user_row(user_in: schemas.UserCreate, hashed_password: str) -> Dict[str, Any]:
+    row = user_in.model_dump(exclude={"password"})
+    row.update(hashed_password=hashed_password, is_admin=False, token_version=0)
+    return row
+
+
+def _insert_chunk(db: Session, valid: List[Tuple[int, schemas.UserCreate]], rows: List[Dict[str, Any]],
+                  report: ImportReport) -> None:
+    """Insert a chunk in one executemany, falling back to row by row on a conflict"""
+    try:
+        db.execute(insert(models.User), rows)
+        db.commit()
+        report.created += len(rows)
+        return
+    except IntegrityError:
+        db.rollback()
+
+    # Someone registered one of these emails since validation
+    for (line, user_in), row in zip(valid, rows):
+        try:
+            db.execute(insert(models.User), [row])
+            db.commit()
+            report.created += 1
+        except IntegrityError:
+            db.rollback()
+            report.add_error(line, user_in.email, "Email already registered")
+
+
+def _chunks(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_users(
+    db: Session,
+    records: Iterable[Record],
+    *,
+    chunk_size: Optional[int] = None,
+    hash_workers: Optional[int] = None,
+    dry_run: bool = False,
+) -> ImportReport:
+    """
+    Create users in bulk from streamed rows
+
+    Each chunk is validated with UserCreate, checked against existing
+    emails, hashed in the shared hashing pool (using at most hash_workers
+    of its processes, so logins keep getting a turn) and inserted with
+    one executemany in its own transaction. Rows that fail are reported
+    by line number and skipped; the rest of the file is still imported.
+    A dry run remembers the emails it accepted to report repeats across
+    chunks, since nothing is committed for the database check to find.
+
+    Args:
+        db: Database session
+        records: Rows from read_records
+        chunk_size: Rows per transaction, IMPORT_CHUNK_SIZE by default
+        hash_workers: Hashing pool processes to use, IMPORT_HASH_WORKERS by default
+        dry_run: Only validate, without hashing or inserting
+
+    Returns:
+        The import report
+    """
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    hash_workers = hash_workers or settings.IMPORT_HASH_WORKERS
+    report = ImportReport(dry_run=dry_run)
+    seen: Optional[Dict[str, int]] = {} if dry_run else None
+
+    for chunk in _chunks(records, chunk_size):
+        valid = _validate_chunk(db, chunk, report, seen)
+        # Release the read transaction before the slow hashing step
+        db.rollback()
+        if dry_run or not valid:
+            continue
+        hashes = hashing_pool.map(get_password_hash, [user_in.password for _, user_in in valid], hash_workers)
+        rows = [_user_row(user_in, hashed) for (_, user_in), hashed in zip(valid, hashes)]
+        _insert_chunk(db, valid, rows, report)
+
+    if report.created:
+        search_service.invalidate_index()
+    return report
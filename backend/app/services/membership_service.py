@@ -0,0 +1,359 @@
+# File: app/services/membership_service.py
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, case, func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.cache import get_response_cache
+from app.core.config import settings
+from app.core.principal import Principal
+
+
+class MembershipStatusCache:
+    """
+    Per-process TTL/LRU cache of each user's active membership end date
+
+    The cached value is the latest end_date among the user's active
+    memberships (or None), so an entry that outlives the membership itself
+    still answers correctly when compared against today's date.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Optional[date]]]" = OrderedDict()
+        # Wall-clock time of the last membership change per user, used to
+        # distrust membership claims in tokens issued before the change
+        self._changed_at: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Tuple[bool, Optional[date]]:
+        """
+        Look up a user's cached end date
+
+        Returns:
+            (found, end_date) - found is False on a miss or expired entry
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, user_id: int, end_date: Optional[date]) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, end_date)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+            self._changed_at[user_id] = time.time()
+            self._changed_at.move_to_end(user_id)
+            while len(self._changed_at) > self.max_size:
+                self._changed_at.popitem(last=False)
+
+    def changed_since(self, user_id: int, timestamp: float) -> bool:
+        with self._lock:
+            return self._changed_at.get(user_id, 0.0) >= timestamp
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._changed_at.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+membership_cache = MembershipStatusCache(
+    max_size=settings.MEMBERSHIP_CACHE_MAX_SIZE,
+    ttl_seconds=settings.MEMBERSHIP_CACHE_TTL_SECONDS,
+)
+
+# Membership changes are also published to the response cache, so other
+# workers sharing it (RESPONSE_CACHE_BACKEND=redis) stop trusting mexp claims
+# of tokens issued before the change
+MEMBERSHIP_CHANGED_KEY = "auth:membership_changed:{}"
+
+
+def get_active_membership_end(db: Session, user_id: int) -> Optional[date]:
+    """
+    Get the end date of a user's active membership
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+
+    Returns:
+        The latest end date among active memberships, or None
+    """
+    found, end_date = membership_cache.get(user_id)
+    if found:
+        return end_date
+
+    end_date = db.query(func.max(models.Membership.end_date)).filter(
+        models.Membership.user_id == user_id,
+        models.Membership.is_active == True,
+        models.Membership.end_date >= func.current_date()
+    ).scalar()
+
+    membership_cache.set(user_id, end_date)
+    return end_date
+
+
+def has_active_membership(db: Session, user_id: int) -> bool:
+    """
+    Check whether a user has an active membership
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+
+    Returns:
+        True if the user has an active, unexpired membership
+    """
+    end_date = get_active_membership_end(db, user_id)
+    return end_date is not None and end_date >= date.today()
+
+
+def principal_has_membership(db: Session, principal: Principal) -> bool:
+    """
+    Check membership for a token principal, trusting its mexp claim when safe
+
+    The claim is only used when it is still in the future and no membership
+    change for the user was seen since the token was issued; otherwise the
+    cached lookup decides.
+
+    Args:
+        db: Database session
+        principal: The authenticated principal
+
+    Returns:
+        True if the principal has an active membership
+    """
+    if (
+        principal.membership_expires is not None
+        and principal.membership_expires >= date.today()
+        and principal.issued_at is not None
+        and not membership_changed_since(principal.id, principal.issued_at.timestamp())
+    ):
+        return True
+    return has_active_membership(db, principal.id)
+
+
+def membership_changed_since(user_id: int, timestamp: float) -> bool:
+    """
+    Check whether a user's memberships changed after a point in time
+
+    Args:
+        user_id: ID of the user
+        timestamp: POSIX timestamp, e.g. a token's issued-at time
+
+    Returns:
+        True if this process saw, or another worker published, a membership
+        change at or after timestamp
+    """
+    if membership_cache.changed_since(user_id, timestamp):
+        return True
+    published = get_response_cache().get(MEMBERSHIP_CHANGED_KEY.format(user_id))
+    return published is not None and float(published) >= timestamp
+
+
+def invalidate_membership(user_id: int) -> None:
+    """
+    Drop a user's cached membership status and publish the change
+
+    Call after committing any change to the user's memberships. The
+    published change expires with the last token whose claim it overrides.
+
+    Args:
+        user_id: ID of the user
+    """
+    membership_cache.invalidate(user_id)
+    get_response_cache().set(
+        MEMBERSHIP_CHANGED_KEY.format(user_id), time.time(), ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+
+def _bump_daily_stat(
+    db: Session,
+    day: date,
+    membership_type: str,
+    new_count: int = 0,
+    revenue: float = 0.0,
+    ending_count: int = 0,
+) -> None:
+    """Add to one (day, membership_type) rollup row, creating it if needed"""
+    table = models.MembershipDailyStat.__table__
+    values = {
+        "day": day,
+        "membership_type": membership_type,
+        "new_count": new_count,
+        "revenue": revenue,
+        "ending_count": ending_count,
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table).values(**values)
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.membership_type],
+            set_={
+                "new_count": table.c.new_count + upsert.excluded.new_count,
+                "revenue": table.c.revenue + upsert.excluded.revenue,
+                "ending_count": table.c.ending_count + upsert.excluded.ending_count,
+            },
+        ))
+        return
+
+    updated = db.execute(
+        update(table)
+        .where(table.c.day == day, table.c.membership_type == membership_type)
+        .values(
+            new_count=table.c.new_count + new_count,
+            revenue=table.c.revenue + revenue,
+            ending_count=table.c.ending_count + ending_count,
+        )
+    ).rowcount
+    if not updated:
+        db.execute(insert(table).values(**values))
+
+
+def record_membership_created(db: Session, membership: models.Membership) -> None:
+    """
+    Add a new membership to the daily rollup
+
+    Call in the same transaction that inserts the membership.
+
+    Args:
+        db: Database session
+        membership: The membership being created
+    """
+    _bump_daily_stat(
+        db, membership.start_date, membership.membership_type,
+        new_count=1, revenue=membership.amount_paid or 0.0,
+    )
+    if membership.is_active:
+        _bump_daily_stat(db, membership.end_date, membership.membership_type, ending_count=1)
+
+
+def record_membership_cancelled(db: Session, membership: models.Membership) -> None:
+    """
+    Remove a membership that is being deactivated from the active counts
+
+    Call before flipping is_active, in the same transaction; cancelling an
+    already inactive membership is a no-op.
+
+    Args:
+        db: Database session
+        membership: The membership being cancelled
+    """
+    if membership.is_active:
+        _bump_daily_stat(db, membership.end_date, membership.membership_type, ending_count=-1)
+
+
+def get_membership_stats(db: Session, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Membership statistics from the daily rollup in a single query
+
+    The rollup holds one row per day and type, so the cost does not grow
+    with the number of memberships.
+
+    Args:
+        db: Database session
+        today: Reference date, defaults to date.today()
+
+    Returns:
+        Active memberships by type and in total, memberships started in
+        the last 30 days, active memberships ending in the next 30 days
+        and total revenue
+    """
+    today = today or date.today()
+    stat = models.MembershipDailyStat
+    rows = db.query(
+        stat.membership_type,
+        func.sum(case((stat.day >= today, stat.ending_count), else_=0)),
+        func.sum(case((and_(stat.day >= today, stat.day <= today + timedelta(days=30)), stat.ending_count), else_=0)),
+        func.sum(case((stat.day >= today - timedelta(days=30), stat.new_count), else_=0)),
+        func.sum(stat.revenue),
+    ).group_by(stat.membership_type).all()
+
+    by_type = [{"type": t, "count": int(active)} for t, active, _, _, _ in rows if active]
+    return {
+        "by_type": by_type,
+        "active_memberships": sum(item["count"] for item in by_type),
+        "new_memberships": sum(int(new or 0) for _, _, _, new, _ in rows),
+        "expiring_memberships": sum(int(expiring or 0) for _, _, expiring, _, _ in rows),
+        "total_revenue": float(sum(revenue or 0 for _, _, _, _, revenue in rows)),
+    }
+
+
+def rebuild_membership_stats(db: Session) -> int:
+    """
+    Recompute the daily rollup from the memberships table and commit
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of rollup rows written
+    """
+    membership = models.Membership
+    rollup: Dict[Tuple[date, str], Dict[str, Any]] = {}
+
+    def row(day: date, membership_type: str) -> Dict[str, Any]:
+        return rollup.setdefault((day, membership_type), {
+            "day": day, "membership_type": membership_type,
+            "new_count": 0, "revenue": 0.0, "ending_count": 0,
+        })
+
+    started = db.query(
+        membership.start_date, membership.membership_type,
+        func.count(membership.id), func.sum(membership.amount_paid),
+    ).group_by(membership.start_date, membership.membership_type)
+    for day, membership_type, count, revenue in started:
+        entry = row(day, membership_type)
+        entry["new_count"] = count
+        entry["revenue"] = float(revenue or 0.0)
+
+    ending = db.query(
+        membership.end_date, membership.membership_type, func.count(membership.id),
+    ).filter(
+        membership.is_active == True
+    ).group_by(membership.end_date, membership.membership_type)
+    for day, membership_type, count in ending:
+        row(day, membership_type)["ending_count"] = count
+
+    db.query(models.MembershipDailyStat).delete(synchronize_session=False)
+    if rollup:
+        db.execute(insert(models.MembershipDailyStat), list(rollup.values()))
+    db.commit()
+    return len(rollup)
@@ -0,0 +1,452 @@
+# File: app/services/search_service.py
+import heapq
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, event, func, literal_column, or_, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+
+# Fields matched by substring, as in the original ILIKE filters
+SEARCH_FIELDS = ("first_name", "last_name", "major", "company", "location")
+
+# Trigram and full-text indexes backing directory search on Postgres.
+# Trigram GIN indexes make ILIKE '%term%' index-assisted; the tsvector
+# expression index backs free-text search and must match _document() exactly.
+SEARCH_INDEX_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    *(
+        f"CREATE INDEX IF NOT EXISTS ix_users_{field}_trgm "
+        f"ON users USING gin ({field} gin_trgm_ops)"
+        for field in SEARCH_FIELDS
+    ),
+    "CREATE INDEX IF NOT EXISTS ix_users_search_document ON users USING gin ("
+    "to_tsvector('simple'::regconfig, "
+    + " || ' ' || ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+    + "))",
+]
+
+
+def install_search_indexes(bind) -> None:
+    """
+    Create the Postgres search indexes if they do not exist
+
+    Args:
+        bind: Engine or connection to run the DDL on
+    """
+    if bind.dialect.name != "postgresql":
+        return
+    for statement in SEARCH_INDEX_DDL:
+        bind.execute(text(statement))
+
+
+@event.listens_for(models.User.__table__, "after_create")
+def _create_search_indexes(target, connection, **kw) -> None:
+    install_search_indexes(connection)
+
+
+def resolve_backend(db: Session) -> str:
+    """
+    Pick the search backend for a session
+
+    Returns:
+        "postgres", "memory" or "filter" (unindexed ILIKE, kept for comparison)
+    """
+    backend = settings.SEARCH_BACKEND
+    if backend == "auto":
+        return "postgres" if db.get_bind().dialect.name == "postgresql" else "memory"
+    return backend
+
+
+def search_users(db: Session, **kwargs) -> List[models.User]:
+    """
+    Search the alumni directory, best matches first
+
+    Takes the same arguments as search_users_page and returns only the users.
+    """
+    return search_users_page(db, **kwargs)[0]
+
+
+def search_users_page(
+    db: Session,
+    *,
+    q: Optional[str] = None,
+    name: Optional[str] = None,
+    graduation_year: Optional[int] = None,
+    major: Optional[str] = None,
+    company: Optional[str] = None,
+    location: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+    backend: Optional[str] = None,
+) -> Tuple[List[models.User], Optional[Tuple[float, int]]]:
+    """
+    Fetch one page of directory search results, best matches first
+
+    Results are ordered by (relevance descending, id ascending). Passing the
+    key returned for the previous page as `after` continues from there
+    without an offset; otherwise `skip` is applied.
+
+    Args:
+        db: Database session
+        q: Free text matched against all searchable fields: whole words on
+            Postgres (full-text search), substrings of each word elsewhere
+        name: Substring of first or last name
+        graduation_year: Exact graduation year
+        major: Substring of major
+        company: Substring of company
+        location: Substring of location
+        skip: Number of results to skip (ignored when after is given)
+        limit: Maximum number of results
+        after: (score, id) sort key of the last result of the previous page
+        backend: Override the configured backend
+
+    Returns:
+        (users, next_key) - next_key is None on the last page
+    """
+    filters = {
+        "q": q, "name": name, "graduation_year": graduation_year,
+        "major": major, "company": company, "location": location,
+    }
+    backend = backend or resolve_backend(db)
+    if backend == "memory":
+        scored = get_memory_index(db).search_scored(
+            **filters, after=after, limit=(0 if after else skip) + limit + 1
+        )
+        if not after:
+            scored = scored[skip:]
+        page, more = scored[:limit], len(scored) > limit
+        ids = [user_id for _, user_id in page]
+        users = {u.id: u for u in db.query(models.User).filter(models.User.id.in_(ids))}
+        return [users[i] for i in ids if i in users], (page[-1] if more else None)
+
+    query = _filtered_query(db, **filters)
+    if backend == "postgres":
+        score = _relevance(**filters)
+        query = query.add_columns(score.label("score")).order_by(score.desc(), models.User.id)
+        if after:
+            query = query.filter(or_(
+                score < after[0], and_(score == after[0], models.User.id > after[1])
+            ))
+    else:
+        score = literal_column("0")
+        query = query.add_columns(score.label("score")).order_by(models.User.id)
+        if after:
+            query = query.filter(models.User.id > after[1])
+    if not after and skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    page, more = rows[:limit], len(rows) > limit
+    next_key = (float(page[-1].score), page[-1][0].id) if more else None
+    return [row[0] for row in page], next_key
+
+
+def _document():
+    # Must stay in sync with ix_users_search_document
+    parts = [func.coalesce(getattr(models.User, field), "") for field in SEARCH_FIELDS]
+    combined = parts[0]
+    for part in parts[1:]:
+        combined = combined + " " + part
+    return func.to_tsvector(literal_column("'simple'::regconfig"), combined)
+
+
+def _ts_query(q: str):
+    return func.plainto_tsquery(literal_column("'simple'::regconfig"), q)
+
+
+def _filtered_query(db: Session, *, q, name, graduation_year, major, company, location):
+    query = db.query(models.User)
+    if q:
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.filter(_document().op("@@")(_ts_query(q)))
+        else:
+            for token in q.split():
+                query = query.filter(or_(
+                    *(getattr(models.User, f).ilike(f"%{token}%") for f in SEARCH_FIELDS)
+                ))
+    if name:
+        query = query.filter(
+            (models.User.first_name.ilike(f"%{name}%")) |
+            (models.User.last_name.ilike(f"%{name}%"))
+        )
+    if graduation_year:
+        query = query.filter(models.User.graduation_year == graduation_year)
+    if major:
+        query = query.filter(models.User.major.ilike(f"%{major}%"))
+    if company:
+        query = query.filter(models.User.company.ilike(f"%{company}%"))
+    if location:
+        query = query.filter(models.User.location.ilike(f"%{location}%"))
+    return query
+
+
+def _relevance(*, q, name, graduation_year, major, company, location):
+    # Trigram similarity per filtered field, plus full-text rank for q
+    score = literal_column("0.0")
+    if q:
+        score = score + func.ts_rank(_document(), _ts_query(q))
+    if name:
+        score = score + func.greatest(
+            func.similarity(models.User.first_name, name),
+            func.similarity(models.User.last_name, name),
+        )
+    for field, term in (("major", major), ("company", company), ("location", location)):
+        if term:
+            score = score + func.similarity(getattr(models.User, field), term)
+    return score
+
+
+def _trigrams(value: str) -> Set[str]:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+# Match quality of a term against a field value
+EXACT, PREFIX, SUBSTRING = 3, 2, 1
+
+# Search results grouped by total score: {score: {user_id, ...}}
+ScoreGroups = Dict[int, Set[int]]
+
+
+class InvertedIndex:
+    """
+    In-memory trigram index over the searchable user fields
+
+    Used where pg_trgm is unavailable (SQLite in development and
+    benchmarks). Trigrams index the distinct values of each field, which
+    stay few (names, majors, cities) even with millions of users; matching
+    values are verified by substring, so results equal the ILIKE path.
+    Results are kept as sets of user ids grouped by score so combining
+    filters is done with set operations.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self.built_at = 0.0
+        # Set to have the next search rebuild the index
+        self.stale = False
+
+    def _reset(self) -> None:
+        self._docs: Dict[int, Dict[str, str]] = {}
+        self._years: Dict[Optional[int], Set[int]] = defaultdict(set)
+        self._doc_years: Dict[int, Optional[int]] = {}
+        # field -> value -> user ids, and field -> trigram -> values
+        self._values: Dict[str, Dict[str, Set[int]]] = {f: defaultdict(set) for f in SEARCH_FIELDS}
+        self._grams: Dict[str, Dict[str, Set[str]]] = {f: defaultdict(set) for f in SEARCH_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def build(self, rows: Iterable) -> None:
+        """Replace the index contents with rows of (id, graduation_year, *SEARCH_FIELDS)"""
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._add(row[0], row[1], dict(zip(SEARCH_FIELDS, row[2:])))
+            self.built_at = time.monotonic()
+
+    def add(self, row: Tuple) -> None:
+        """Index or re-index a single row of (id, graduation_year, *SEARCH_FIELDS)"""
+        with self._lock:
+            self._remove(row[0])
+            self._add(row[0], row[1], dict(zip(SEARCH_FIELDS, row[2:])))
+
+    def _add(self, user_id: int, graduation_year: Optional[int], values: Dict[str, Optional[str]]) -> None:
+        doc = {field: (value or "").lower() for field, value in values.items()}
+        self._docs[user_id] = doc
+        self._doc_years[user_id] = graduation_year
+        self._years[graduation_year].add(user_id)
+        for field, value in doc.items():
+            ids = self._values[field][value]
+            if not ids:
+                for gram in _trigrams(value):
+                    self._grams[field][gram].add(value)
+            ids.add(user_id)
+
+    def _remove(self, user_id: int) -> None:
+        doc = self._docs.pop(user_id, None)
+        if doc is None:
+            return
+        self._years[self._doc_years.pop(user_id)].discard(user_id)
+        for field, value in doc.items():
+            ids = self._values[field][value]
+            ids.discard(user_id)
+            if not ids:
+                del self._values[field][value]
+                for gram in _trigrams(value):
+                    self._grams[field][gram].discard(value)
+
+    def _matching_values(self, field: str, term: str) -> Iterable[str]:
+        grams = _trigrams(term)
+        if not grams:
+            # Too short for trigrams: scan the distinct values
+            return [v for v in self._values[field] if term in v]
+        postings = self._grams[field]
+        values = None
+        for gram in sorted(grams, key=lambda g: len(postings.get(g, ()))):
+            found = postings.get(gram)
+            if not found:
+                return []
+            values = set(found) if values is None else values & found
+            if not values:
+                return []
+        return [v for v in values if term in v]
+
+    def _match_any(self, fields, term: str) -> ScoreGroups:
+        """Group users by their best match quality for term across fields"""
+        groups: ScoreGroups = {EXACT: set(), PREFIX: set(), SUBSTRING: set()}
+        for field in fields:
+            for value in self._matching_values(field, term):
+                score = EXACT if value == term else PREFIX if value.startswith(term) else SUBSTRING
+                groups[score] |= self._values[field][value]
+        # Keep only each user's best score
+        groups[PREFIX] -= groups[EXACT]
+        groups[SUBSTRING] -= groups[EXACT] | groups[PREFIX]
+        return {score: ids for score, ids in groups.items() if ids}
+
+    @staticmethod
+    def _combine(left: ScoreGroups, right: ScoreGroups) -> ScoreGroups:
+        """Intersect two result sets, adding scores"""
+        combined: ScoreGroups = defaultdict(set)
+        for left_score, left_ids in left.items():
+            for right_score, right_ids in right.items():
+                ids = left_ids & right_ids
+                if ids:
+                    combined[left_score + right_score] |= ids
+        return dict(combined)
+
+    def _score_groups(self, *, q=None, name=None, graduation_year=None, major=None,
+                      company=None, location=None) -> ScoreGroups:
+        terms = []
+        if q:
+            terms.extend((SEARCH_FIELDS, token) for token in q.lower().split())
+        if name:
+            terms.append((("first_name", "last_name"), name.lower()))
+        for field, term in (("major", major), ("company", company), ("location", location)):
+            if term:
+                terms.append(((field,), term.lower()))
+
+        groups: Optional[ScoreGroups] = None
+        if graduation_year:
+            groups = {0: set(self._years.get(graduation_year, ()))}
+        for fields, term in terms:
+            matched = self._match_any(fields, term)
+            groups = matched if groups is None else self._combine(groups, matched)
+            if not groups:
+                return {}
+        if groups is None:
+            groups = {0: set(self._docs)}
+        return groups
+
+    def search_scored(self, *, limit: Optional[int] = None,
+                      after: Optional[Tuple[float, int]] = None, **filters) -> List[Tuple[int, int]]:
+        """
+        Return (score, id) of matching users ordered by score, then id
+
+        Args:
+            limit: Only order and return this many leading results
+            after: Only return results sorting after this (score, id)
+        """
+        with self._lock:
+            groups = self._score_groups(**filters)
+            results: List[Tuple[int, int]] = []
+            for score in sorted(groups, reverse=True):
+                ids = groups[score]
+                if after is not None:
+                    if score > after[0]:
+                        continue
+                    if score == after[0]:
+                        ids = {i for i in ids if i > after[1]}
+                remaining = None if limit is None else limit - len(results)
+                if remaining is not None and remaining <= 0:
+                    break
+                if remaining is not None and len(ids) > remaining:
+                    ordered = heapq.nsmallest(remaining, ids)
+                else:
+                    ordered = sorted(ids)
+                results.extend((score, user_id) for user_id in ordered)
+            return results
+
+    def search(self, *, limit: Optional[int] = None, **filters) -> List[int]:
+        """Return ids of matching users ordered by score, then id"""
+        return [user_id for _, user_id in self.search_scored(limit=limit, **filters)]
+
+
+_memory_index = InvertedIndex()
+# Elects the thread that rebuilds the index; searches keep using the current
+# one meanwhile and the new index is swapped in once built
+_memory_index_lock = threading.Lock()
+# Users indexed while a rebuild reads the table, replayed onto the new index
+_pending_rows: Optional[Dict[int, Tuple]] = None
+_pending_lock = threading.Lock()
+
+
+def _is_fresh(index: InvertedIndex) -> bool:
+    age = time.monotonic() - index.built_at
+    return bool(index.built_at) and not index.stale and age <= settings.SEARCH_INDEX_REFRESH_SECONDS
+
+
+def get_memory_index(db: Session) -> InvertedIndex:
+    """
+    Get the in-memory index, (re)building it from the database when stale
+
+    Only the first build makes searches wait. Later rebuilds run in one
+    thread while the others search the stale index.
+
+    Args:
+        db: Database session
+
+    Returns:
+        The process-wide inverted index
+    """
+    global _memory_index, _pending_rows
+    index = _memory_index
+    if _is_fresh(index):
+        return index
+    if not _memory_index_lock.acquire(blocking=not index.built_at):
+        return index
+    try:
+        if _is_fresh(_memory_index):
+            return _memory_index
+        with _pending_lock:
+            _pending_rows = {}
+        columns = [models.User.id, models.User.graduation_year]
+        columns += [getattr(models.User, field) for field in SEARCH_FIELDS]
+        rebuilt = InvertedIndex()
+        rebuilt.build(db.query(*columns).yield_per(10000))
+        with _pending_lock:
+            for row in _pending_rows.values():
+                rebuilt.add(row)
+            _memory_index = rebuilt
+        return rebuilt
+    finally:
+        with _pending_lock:
+            _pending_rows = None
+        _memory_index_lock.release()
+
+
+def index_user(user: models.User) -> None:
+    """
+    Update the in-memory index after a user is created or edited
+
+    Args:
+        user: The committed user
+    """
+    row = (user.id, user.graduation_year, *(getattr(user, field) for field in SEARCH_FIELDS))
+    with _pending_lock:
+        if _pending_rows is not None:
+            _pending_rows[user.id] = row
+        index = _memory_index
+    if index.built_at:
+        index.add(row)
+
+
+def invalidate_index() -> None:
+    """Rebuild the in-memory index on the next search, e.g. after a bulk import"""
+    _memory_index.stale = True
@@ -0,0 +1,195 @@
+# File: app/services/stripe_service.py
+import ssl
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Type
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+if TYPE_CHECKING:
+    # stripe (and the httpx client under it) take most of the app's import
+    # time; they are only imported when a payment or webhook first needs them
+    import stripe
+
+# Outbound calls are slower than local work; bucket them accordingly
+STRIPE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0, 30.0)
+
+_attempt_latency = registry.histogram(
+    "stripe_http_request_seconds",
+    "Latency of each HTTP attempt to the Stripe API, retries included",
+    STRIPE_BUCKETS,
+)
+_attempt_errors = registry.counter(
+    "stripe_http_errors_total",
+    "Stripe HTTP attempts that failed before a response (timeouts, resets)",
+)
+_create_intent_latency = registry.histogram(
+    "stripe_create_payment_intent_seconds",
+    "End-to-end latency of creating a payment intent, across retries",
+    STRIPE_BUCKETS,
+)
+_create_intent_failures = registry.counter(
+    "stripe_create_payment_intent_failures_total",
+    "Payment intent creations that raised a StripeError",
+)
+
+
+@lru_cache(maxsize=1)
+def instrumented_http_client_class() -> Type:
+    """Build the InstrumentedHTTPXClient class, importing stripe on first call"""
+    import httpx
+    import stripe
+
+    class InstrumentedHTTPXClient(stripe.HTTPXClient):
+        """
+        Stripe HTTP client backed by one pooled, keep-alive httpx.AsyncClient
+
+        Connections are reused across requests instead of paying a TCP/TLS
+        handshake per call, and every attempt is timed.
+        """
+
+        def __init__(self, timeout: httpx.Timeout, limits: httpx.Limits):
+            super().__init__(timeout=timeout)
+            # Replace the default client so the pool limits apply
+            verify = ssl.create_default_context(cafile=stripe.ca_bundle_path) if self._verify_ssl_certs else False
+            self._client_async = httpx.AsyncClient(verify=verify, limits=limits)
+
+        async def request_async(
+            self,
+            method: str,
+            url: str,
+            headers: Mapping[str, str],
+            post_data=None,
+        ):
+            start = time.perf_counter()
+            try:
+                return await super().request_async(method, url, headers, post_data)
+            except stripe.error.APIConnectionError:
+                _attempt_errors.inc()
+                raise
+            finally:
+                _attempt_latency.observe(time.perf_counter() - start)
+
+    return InstrumentedHTTPXClient
+
+
+class StripeGateway:
+    """
+    Async access to the Stripe API through a shared StripeClient
+
+    The client and its connection pool are created on first use and live
+    for the whole process. Network failures and 409/429/5xx responses are
+    retried up to STRIPE_MAX_RETRIES times with Stripe's backoff; POSTs
+    carry an idempotency key so a retried create is never duplicated.
+    """
+
+    def __init__(self):
+        self._client: Optional["stripe.StripeClient"] = None
+        self._http_client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self) -> "stripe.StripeClient":
+        with self._lock:
+            if self._client is None:
+                import httpx
+                import stripe
+
+                self._http_client = instrumented_http_client_class()(
+                    timeout=httpx.Timeout(
+                        settings.STRIPE_TIMEOUT_SECONDS,
+                        connect=settings.STRIPE_CONNECT_TIMEOUT_SECONDS,
+                    ),
+                    limits=httpx.Limits(
+                        max_connections=settings.STRIPE_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.STRIPE_MAX_CONNECTIONS,
+                    ),
+                )
+                base_addresses = {"api": settings.STRIPE_API_BASE} if settings.STRIPE_API_BASE else {}
+                self._client = stripe.StripeClient(
+                    settings.STRIPE_SECRET_KEY or "",
+                    http_client=self._http_client,
+                    max_network_retries=settings.STRIPE_MAX_RETRIES,
+                    base_addresses=base_addresses,
+                )
+            return self._client
+
+    async def create_payment_intent(
+        self,
+        amount: int,
+        currency: str,
+        metadata: Dict[str, str],
+        idempotency_key: Optional[str] = None,
+    ) -> "stripe.PaymentIntent":
+        """
+        Create a payment intent without blocking the event loop
+
+        Args:
+            amount: Amount in the smallest currency unit (cents)
+            currency: Three-letter ISO currency code
+            metadata: Metadata attached to the intent
+            idempotency_key: Optional key; one is generated when omitted
+
+        Returns:
+            The created PaymentIntent
+
+        Raises:
+            stripe.error.StripeError: If Stripe rejects the request or
+                cannot be reached after retries
+        """
+        import stripe
+
+        options: Dict[str, Any] = {}
+        if idempotency_key:
+            options["idempotency_key"] = idempotency_key
+        start = time.perf_counter()
+        try:
+            return await self._get_client().payment_intents.create_async(
+                params={"amount": amount, "currency": currency, "metadata": metadata},
+                options=options,
+            )
+        except stripe.error.StripeError:
+            _create_intent_failures.inc()
+            raise
+        finally:
+            _create_intent_latency.observe(time.perf_counter() - start)
+
+    def construct_webhook_event(self, payload: bytes, sig_header: Optional[str]) -> "stripe.Event":
+        """
+        Verify a webhook signature and parse the event (no network call)
+
+        Raises:
+            ValueError: If the payload is not valid JSON
+            stripe.error.SignatureVerificationError: If the signature is invalid
+        """
+        import stripe
+
+        return stripe.Webhook.construct_event(
+            payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
+        )
+
+    def warm_up(self) -> threading.Thread:
+        """
+        Import stripe in a background thread
+
+        Called once a worker is serving, so the first payment request does
+        not pay for the import while startup does not wait for it either.
+        """
+        thread = threading.Thread(target=instrumented_http_client_class, name="stripe-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Latency and error metrics of outbound Stripe calls"""
+        return registry.snapshot(prefix="stripe_")
+
+    async def aclose(self) -> None:
+        """Close pooled connections; the client is recreated on next use"""
+        with self._lock:
+            http_client, self._http_client, self._client = self._http_client, None, None
+        if http_client is not None:
+            await http_client.close_async()
+
+
+stripe_gateway = StripeGateway()
@@ -0,0 +1,312 @@
+# File: app/services/waiting_room_service.py
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+
+from app.core.cache import CacheBackend, build_cache_backend
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Header carrying the queue token on status polls and on the payment path
+QUEUE_TOKEN_HEADER = "X-Queue-Token"
+
+# Queue tokens are signed with a key derived from SECRET_KEY so they can
+# never be mistaken for access tokens
+_TOKEN_KEY_SUFFIX = ":waiting-room"
+
+_joined = registry.counter("waiting_room_joined_total", "Queue positions handed out")
+_polls = registry.counter("waiting_room_status_polls_total", "Waiting room status requests")
+_admitted = registry.counter("waiting_room_admitted_total", "Requests let through to the payment path")
+_rejected = registry.counter("waiting_room_rejected_total", "Requests turned away from the payment path")
+
+
+@dataclass(frozen=True)
+class RoomConfig:
+    """
+    Admission schedule of one event's waiting room
+
+    Positions up to base are admitted at `since`, and rate more every
+    second after that, so whether a position is in is a pure function of
+    the clock: no per-user state is kept anywhere.
+    """
+    room_id: str
+    admit_per_second: float
+    burst: int
+    opened_at: float
+    base: float
+    since: float
+
+    def admitted_count(self, now: float) -> int:
+        return int(self.base + self.admit_per_second * max(0.0, now - self.since))
+
+    def admission_time(self, position: int) -> float:
+        if position <= self.base:
+            return self.since
+        return self.since + (position - self.base) / self.admit_per_second
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__)
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "RoomConfig":
+        return cls(**json.loads(raw))
+
+
+@dataclass(frozen=True)
+class QueueStatus:
+    event_id: int
+    position: int
+    ahead: int
+    admitted: bool
+    retry_after: int
+    admitted_until: Optional[datetime]
+
+    def as_dict(self) -> Dict[str, object]:
+        return dict(self.__dict__)
+
+
+def _queue_error(detail: str, status_code: int = status.HTTP_403_FORBIDDEN) -> HTTPException:
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+class WaitingRoom:
+    """
+    Admission control for high-demand event registration launches
+
+    While an event's room is open, users join to get a signed queue token
+    carrying their position, poll a status endpoint that only checks the
+    token signature and the clock, and may only create a payment intent or
+    registration for the event once their position has been admitted.
+    Positions are admitted at admit_per_second, so database and Stripe
+    load stays flat however many users arrive at once.
+
+    Room settings and the position counter live in a CacheBackend: the
+    per-process memory backend for one worker, or Redis to share one queue
+    across workers and hosts. Settings are re-read at most every
+    WAITING_ROOM_CONFIG_TTL_SECONDS per process.
+    """
+
+    def __init__(self, backend: CacheBackend, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.clock = clock
+        self._configs: Dict[int, Tuple[float, Optional[RoomConfig]]] = {}
+        self._lock = threading.Lock()
+
+    def _config_key(self, event_id: int) -> str:
+        return f"waiting-room:{event_id}:config"
+
+    def _issued_key(self, event_id: int) -> str:
+        return f"waiting-room:{event_id}:issued"
+
+    def config(self, event_id: int) -> Optional[RoomConfig]:
+        """Settings of an event's waiting room, or None when it is closed"""
+        now = time.monotonic()
+        cached = self._configs.get(event_id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        raw = self.backend.get(self._config_key(event_id))
+        config = RoomConfig.from_json(raw) if raw is not None else None
+        with self._lock:
+            self._configs[event_id] = (now + settings.WAITING_ROOM_CONFIG_TTL_SECONDS, config)
+        return config
+
+    def open(self, event_id: int, admit_per_second: float, burst: int = 0) -> RoomConfig:
+        """
+        Open an event's waiting room, or change the admission rate of an open one
+
+        Reconfiguring keeps everyone admitted so far admitted and keeps
+        queue positions; opening a closed room starts a new queue.
+
+        Args:
+            event_id: ID of the event
+            admit_per_second: Positions admitted per second
+            burst: Positions admitted immediately when the room opens
+
+        Returns:
+            The room settings
+        """
+        now = self.clock()
+        self._forget(event_id)
+        current = self.config(event_id)
+        if current is None:
+            self.backend.delete(self._issued_key(event_id))
+            config = RoomConfig(
+                room_id=uuid.uuid4().hex, admit_per_second=admit_per_second, burst=burst,
+                opened_at=now, base=float(burst), since=now,
+            )
+        else:
+            config = RoomConfig(
+                room_id=current.room_id, admit_per_second=admit_per_second, burst=burst,
+                opened_at=current.opened_at, base=float(current.admitted_count(now)), since=now,
+            )
+        self.backend.set(self._config_key(event_id), config.to_json())
+        self._forget(event_id)
+        return config
+
+    def close(self, event_id: int) -> bool:
+        """Close an event's waiting room; outstanding queue tokens stop mattering"""
+        removed = self.backend.delete(self._config_key(event_id), self._issued_key(event_id))
+        self._forget(event_id)
+        return bool(removed)
+
+    def _forget(self, event_id: int) -> None:
+        with self._lock:
+            self._configs.pop(event_id, None)
+
+    def issued(self, event_id: int) -> int:
+        """Number of positions handed out so far"""
+        raw = self.backend.get(self._issued_key(event_id))
+        return int(raw) if raw is not None else 0
+
+    def _status(self, event_id: int, config: RoomConfig, position: int) -> QueueStatus:
+        now = self.clock()
+        admitted_count = config.admitted_count(now)
+        admitted = position <= admitted_count
+        admitted_until = None
+        if admitted:
+            retry_after = 0
+            admitted_until = datetime.fromtimestamp(
+                config.admission_time(position) + settings.WAITING_ROOM_ADMISSION_SECONDS, tz=timezone.utc
+            )
+        else:
+            # Poll about twice before the expected admission, not every second
+            wait = config.admission_time(position) - now
+            retry_after = max(1, min(settings.WAITING_ROOM_MAX_POLL_SECONDS, math.ceil(wait / 2)))
+        return QueueStatus(
+            event_id=event_id,
+            position=position,
+            ahead=max(0, position - admitted_count - 1),
+            admitted=admitted,
+            retry_after=retry_after,
+            admitted_until=admitted_until,
+        )
+
+    def _sign(self, config: RoomConfig, event_id: int, user_id: int, position: int) -> str:
+        claims = {"sub": str(user_id), "evt": event_id, "room": config.room_id, "pos": position}
+        return jwt.encode(claims, settings.SECRET_KEY + _TOKEN_KEY_SUFFIX, algorithm=settings.ALGORITHM)
+
+    def _verify(self, token: Optional[str], event_id: int) -> Tuple[RoomConfig, int, int]:
+        config = self.config(event_id)
+        if config is None:
+            raise _queue_error("No waiting room is open for this event", status.HTTP_404_NOT_FOUND)
+        if not token:
+            raise _queue_error("Join the waiting room for this event first")
+        try:
+            claims = jwt.decode(token, settings.SECRET_KEY + _TOKEN_KEY_SUFFIX, algorithms=[settings.ALGORITHM])
+            user_id, position = int(claims["sub"]), int(claims["pos"])
+        except (JWTError, KeyError, TypeError, ValueError):
+            raise _queue_error("Invalid queue token")
+        if claims.get("evt") != event_id or claims.get("room") != config.room_id:
+            raise _queue_error("Queue token is for another event or an earlier queue, join again")
+        return config, user_id, position
+
+    def join(self, event_id: int, user_id: int, token: Optional[str] = None) -> Tuple[str, QueueStatus]:
+        """
+        Hand out the next queue position
+
+        A user sending back a valid token of their own for the current
+        queue keeps their position instead of going to the back.
+
+        Args:
+            event_id: ID of the event
+            user_id: ID of the joining user
+            token: The user's current queue token, if any
+
+        Returns:
+            The signed queue token and the user's status
+
+        Raises:
+            HTTPException: If no waiting room is open for the event
+        """
+        config = self.config(event_id)
+        if config is None:
+            raise _queue_error("No waiting room is open for this event", status.HTTP_404_NOT_FOUND)
+        if token:
+            try:
+                _, token_user, position = self._verify(token, event_id)
+                if token_user == user_id:
+                    return token, self._status(event_id, config, position)
+            except HTTPException:
+                pass
+        position = self.backend.incr(self._issued_key(event_id))
+        _joined.inc()
+        return self._sign(config, event_id, user_id, position), self._status(event_id, config, position)
+
+    def status(self, event_id: int, token: Optional[str]) -> QueueStatus:
+        """
+        Where a queue token stands; no database access
+
+        Raises:
+            HTTPException: If the room is closed or the token is invalid
+        """
+        _polls.inc()
+        config, _, position = self._verify(token, event_id)
+        return self._status(event_id, config, position)
+
+    def check_admission(self, event_id: Optional[int], user_id: int, token: Optional[str]) -> None:
+        """
+        Guard the payment path of an event with an open waiting room
+
+        Does nothing when the event has no open room. Call before any
+        database work so queued users are turned away cheaply.
+
+        Args:
+            event_id: ID of the event being paid for or registered to
+            user_id: ID of the current user
+            token: Value of the X-Queue-Token header
+
+        Raises:
+            HTTPException: 403 without a valid token of this user, 429 with
+                Retry-After while the position is not yet admitted or after
+                its admission window has passed
+        """
+        if event_id is None or self.config(event_id) is None:
+            return
+        try:
+            config, token_user, position = self._verify(token, event_id)
+            if token_user != user_id:
+                raise _queue_error("Queue token belongs to another user")
+        except HTTPException:
+            _rejected.inc()
+            raise
+        queue_status = self._status(event_id, config, position)
+        if not queue_status.admitted:
+            _rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Waiting room: {queue_status.ahead} ahead of you",
+                headers={"Retry-After": str(queue_status.retry_after)},
+            )
+        if queue_status.admitted_until.timestamp() < self.clock():
+            _rejected.inc()
+            raise _queue_error("Your turn in the waiting room has expired, join again")
+        _admitted.inc()
+
+
+# Queues are only shared across workers through redis, so use it whenever it is configured
+WAITING_ROOM_BACKEND = settings.WAITING_ROOM_BACKEND or ("redis" if settings.REDIS_URL else "memory")
+
+# Two keys per open room; the memory backend only needs to hold a few
+waiting_room = WaitingRoom(build_cache_backend(WAITING_ROOM_BACKEND, max_entries=1024))
+
+
+def check_waiting_room_backend() -> None:
+    """Warn at startup when several workers would each run their own waiting rooms"""
+    if WAITING_ROOM_BACKEND == "memory" and settings.WEB_CONCURRENCY > 1:
+        logger.warning(
+            "WAITING_ROOM_BACKEND is memory with WEB_CONCURRENCY=%d: every worker keeps its own queue, "
+            "so rooms admit %d times their admit_per_second and positions differ between workers. "
+            "Set REDIS_URL (or WAITING_ROOM_BACKEND=redis) before opening a waiting room.",
+            settings.WEB_CONCURRENCY, settings.WEB_CONCURRENCY,
+        )
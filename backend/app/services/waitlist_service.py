@@ -0,0 +1,369 @@
+# File: app/services/waitlist_service.py
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.workers import PollingWorker
+from app.database import SessionLocal
+from app.services.event_service import has_capacity, invalidate_event_cache, release_seat, reserve_seat
+
+logger = logging.getLogger(__name__)
+
+WAITING = "waiting"
+OFFERED = "offered"
+CLAIMED = "claimed"
+EXPIRED = "expired"
+
+_joined = registry.counter("waitlist_joined_total", "Waitlist positions handed out")
+_offered = registry.counter("waitlist_offers_total", "Cancelled seats offered to the next person in line")
+_claimed = registry.counter("waitlist_claimed_total", "Offered seats taken by registering")
+_expired = registry.counter("waitlist_offers_expired_total", "Offers that lapsed and moved down the line")
+_released = registry.counter("waitlist_seats_released_total", "Held seats given back because nobody was waiting")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _entry_status(event_id: int, position: int, entry_status: str,
+                  offer_expires_at: Optional[datetime], offered_through: int) -> Dict[str, Any]:
+    if offer_expires_at is not None and offer_expires_at.tzinfo is None:
+        # SQLite hands back naive datetimes; they are stored in UTC
+        offer_expires_at = offer_expires_at.replace(tzinfo=timezone.utc)
+    if entry_status == OFFERED and offer_expires_at <= _utcnow():
+        # The worker has not moved the seat on yet, but it can no longer be claimed
+        entry_status = EXPIRED
+    return {
+        "event_id": event_id,
+        "position": position,
+        "ahead": max(0, position - offered_through - 1) if entry_status == WAITING else 0,
+        "status": entry_status,
+        "offer_expires_at": offer_expires_at if entry_status == OFFERED else None,
+    }
+
+
+def waitlist_status(db: Session, event_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Where a user stands in an event's waitlist, in one indexed lookup
+
+    `ahead` is the user's position minus the highest position offered a
+    seat so far, so it never needs a count of the entries in front. People
+    ahead who have left are still counted until the line passes them.
+
+    Args:
+        db: Database session
+        event_id: ID of the event
+        user_id: ID of the user
+
+    Returns:
+        The user's position, people ahead, status and offer expiry, or
+        None if the user is not on the waitlist
+    """
+    row = (
+        db.query(
+            models.WaitlistEntry.position,
+            models.WaitlistEntry.status,
+            models.WaitlistEntry.offer_expires_at,
+            models.Event.waitlist_offered_through,
+        )
+        .join(models.Event, models.Event.id == models.WaitlistEntry.event_id)
+        .filter(models.WaitlistEntry.event_id == event_id, models.WaitlistEntry.user_id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+    return _entry_status(event_id, *row)
+
+
+def join_waitlist(db: Session, event: models.Event, user_id: int) -> Dict[str, Any]:
+    """
+    Put a user at the back of a full event's waitlist
+
+    Joining again while waiting or holding an offer keeps the current
+    place; users whose offer lapsed, or who cancelled a registration they
+    claimed, go to the back.
+
+    Args:
+        db: Database session
+        event: The event
+        user_id: ID of the joining user
+
+    Returns:
+        The user's waitlist status
+
+    Raises:
+        HTTPException: If the event still has free seats
+    """
+    entry = db.query(models.WaitlistEntry).filter(
+        models.WaitlistEntry.event_id == event.id,
+        models.WaitlistEntry.user_id == user_id,
+    ).first()
+    if entry is not None and entry.status in (WAITING, OFFERED):
+        return waitlist_status(db, event.id, user_id)
+
+    if has_capacity(event):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Event has free seats, register instead",
+        )
+
+    # Take the next position; the row lock is held until the commit below
+    db.execute(
+        update(models.Event)
+        .where(models.Event.id == event.id)
+        .values(waitlist_issued=models.Event.waitlist_issued + 1)
+        .execution_options(synchronize_session=False)
+    )
+    position = db.query(models.Event.waitlist_issued).filter(models.Event.id == event.id).scalar()
+
+    if entry is None:
+        db.add(models.WaitlistEntry(event_id=event.id, user_id=user_id, position=position, status=WAITING))
+    else:
+        entry.position = position
+        entry.status = WAITING
+        entry.offer_expires_at = None
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request of the same user joined first
+        db.rollback()
+    else:
+        _joined.inc()
+    return waitlist_status(db, event.id, user_id)
+
+
+def leave_waitlist(db: Session, event_id: int, user_id: int) -> bool:
+    """
+    Take a user off an event's waitlist, handing back a seat offered to them
+
+    Returns:
+        False if the user was not on the waitlist
+    """
+    entry = db.query(models.WaitlistEntry).filter(
+        models.WaitlistEntry.event_id == event_id,
+        models.WaitlistEntry.user_id == user_id,
+    ).first()
+    if entry is None:
+        return False
+
+    handed_back = entry.status == OFFERED
+    if handed_back:
+        _hold_seat(db, event_id)
+    db.delete(entry)
+    db.commit()
+    if handed_back:
+        waitlist_worker.notify()
+    return True
+
+
+def _hold_seat(db: Session, event_id: int) -> None:
+    # The seat stays counted in registered_count, so public signups cannot take it
+    db.execute(
+        update(models.Event)
+        .where(models.Event.id == event_id)
+        .values(seats_held=models.Event.seats_held + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def free_seat(db: Session, event_id: int) -> bool:
+    """
+    Give back a seat after a registration is removed, holding it for the waitlist
+
+    When anyone is waiting the seat is held for the promotion worker to
+    offer to the next position; otherwise it is released as usual. Does
+    not commit: call waitlist_worker.notify() after committing when this
+    returns True.
+
+    Args:
+        db: Database session
+        event_id: ID of the event
+
+    Returns:
+        True if the seat was held for the waitlist
+    """
+    waiting = db.query(models.WaitlistEntry.id).filter(
+        models.WaitlistEntry.event_id == event_id,
+        models.WaitlistEntry.status == WAITING,
+    ).first()
+    if waiting is None:
+        release_seat(db, event_id)
+        return False
+    _hold_seat(db, event_id)
+    return True
+
+
+def has_offer(db: Session, event_id: int, user_id: int) -> bool:
+    """Check whether a seat on the event is currently offered to the user"""
+    return db.query(models.WaitlistEntry.id).filter(
+        models.WaitlistEntry.event_id == event_id,
+        models.WaitlistEntry.user_id == user_id,
+        models.WaitlistEntry.status == OFFERED,
+        models.WaitlistEntry.offer_expires_at > _utcnow(),
+    ).first() is not None
+
+
+def take_seat(db: Session, event_id: int, user_id: int) -> bool:
+    """
+    Take a seat for a new registration: one offered to the user, or a free one
+
+    A seat offered from the waitlist is already counted in
+    registered_count, so claiming it only marks the offer claimed. A
+    user who takes a free seat instead leaves the waitlist, so no offer
+    later holds a second seat for them; a lapsed offer is left for
+    promote to move down the line. Does not commit.
+
+    Args:
+        db: Database session
+        event_id: ID of the event
+        user_id: ID of the registering user
+
+    Returns:
+        True if a seat was taken, False if the event is full for this user
+    """
+    entry = (
+        models.WaitlistEntry.event_id == event_id,
+        models.WaitlistEntry.user_id == user_id,
+    )
+    offer = db.execute(
+        update(models.WaitlistEntry)
+        .where(*entry, models.WaitlistEntry.status == OFFERED, models.WaitlistEntry.offer_expires_at > _utcnow())
+        .values(status=CLAIMED)
+        .execution_options(synchronize_session=False)
+    )
+    if offer.rowcount == 1:
+        _claimed.inc()
+        return True
+    if not reserve_seat(db, event_id):
+        return False
+    db.execute(
+        update(models.WaitlistEntry)
+        .where(*entry, models.WaitlistEntry.status == WAITING)
+        .values(status=CLAIMED)
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+
+def promote(db: Session, event_id: int) -> int:
+    """
+    Offer an event's held seats down its waitlist, and commit
+
+    Lapsed offers are expired and their seats held again first. Each held
+    seat is then offered, in position order, for WAITLIST_HOLD_SECONDS;
+    seats nobody is waiting for are released to public signups. The event
+    row is locked for the duration, so concurrent workers take turns.
+
+    Args:
+        db: Database session
+        event_id: ID of the event
+
+    Returns:
+        Number of offers made, expired and seats released
+    """
+    now = _utcnow()
+    event = db.query(models.Event).filter(models.Event.id == event_id).with_for_update().first()
+    if event is None:
+        db.rollback()
+        return 0
+
+    lapsed = db.execute(
+        update(models.WaitlistEntry)
+        .where(
+            models.WaitlistEntry.event_id == event_id,
+            models.WaitlistEntry.status == OFFERED,
+            models.WaitlistEntry.offer_expires_at <= now,
+        )
+        .values(status=EXPIRED)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    free = event.seats_held + lapsed
+
+    offered, released = 0, 0
+    if free:
+        candidates = db.query(models.WaitlistEntry.id, models.WaitlistEntry.position).filter(
+            models.WaitlistEntry.event_id == event_id,
+            models.WaitlistEntry.status == WAITING,
+        ).order_by(models.WaitlistEntry.position).limit(free).all()
+        if candidates:
+            # Entries removed since the select are skipped; their seats stay held
+            offered = db.execute(
+                update(models.WaitlistEntry)
+                .where(
+                    models.WaitlistEntry.id.in_([entry_id for entry_id, _ in candidates]),
+                    models.WaitlistEntry.status == WAITING,
+                )
+                .values(status=OFFERED, offer_expires_at=now + timedelta(seconds=settings.WAITLIST_HOLD_SECONDS))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            event.waitlist_offered_through = max(event.waitlist_offered_through, candidates[-1][1])
+        if len(candidates) < free:
+            released = free - len(candidates)
+            event.registered_count = max(0, event.registered_count - released)
+    event.seats_held = free - offered - released
+    db.commit()
+
+    if released:
+        invalidate_event_cache()
+    _offered.inc(offered)
+    _expired.inc(lapsed)
+    _released.inc(released)
+    if offered or lapsed:
+        logger.info("Waitlist of event %s: %d offered, %d expired, %d released", event_id, offered, lapsed, released)
+    return offered + lapsed + released
+
+
+def process_waitlists(db: Session) -> int:
+    """
+    Promote every event with held seats or lapsed offers
+
+    Returns:
+        Number of offers made, expired and seats released
+    """
+    now = _utcnow()
+    # events is small enough to scan; lapsed offers come off their own index
+    event_ids = {event_id for (event_id,) in db.query(models.Event.id).filter(models.Event.seats_held > 0)}
+    event_ids.update(
+        event_id
+        for (event_id,) in db.query(models.WaitlistEntry.event_id).filter(
+            models.WaitlistEntry.status == OFFERED,
+            models.WaitlistEntry.offer_expires_at <= now,
+        ).distinct()
+    )
+    db.rollback()
+    return sum(promote(db, event_id) for event_id in sorted(event_ids))
+
+
+def drain() -> int:
+    """
+    Process waitlists until nothing is left to promote, in a session of its own
+
+    Returns:
+        Number of offers made, expired and seats released
+    """
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            changed = process_waitlists(db)
+            total += changed
+            if not changed:
+                return total
+    finally:
+        db.close()
+
+
+waitlist_worker = PollingWorker(
+    "Waitlist",
+    drain,
+    concurrency=settings.WAITLIST_WORKERS,
+    poll_interval=settings.WAITLIST_POLL_INTERVAL_SECONDS,
+)
@@ -0,0 +1,406 @@
+# File: app/services/webhook_service.py
+import json
+import logging
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.workers import PollingWorker
+from app.database import SessionLocal
+from app.services.event_service import invalidate_event_cache
+from app.services.membership_service import invalidate_membership, record_membership_created
+from app.services.waitlist_service import take_seat
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+# What applying an event created: ("registration", event_id) or ("membership", user_id)
+Change = Tuple[str, int]
+
+
+class PaymentNeedsAttention(Exception):
+    """A paid event that cannot be applied without an operator; failed at once, not retried"""
+
+_received = registry.counter("webhook_events_received_total", "Verified webhook deliveries")
+_duplicates = registry.counter("webhook_events_duplicate_total", "Deliveries dropped as already enqueued")
+_processed = registry.counter("webhook_events_processed_total", "Events processed successfully")
+_retried = registry.counter("webhook_events_retried_total", "Processing failures scheduled for retry")
+_dead = registry.counter(
+    "webhook_events_failed_total", "Events given up on after WEBHOOK_MAX_ATTEMPTS or needing attention"
+)
+_batch_latency = registry.histogram("webhook_batch_seconds", "Time to claim and process one batch")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_event(db: Session, event: Dict[str, Any], payload: bytes) -> bool:
+    """
+    Durably store a verified webhook event for background processing
+
+    Args:
+        db: Database session
+        event: The verified Stripe event
+        payload: Raw request body the event was parsed from
+
+    Returns:
+        True if the event was stored, False if it was already enqueued
+    """
+    _received.inc()
+    db.add(models.WebhookEvent(
+        stripe_event_id=event["id"],
+        event_type=event["type"],
+        payload=payload.decode("utf-8"),
+        status=PENDING,
+        next_attempt_at=_utcnow(),
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Stripe redelivered an event we already have
+        db.rollback()
+        _duplicates.inc()
+        return False
+    return True
+
+
+def claim_batch(db: Session, batch_size: int) -> List[models.WebhookEvent]:
+    """
+    Claim up to batch_size due events for this worker
+
+    A single UPDATE stamps the events with a fresh claim token, counts the
+    attempt and pushes next_attempt_at out by WEBHOOK_LEASE_SECONDS, so
+    concurrent workers never claim the same event and events of a crashed
+    worker become due again once the lease runs out. An event whose lease
+    ran out on its last attempt is failed instead, so an event that kills
+    its worker is not retried forever. On Postgres the candidate rows are
+    picked with FOR UPDATE SKIP LOCKED so workers do not wait on each other.
+
+    Args:
+        db: Database session
+        batch_size: Maximum number of events to claim
+
+    Returns:
+        The claimed events, oldest first
+    """
+    now = _utcnow()
+    token = uuid.uuid4().hex
+    abandoned = db.execute(
+        update(models.WebhookEvent)
+        .where(
+            models.WebhookEvent.status == PROCESSING,
+            models.WebhookEvent.next_attempt_at <= now,
+            models.WebhookEvent.attempts >= settings.WEBHOOK_MAX_ATTEMPTS,
+        )
+        .values(status=FAILED, claim_token=None, last_error="Lease expired on the last attempt")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if abandoned:
+        _dead.inc(abandoned)
+        logger.error("Gave up on %d webhook event(s) whose lease expired on the last attempt", abandoned)
+    due = (
+        select(models.WebhookEvent.id)
+        .where(
+            models.WebhookEvent.status.in_([PENDING, PROCESSING]),
+            models.WebhookEvent.next_attempt_at <= now,
+        )
+        .order_by(models.WebhookEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    db.execute(
+        update(models.WebhookEvent)
+        .where(models.WebhookEvent.id.in_(due.scalar_subquery()))
+        .values(
+            status=PROCESSING,
+            claim_token=token,
+            attempts=models.WebhookEvent.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=settings.WEBHOOK_LEASE_SECONDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return (
+        db.query(models.WebhookEvent)
+        .filter(models.WebhookEvent.claim_token == token)
+        .order_by(models.WebhookEvent.id)
+        .all()
+    )
+
+
+def handle_successful_payment(db: Session, payment_intent: Dict[str, Any]) -> Optional[Change]:
+    """
+    Create the registration or membership paid for by a payment intent
+
+    Idempotent: a payment intent that already produced a registration or
+    membership is skipped. Does not commit.
+
+    Args:
+        db: Database session
+        payment_intent: The payment intent object of the event
+
+    Returns:
+        ("registration", event_id) or ("membership", user_id) for what was
+        created, or None if nothing changed
+
+    Raises:
+        PaymentNeedsAttention: If a registration was paid for but the event is full
+    """
+    metadata = payment_intent.get("metadata") or {}
+    user_id = int(metadata.get("user_id"))
+    payment_type = metadata.get("type")
+
+    if payment_type == "event":
+        event_id = int(metadata.get("event_id"))
+
+        # Skip registrations this payment (or an earlier one) already created
+        existing = db.query(models.Registration.id).filter(
+            or_(
+                models.Registration.payment_intent_id == payment_intent["id"],
+                (models.Registration.event_id == event_id) & (models.Registration.user_id == user_id),
+            )
+        ).first()
+        if existing:
+            return None
+
+        # Get event price
+        event = db.query(models.Event).filter(models.Event.id == event_id).first()
+        if not event:
+            return None
+
+        # Claim a seat offered from the waitlist, or reserve one (atomic capacity check)
+        if not take_seat(db, event_id, user_id):
+            # Paid but unseated: fail the event so it is found and replayed, or refunded
+            raise PaymentNeedsAttention(
+                f"Event {event_id} is at capacity; payment {payment_intent['id']} needs a seat or a refund"
+            )
+
+        # Create registration
+        db.add(models.Registration(
+            user_id=user_id,
+            event_id=event_id,
+            payment_status="paid",
+            payment_intent_id=payment_intent["id"],
+            amount_paid=event.price,
+        ))
+        # Make the row visible to later events of the same batch
+        db.flush()
+        return ("registration", event_id)
+
+    elif payment_type == "membership":
+        existing = db.query(models.Membership.id).filter(
+            models.Membership.payment_id == payment_intent["id"]
+        ).first()
+        if existing:
+            return None
+
+        membership_type = metadata.get("membership_type")
+
+        # Set dates based on membership type
+        start_date = date.today()
+        end_date = start_date
+
+        if membership_type == "monthly":
+            end_date = start_date + timedelta(days=30)
+        elif membership_type == "annual":
+            end_date = date(start_date.year + 1, start_date.month, start_date.day)
+        elif membership_type == "lifetime":
+            end_date = date(start_date.year + 99, start_date.month, start_date.day)
+
+        # Create membership
+        membership = models.Membership(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            membership_type=membership_type,
+            payment_id=payment_intent["id"],
+            amount_paid=payment_intent["amount"] / 100,  # convert from cents
+            is_active=True,
+        )
+        db.add(membership)
+        record_membership_created(db, membership)
+        db.flush()
+        return ("membership", user_id)
+
+    return None
+
+
+def apply_event(db: Session, webhook_event: models.WebhookEvent) -> Optional[Change]:
+    """
+    Apply one stored event's side effects and mark it done, without committing
+
+    Returns:
+        The change made, as returned by handle_successful_payment
+    """
+    event = json.loads(webhook_event.payload)
+    change = None
+    if webhook_event.event_type == "payment_intent.succeeded":
+        change = handle_successful_payment(db, event["data"]["object"])
+    webhook_event.status = DONE
+    webhook_event.processed_at = _utcnow()
+    webhook_event.claim_token = None
+    webhook_event.last_error = None
+    return change
+
+
+def _schedule_retry(db: Session, event_id: int, error: Exception) -> None:
+    # The attempt was counted when claim_batch took the lease
+    webhook_event = db.get(models.WebhookEvent, event_id)
+    webhook_event.claim_token = None
+    webhook_event.last_error = f"{type(error).__name__}: {error}"
+    if isinstance(error, PaymentNeedsAttention) or webhook_event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+        webhook_event.status = FAILED
+        _dead.inc()
+        logger.error("Giving up on webhook event %s: %s", webhook_event.stripe_event_id, error)
+    else:
+        delay = min(
+            settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (webhook_event.attempts - 1),
+            settings.WEBHOOK_RETRY_MAX_SECONDS,
+        )
+        webhook_event.status = PENDING
+        webhook_event.next_attempt_at = _utcnow() + timedelta(seconds=delay)
+        _retried.inc()
+        logger.warning(
+            "Webhook event %s failed (attempt %s), retrying in %ss: %s",
+            webhook_event.stripe_event_id, webhook_event.attempts, delay, error,
+        )
+    db.commit()
+
+
+def process_batch(db: Session, batch_size: Optional[int] = None) -> int:
+    """
+    Claim and process one batch of due webhook events
+
+    The batch is applied in a single transaction. If any event fails, the
+    batch is rolled back and replayed one event per transaction, so only
+    the failing events are retried, with exponential backoff.
+
+    Args:
+        db: Database session
+        batch_size: Events per batch, WEBHOOK_BATCH_SIZE by default
+
+    Returns:
+        Number of events claimed
+    """
+    start = time.perf_counter()
+    events = claim_batch(db, batch_size or settings.WEBHOOK_BATCH_SIZE)
+    if not events:
+        return 0
+    event_ids = [e.id for e in events]
+    changes: Set[Change] = set()
+
+    try:
+        for webhook_event in events:
+            change = apply_event(db, webhook_event)
+            if change is not None:
+                changes.add(change)
+        db.commit()
+        _processed.inc(len(events))
+    except Exception:
+        db.rollback()
+        for event_id in event_ids:
+            try:
+                change = apply_event(db, db.get(models.WebhookEvent, event_id))
+                db.commit()
+                _processed.inc()
+                if change is not None:
+                    changes.add(change)
+            except Exception as e:
+                db.rollback()
+                _schedule_retry(db, event_id, e)
+
+    # Drop cached state only once the changes are committed
+    for kind, object_id in changes:
+        if kind == "membership":
+            invalidate_membership(object_id)
+    if any(kind == "registration" for kind, _ in changes):
+        invalidate_event_cache()
+    _batch_latency.observe(time.perf_counter() - start)
+    return len(events)
+
+
+def drain(batch_size: Optional[int] = None) -> int:
+    """
+    Process batches until no event is due, in a session of its own
+
+    Returns:
+        Number of events claimed
+    """
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            claimed = process_batch(db, batch_size)
+            total += claimed
+            if not claimed:
+                return total
+    finally:
+        db.close()
+
+
+def replay_events(
+    db: Session,
+    stripe_event_ids: Optional[List[str]] = None,
+    status: str = FAILED,
+    since: Optional[datetime] = None,
+) -> int:
+    """
+    Put stored events back in the queue with a fresh retry budget
+
+    Args:
+        db: Database session
+        stripe_event_ids: Replay exactly these events, whatever their status
+        status: Otherwise replay events in this status
+        since: Only events received at or after this time
+
+    Returns:
+        Number of events requeued
+    """
+    query = update(models.WebhookEvent)
+    if stripe_event_ids:
+        query = query.where(models.WebhookEvent.stripe_event_id.in_(stripe_event_ids))
+    else:
+        query = query.where(models.WebhookEvent.status == status)
+    if since is not None:
+        query = query.where(models.WebhookEvent.received_at >= since)
+    result = db.execute(
+        query.values(
+            status=PENDING,
+            attempts=0,
+            claim_token=None,
+            next_attempt_at=_utcnow(),
+        ).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def queue_stats(db: Session) -> Dict[str, int]:
+    """Number of stored webhook events per status"""
+    rows = (
+        db.query(models.WebhookEvent.status, func.count(models.WebhookEvent.id))
+        .group_by(models.WebhookEvent.status)
+        .all()
+    )
+    return {status: count for status, count in rows}
+
+
+webhook_worker = PollingWorker(
+    "Webhook",
+    drain,
+    concurrency=settings.WEBHOOK_WORKERS,
+    poll_interval=settings.WEBHOOK_POLL_INTERVAL_SECONDS,
+)
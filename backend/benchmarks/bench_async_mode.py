@@ -0,0 +1,159 @@
+# File: benchmarks/bench_async_mode.py
+"""
+Compare throughput and tail latency of the sync and async (DB_ASYNC) database paths
+
+Usage:
+    python -m benchmarks.bench_async_mode --requests 2000 --concurrency 10 --latency-ms 20
+
+Each mode runs in its own process (DB_ASYNC is read at import time) and
+drives GET /auth/me in-process through httpx's ASGI transport with a fixed
+number of concurrent clients. --latency-ms adds an artificial delay before
+every SQL statement to model a slow or distant database: a blocking sleep
+on the sync engine, an awaited one on the async engine.
+
+Keep --concurrency at or below the pool capacity (pool size + overflow,
+15 by default) when measuring sync mode: past that, blocking pool
+checkouts inside async handlers stall the event loop until
+DB_POOL_TIMEOUT_SECONDS, which is the failure async mode exists to avoid.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import print_table, summarize
+
+BENCH_EMAIL = "async-bench@alumni.example"
+
+
+def _install_latency(mode: str, delay: float) -> None:
+    from sqlalchemy import event
+    from sqlalchemy.util import await_only
+
+    from app.database import engine, get_async_engine
+
+    if mode == "async":
+        target = get_async_engine().sync_engine
+
+        def slow_query(*args):
+            await_only(asyncio.sleep(delay))
+    else:
+        target = engine
+
+        def slow_query(*args):
+            time.sleep(delay)
+
+    event.listen(target, "before_cursor_execute", slow_query)
+
+
+def _bench_token() -> str:
+    from app import models
+    from app.core.security import create_access_token
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.email == BENCH_EMAIL).first()
+        if user is None:
+            user = models.User(
+                email=BENCH_EMAIL, hashed_password="!",
+                first_name="Async", last_name="Bench", is_admin=False,
+            )
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+        return create_access_token(subject=user.id)
+    finally:
+        db.close()
+
+
+async def _drive(app, token: str, path: str, requests: int, concurrency: int) -> dict:
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up connections and caches
+        for _ in range(min(concurrency, 10)):
+            await client.get(path, headers=headers)
+
+        async def client_loop():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    stats = summarize(latencies)
+    return {
+        "requests": stats["count"],
+        "errors": errors,
+        "req_per_s": stats["count"] / elapsed if elapsed else 0.0,
+        "p50_ms": stats["p50_ms"],
+        "p99_ms": stats["p99_ms"],
+    }
+
+
+def run_worker(args) -> None:
+    """Benchmark one mode in this process and print the result as JSON"""
+    from app.database import dispose_async_engine
+    from app.main import app
+
+    token = _bench_token()
+    if args.latency_ms:
+        _install_latency(args.mode, args.latency_ms / 1000)
+
+    async def main():
+        try:
+            return await _drive(app, token, args.path, args.requests, args.concurrency)
+        finally:
+            await dispose_async_engine()
+
+    result = asyncio.run(main())
+    print(json.dumps({"mode": args.mode, **result}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0,
+                        help="Artificial delay added before each SQL statement")
+    parser.add_argument("--path", default="/auth/me")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_worker(args)
+        return
+
+    rows = []
+    for mode in args.modes:
+        env = dict(os.environ, DB_ASYNC="true" if mode == "async" else "false")
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_async_mode", "--mode", mode,
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+             "--latency-ms", str(args.latency_ms), "--path", args.path],
+            env=env, check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
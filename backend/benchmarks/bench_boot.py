@@ -0,0 +1,85 @@
+# File: benchmarks/bench_boot.py
+"""
+Compare worker boot time with create_all at startup vs. the Alembic revision check
+
+Usage:
+    python -m benchmarks.bench_boot --runs 10
+    python -m benchmarks.bench_boot --database-url postgresql://localhost/alumni_bench
+
+Migrates a database to head (a temporary SQLite file unless
+--database-url is given), then starts fresh interpreters that import
+app.main and run the schema step a worker used to run at import
+(Base.metadata.create_all) or the one it runs now (check_schema_revision).
+Each run reports the total boot time, the schema step alone and the
+number of SQL statements the step issued.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import print_table, summarize
+
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import json, time
+start = time.perf_counter()
+from sqlalchemy import event
+import app.main
+from app.database import Base, engine
+from app.core.migrations import check_schema_revision
+statements = []
+event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+step = time.perf_counter()
+if {mode!r} == "create_all":
+    Base.metadata.create_all(bind=engine)
+else:
+    check_schema_revision()
+end = time.perf_counter()
+print(json.dumps({{"boot": end - start, "step": end - step, "statements": len(statements)}}))
+"""
+
+
+def boot(mode: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER.format(mode=mode)],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(mode: str, env: dict, runs: int) -> dict:
+    results = [boot(mode, env) for _ in range(runs)]
+    total, step = summarize([r["boot"] for r in results]), summarize([r["step"] for r in results])
+    return {
+        "startup": mode,
+        "runs": runs,
+        "boot_p50_ms": total["p50_ms"],
+        "boot_p95_ms": total["p95_ms"],
+        "schema_step_p50_ms": step["p50_ms"],
+        "statements": results[-1]["statements"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-url", default=None, help="Database to boot against (default: temp SQLite)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'boot.db')}"
+        env = dict(os.environ, DATABASE_URL=url, SCHEMA_CHECK="error", WEBHOOK_WORKERS="0")
+        os.environ["DATABASE_URL"] = url
+        command.upgrade(Config(os.path.join(BACKEND_DIR, "alembic.ini")), "head")
+        print_table([measure("create_all", env, args.runs), measure("revision check", env, args.runs)])
+
+
+if __name__ == "__main__":
+    main()
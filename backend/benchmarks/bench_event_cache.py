@@ -0,0 +1,135 @@
+# File: benchmarks/bench_event_cache.py
+"""
+Compare event listing latency without the response cache, with it, and with ETag revalidation
+
+Usage:
+    python -m benchmarks.bench_event_cache --events 2000 --requests 500
+
+Seeds events and one member, then requests the first page of GET /events/
+and a handful of GET /events/{id} through the ASGI app in four modes:
+no cache, cold cache (every request follows an invalidation), warm cache,
+and warm cache with If-None-Match (304s). Anonymous and member requests
+are measured separately, since member responses are personalized per user.
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import print_table, summarize
+
+from sqlalchemy import func, insert
+
+from app import models
+from app.core.cache import MemoryCache, NullCache, set_response_cache
+from app.core.config import settings
+from app.database import Base, SessionLocal, engine
+from app.services.event_service import invalidate_event_cache
+
+MEMBER_EMAIL = "cache.bench@alumni.example"
+
+
+def seed_events(count: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        existing = connection.execute(func.count(models.Event.id).select()).scalar()
+        start = datetime(2030, 1, 1)
+        rows = [
+            {
+                "title": f"Reunion {i}",
+                "description": "Annual alumni get-together " * 10,
+                "event_date": start + timedelta(hours=i),
+                "location": "Main Hall",
+                "price": 25.0,
+                "capacity": 200,
+                "registered_count": 0,
+                "is_members_only": i % 4 == 0,
+            }
+            for i in range(existing, count)
+        ]
+        if rows:
+            connection.execute(insert(models.Event), rows)
+
+
+def member_token() -> str:
+    """Access token of a benchmark user with an active membership"""
+    from app.core.security import create_access_token
+
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.email == MEMBER_EMAIL).first()
+        if user is None:
+            user = models.User(
+                email=MEMBER_EMAIL, hashed_password="!",
+                first_name="Cache", last_name="Bench", is_admin=False,
+            )
+            db.add(user)
+            db.flush()
+            db.add(models.Membership(
+                user_id=user.id,
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=365),
+                membership_type="annual",
+                amount_paid=0,
+                is_active=True,
+            ))
+            db.commit()
+        return create_access_token(subject=user.id)
+    finally:
+        db.close()
+
+
+async def _run(mode: str, audience: str, requests: int, headers: dict) -> dict:
+    import httpx
+
+    from app.main import app
+
+    set_response_cache(NullCache() if mode == "no-cache" else MemoryCache(settings.RESPONSE_CACHE_MAX_ENTRIES))
+    paths = ["/events/?limit=50"] + [f"/events/{i}" for i in (2, 3, 6, 7)]
+    etags, latencies, not_modified = {}, [], 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in paths:
+            etags[path] = (await client.get(path, headers=headers)).headers["etag"]
+        for i in range(requests):
+            path = paths[i % len(paths)]
+            request_headers = dict(headers)
+            if mode == "cold-cache":
+                invalidate_event_cache()
+            if mode == "if-none-match":
+                request_headers["If-None-Match"] = etags[path]
+            start = time.perf_counter()
+            response = await client.get(path, headers=request_headers)
+            latencies.append(time.perf_counter() - start)
+            not_modified += response.status_code == 304
+
+    stats = summarize(latencies)
+    return {
+        "audience": audience,
+        "mode": mode,
+        "requests": stats["count"],
+        "not_modified": not_modified,
+        "p50_ms": stats["p50_ms"],
+        "p99_ms": stats["p99_ms"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    seed_events(args.events)
+    audiences = {"anonymous": {}, "member": {"Authorization": f"Bearer {member_token()}"}}
+    rows = [
+        asyncio.run(_run(mode, audience, args.requests, headers))
+        for audience, headers in audiences.items()
+        for mode in ("no-cache", "cold-cache", "warm-cache", "if-none-match")
+    ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
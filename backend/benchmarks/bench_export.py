@@ -0,0 +1,120 @@
+# File: benchmarks/bench_export.py
+"""
+Compare registrations export time and memory, ORM load-all vs. the streaming export
+
+Usage:
+    python -m benchmarks.bench_export --rows 1000000
+
+Grows the registrations table to --rows, then exports it the way admins
+used to (load every Registration as an ORM object and serialize the
+list) and through export_service in CSV, NDJSON and gzipped CSV. Peak
+traced memory shows the streaming path staying flat as the table grows.
+"""
+import argparse
+import json
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.common import print_table, timed
+from benchmarks.bench_search import seed
+
+from sqlalchemy import func, insert, select
+
+from app import models, schemas
+from app.database import SessionLocal, engine
+from app.services.export_service import stream_export
+
+USERS = 1000
+
+
+def grow_registrations(count: int, batch_size: int = 10000) -> None:
+    """Add registrations as unique (user, event) pairs, creating events as needed"""
+    with engine.begin() as connection:
+        user_ids = connection.execute(
+            select(models.User.id).order_by(models.User.id).limit(USERS)
+        ).scalars().all()
+        existing = connection.execute(func.count(models.Registration.id).select()).scalar()
+        events = connection.execute(func.count(models.Event.id).select()).scalar()
+        needed_events = -(-count // len(user_ids))
+        if events < needed_events:
+            connection.execute(insert(models.Event), [
+                {"title": f"Export bench {i}", "description": "", "location": "Online", "event_date": datetime(2030, 1, 1),
+                 "price": 10.0, "registered_count": 0}
+                for i in range(events, needed_events)
+            ])
+        event_ids = connection.execute(select(models.Event.id).order_by(models.Event.id)).scalars().all()
+        rows = []
+        for i in range(existing, count):
+            rows.append({
+                "user_id": user_ids[i % len(user_ids)],
+                "event_id": event_ids[i // len(user_ids)],
+                "payment_status": "paid",
+                "payment_intent_id": f"pi_export_{i}",
+                "amount_paid": 10.0,
+                "attended": i % 3 == 0,
+            })
+            if len(rows) >= batch_size:
+                connection.execute(insert(models.Registration), rows)
+                rows = []
+        if rows:
+            connection.execute(insert(models.Registration), rows)
+
+
+def load_all() -> int:
+    """What paging read_event_registrations-style queries amounts to: everything in memory"""
+    db = SessionLocal()
+    try:
+        registrations = db.query(models.Registration).all()
+        body = json.dumps([
+            schemas.Registration.model_validate(r, from_attributes=True).model_dump(mode="json")
+            for r in registrations
+        ])
+        return len(body)
+    finally:
+        db.close()
+
+
+def streamed(fmt: str, compress: bool) -> int:
+    return sum(len(chunk) for chunk in stream_export("registrations", fmt, compress=compress))
+
+
+def _measure(mode: str, fn, rows: int) -> dict:
+    tracemalloc.start()
+    try:
+        with timed() as t:
+            size = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "mode": mode,
+        "rows": rows,
+        "seconds": t["elapsed"],
+        "rows_per_s": rows / t["elapsed"],
+        "output_mb": size / 2**20,
+        "peak_mem_mb": peak / 2**20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skip-load-all", action="store_true", help="Skip the ORM baseline on huge tables")
+    args = parser.parse_args()
+
+    seed(USERS)
+    grow_registrations(args.rows)
+    with engine.connect() as connection:
+        rows = connection.execute(func.count(models.Registration.id).select()).scalar()
+
+    results = []
+    if not args.skip_load_all:
+        results.append(_measure("orm load-all json", load_all, rows))
+    results.append(_measure("stream csv", lambda: streamed("csv", False), rows))
+    results.append(_measure("stream ndjson", lambda: streamed("ndjson", False), rows))
+    results.append(_measure("stream csv gzip", lambda: streamed("csv", True), rows))
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
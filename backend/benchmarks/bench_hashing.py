@@ -0,0 +1,78 @@
+# File: benchmarks/bench_hashing.py
+"""
+Measure password verifications (logins) per second at different pool sizes
+
+Usage:
+    python -m benchmarks.bench_hashing --logins 200 --pool-sizes 1 2 4 8
+
+Each run verifies the same bcrypt hash concurrently through a fresh
+HashingPool, the same path login/login_direct use, and reports
+throughput, latency and how many requests were shed with 429.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import print_table, summarize
+
+from app.core.hashing import HashingBusyError, HashingPool
+from app.core.security import get_password_hash
+
+
+async def _run(pool: HashingPool, hashed: str, logins: int) -> dict:
+    latencies = []
+    rejected = 0
+
+    async def one_login() -> None:
+        nonlocal rejected
+        start = time.perf_counter()
+        try:
+            await pool.verify("correct horse battery staple", hashed)
+        except HashingBusyError:
+            rejected += 1
+            return
+        latencies.append(time.perf_counter() - start)
+
+    # Warm the worker processes so fork cost is not measured
+    await asyncio.gather(*(pool.verify("warmup", hashed) for _ in range(pool.max_workers)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stats = summarize(latencies)
+    return {
+        "pool_size": pool.max_workers,
+        "logins": logins,
+        "ok": len(latencies),
+        "rejected_429": rejected,
+        "logins_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": stats["p50_ms"],
+        "p99_ms": stats["p99_ms"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument(
+        "--queue-size", type=int, default=None,
+        help="Queue bound per pool (default: unbounded enough to accept every login)",
+    )
+    args = parser.parse_args()
+
+    hashed = get_password_hash("correct horse battery staple")
+    rows = []
+    for size in args.pool_sizes:
+        queue = args.queue_size if args.queue_size is not None else args.logins
+        pool = HashingPool(max_workers=size, max_queue=queue)
+        try:
+            rows.append(asyncio.run(_run(pool, hashed, args.logins)))
+        finally:
+            pool.shutdown()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# File: benchmarks/bench_import.py
+"""
+Compare bulk user import throughput and memory with one-at-a-time registration
+
+Usage:
+    python -m benchmarks.bench_import --rows 20000 --baseline-rows 500 --bcrypt-rounds 4
+
+Writes a synthetic CSV of --rows alumni (with a share of invalid and
+duplicate rows), then imports the first --baseline-rows the way
+/auth/register creates users (validate, hash inline, commit per user)
+and the whole file through import_service. bcrypt dominates both; pass
+a low --bcrypt-rounds to see the cost of the rest of the pipeline.
+Peak traced memory is reported to show it stays flat as the file grows.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import tracemalloc
+import uuid
+
+from benchmarks.common import print_table, timed
+
+from app import models, schemas
+from app.core import security
+from app.core.hashing import hashing_pool
+from app.database import Base, SessionLocal, engine
+from app.services.import_service import import_users, read_records
+
+
+def write_csv(path: str, rows: int, run_id: str) -> None:
+    rng = random.Random(rows)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["email", "password", "first_name", "last_name", "graduation_year", "major", "company"])
+        for i in range(rows):
+            email = f"import.{run_id}.{i}@alumni.example"
+            if rng.random() < 0.01:
+                email = "not-an-email"
+            elif rng.random() < 0.01 and i:
+                email = f"import.{run_id}.{i - 1}@alumni.example"
+            writer.writerow([email, f"pw-{i}", "Grad", f"Class{i}", rng.randint(2000, 2024), "History", "Globex"])
+
+
+def one_at_a_time(path: str, limit: int) -> dict:
+    """Create users the way /auth/register does, one hash and one commit per user"""
+    db = SessionLocal()
+    created = 0
+    tracemalloc.start()
+    try:
+        with timed() as t, open(path, "rb") as f:
+            for _, row, _ in read_records(f, "csv"):
+                if created >= limit:
+                    break
+                try:
+                    user_in = schemas.UserCreate.model_validate(row)
+                except ValueError:
+                    continue
+                if db.query(models.User.id).filter(models.User.email == user_in.email).first():
+                    continue
+                db.add(models.User(
+                    **user_in.model_dump(exclude={"password"}),
+                    hashed_password=security.get_password_hash(user_in.password),
+                ))
+                db.commit()
+                created += 1
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        db.close()
+    return {"mode": "one-at-a-time", "rows": created, "created": created,
+            "rows_per_s": created / t["elapsed"], "peak_mem_mb": peak / 2**20}
+
+
+def pipeline(path: str, chunk_size: int, hash_workers: int) -> dict:
+    db = SessionLocal()
+    tracemalloc.start()
+    try:
+        with timed() as t, open(path, "rb") as f:
+            report = import_users(db, read_records(f, "csv"), chunk_size=chunk_size, hash_workers=hash_workers)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        db.close()
+    return {"mode": f"import chunk={chunk_size}", "rows": report.rows, "created": report.created,
+            "rows_per_s": report.rows / t["elapsed"], "peak_mem_mb": peak / 2**20}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--baseline-rows", type=int, default=500)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--bcrypt-rounds", type=int, default=None,
+                        help="Override bcrypt cost for the benchmark (default: the app's)")
+    args = parser.parse_args()
+
+    if args.bcrypt_rounds:
+        # Hash workers are forked after this, so they inherit the setting
+        security.get_pwd_context().update(bcrypt__rounds=args.bcrypt_rounds)
+    # The shared hashing pool only serves the import here, as in `app.cli import-users`
+    hashing_pool.max_workers = max(hashing_pool.max_workers, args.hash_workers)
+    Base.metadata.create_all(bind=engine)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_path, import_path = os.path.join(tmp, "baseline.csv"), os.path.join(tmp, "import.csv")
+        write_csv(baseline_path, args.baseline_rows, uuid.uuid4().hex[:8])
+        write_csv(import_path, args.rows, uuid.uuid4().hex[:8])
+        rows = [
+            one_at_a_time(baseline_path, args.baseline_rows),
+            pipeline(import_path, args.chunk_size, args.hash_workers),
+        ]
+    hashing_pool.shutdown()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# File: benchmarks/bench_instrumentation.py
+"""
+Measure the per-request overhead of the metrics middleware and SQL hooks
+
+Usage:
+    python -m benchmarks.bench_instrumentation --requests 2000
+
+Builds the app with REQUEST_METRICS off, on, and on with
+DEBUG_QUERY_HEADERS, then times a route that never queries (GET /)
+and an uncached event listing (GET /events/) through the ASGI app.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import print_table, summarize
+from benchmarks.bench_event_cache import seed_events
+
+from app.core.cache import NullCache, set_response_cache
+from app.core.config import settings
+
+
+async def _run(mode: str, path: str, requests: int) -> dict:
+    import httpx
+
+    from app.main import create_app
+
+    settings.REQUEST_METRICS = mode != "off"
+    settings.DEBUG_QUERY_HEADERS = mode == "debug headers"
+    app = create_app()
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)
+        for _ in range(requests):
+            start = time.perf_counter()
+            await client.get(path)
+            latencies.append(time.perf_counter() - start)
+
+    stats = summarize(latencies)
+    return {"path": path, "metrics": mode, "requests": stats["count"],
+            "mean_ms": stats["mean_ms"], "p50_ms": stats["p50_ms"], "p99_ms": stats["p99_ms"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    seed_events(args.events)
+    set_response_cache(NullCache())
+    rows = [
+        asyncio.run(_run(mode, path, args.requests))
+        for path in ("/", "/events/?limit=20")
+        for mode in ("off", "on", "debug headers")
+    ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
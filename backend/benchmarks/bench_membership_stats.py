@@ -0,0 +1,122 @@
+# File: benchmarks/bench_membership_stats.py
+"""
+Compare membership stats latency of the full-table aggregations and the daily rollup
+
+Usage:
+    python -m benchmarks.bench_membership_stats --sizes 10000 100000 1000000
+
+Grows the memberships table to each size with synthetic history spread
+over ten years, rebuilds the rollup, then times the five aggregations the
+stats endpoint used to run against the single rollup query, checking
+that both report the same numbers.
+"""
+import argparse
+import random
+from datetime import date, datetime, time, timedelta
+
+from benchmarks.common import print_table, summarize, timed
+from benchmarks.bench_search import seed
+
+from sqlalchemy import func, insert
+
+from app import models
+from app.database import SessionLocal, engine
+from app.services.membership_service import get_membership_stats, rebuild_membership_stats
+
+TYPES = {"monthly": (30, 15.0), "annual": (365, 120.0), "lifetime": (365 * 99, 1500.0)}
+
+
+def grow_memberships(count: int, user_ids: list, batch_size: int = 10000) -> None:
+    rng = random.Random(count)
+    today = date.today()
+    with engine.begin() as connection:
+        existing = connection.execute(func.count(models.Membership.id).select()).scalar()
+        rows = []
+        for _ in range(existing, count):
+            membership_type = rng.choice(list(TYPES))
+            days, price = TYPES[membership_type]
+            start = today - timedelta(days=rng.randint(0, 3650))
+            rows.append({
+                "user_id": rng.choice(user_ids),
+                "start_date": start,
+                "end_date": start + timedelta(days=days),
+                "membership_type": membership_type,
+                "payment_id": None,
+                "amount_paid": price,
+                "is_active": rng.random() < 0.9,
+                "created_at": datetime.combine(start, time(12)),
+            })
+            if len(rows) >= batch_size:
+                connection.execute(insert(models.Membership), rows)
+                rows = []
+        if rows:
+            connection.execute(insert(models.Membership), rows)
+
+
+def legacy_stats(db) -> dict:
+    """The five aggregations the stats endpoint ran before the rollup"""
+    membership = models.Membership
+    active = (membership.end_date >= func.current_date(), membership.is_active == True)
+    type_stats = db.query(membership.membership_type, func.count(membership.id)).filter(
+        *active
+    ).group_by(membership.membership_type).all()
+    active_count = db.query(membership).filter(*active).count()
+    new_count = db.query(membership).filter(
+        membership.created_at >= datetime.now() - timedelta(days=30)
+    ).count()
+    expiring_count = db.query(membership).filter(
+        membership.end_date <= date.today() + timedelta(days=30), *active
+    ).count()
+    revenue = db.query(func.sum(membership.amount_paid)).scalar()
+    return {
+        "by_type": [{"type": t, "count": c} for t, c in type_stats],
+        "active_memberships": active_count,
+        "new_memberships": new_count,
+        "expiring_memberships": expiring_count,
+        "total_revenue": float(revenue) if revenue else 0,
+    }
+
+
+def _time(fn, db, repeat: int):
+    samples, result = [], None
+    for _ in range(repeat):
+        with timed() as t:
+            result = fn(db)
+        samples.append(t["elapsed"])
+    return summarize(samples)["p50_ms"], result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(1000)
+    db = SessionLocal()
+    try:
+        user_ids = [row.id for row in db.query(models.User.id).limit(1000)]
+        rows = []
+        for size in sorted(args.sizes):
+            grow_memberships(size, user_ids)
+            with timed() as rebuild:
+                rollup_rows = rebuild_membership_stats(db)
+            legacy_ms, legacy = _time(legacy_stats, db, args.repeat)
+            rollup_ms, rollup = _time(get_membership_stats, db, args.repeat)
+            keys = ("active_memberships", "new_memberships", "expiring_memberships")
+            rows.append({
+                "memberships": size,
+                "rollup_rows": rollup_rows,
+                "rebuild_s": rebuild["elapsed"],
+                "full_table_p50_ms": legacy_ms,
+                "rollup_p50_ms": rollup_ms,
+                "match": all(legacy[k] == rollup[k] for k in keys)
+                and abs(legacy["total_revenue"] - rollup["total_revenue"]) < 0.01,
+            })
+    finally:
+        db.close()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
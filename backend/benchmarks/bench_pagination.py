@@ -0,0 +1,66 @@
+# File: benchmarks/bench_pagination.py
+"""
+Compare page latency of skip/limit and cursor pagination at increasing depth
+
+Usage:
+    python -m benchmarks.bench_pagination --users 1000000
+
+Reuses the synthetic alumni seeded by bench_search and fetches one page of
+read_users at several depths, once with an offset and once with the
+cursor the previous page would have returned.
+"""
+import argparse
+
+from benchmarks.common import print_table, summarize, timed
+from benchmarks.bench_search import seed
+
+from fastapi import Response
+
+from app import models
+from app.core.pagination import encode_cursor, keyset_paginate
+from app.database import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.users)
+    db = SessionLocal()
+    rows = []
+    try:
+        depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, 900_000) if d < args.users]
+        for depth in depths:
+            # The cursor a client would hold after reading `depth` rows
+            last_id = (
+                db.query(models.User.id).order_by(models.User.id)
+                .offset(depth - 1).limit(1).scalar() if depth else None
+            )
+            cursor = encode_cursor("users", [last_id]) if last_id else None
+
+            results = {}
+            for mode in ("offset", "cursor"):
+                samples = []
+                for _ in range(args.repeat):
+                    with timed() as t:
+                        keyset_paginate(
+                            db.query(models.User), [models.User.id],
+                            key="users", response=Response(),
+                            cursor=cursor if mode == "cursor" else None,
+                            skip=depth if mode == "offset" else 0,
+                            limit=args.limit,
+                        )
+                    samples.append(t["elapsed"])
+                    db.expunge_all()
+                results[mode] = summarize(samples)["p50_ms"]
+            rows.append({"depth": depth, "offset_p50_ms": results["offset"], "cursor_p50_ms": results["cursor"]})
+    finally:
+        db.close()
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# File: benchmarks/bench_payments.py
+"""
+Compare the blocking Stripe SDK call with the pooled async stripe_gateway
+
+Usage:
+    python -m benchmarks.bench_payments --calls 200 --concurrency 20 --delay-ms 150
+
+Both modes create payment intents against a local stripe_stub from
+concurrent asyncio tasks, the way concurrent create-intent requests do.
+Alongside throughput and latency, a ticker task measures event loop lag:
+how late a 10 ms sleep wakes up, i.e. how long every other request on
+the worker would have been stalled.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import print_table, summarize
+from benchmarks.stripe_stub import start_stub
+
+TICK = 0.01
+
+
+async def _measure_lag(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def _run(mode: str, calls: int, concurrency: int) -> dict:
+    import stripe
+
+    from app.core.config import settings
+    from app.services.stripe_service import stripe_gateway
+
+    async def blocking_create():
+        return stripe.PaymentIntent.create(amount=1000, currency="usd", metadata={"type": "bench"})
+
+    async def gateway_create():
+        return await stripe_gateway.create_payment_intent(1000, "usd", {"type": "bench"})
+
+    create = blocking_create if mode == "blocking-sdk" else gateway_create
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.api_base = settings.STRIPE_API_BASE
+
+    await create()  # warm up connections
+    latencies, lags = [], []
+    remaining = calls
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_lag(stop, lags))
+
+    async def client_loop():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await create()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    await stripe_gateway.aclose()
+
+    stats = summarize(latencies)
+    return {
+        "mode": mode,
+        "calls": stats["count"],
+        "calls_per_s": stats["count"] / elapsed,
+        "p50_ms": stats["p50_ms"],
+        "p99_ms": stats["p99_ms"],
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=150.0, help="Stub response delay")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of stub 500s (retried)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(delay=args.delay_ms / 1000, fail_rate=args.fail_rate)
+    os.environ["STRIPE_API_BASE"] = base_url
+    os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test_benchmark")
+    try:
+        rows = [
+            asyncio.run(_run(mode, args.calls, args.concurrency))
+            for mode in ("blocking-sdk", "gateway")
+        ]
+    finally:
+        server.shutdown()
+    print_table(rows)
+
+    from app.core.metrics import registry
+    print_table([
+        {"histogram": name, **values}
+        for name, values in registry.snapshot(prefix="stripe_").items() if "count" in values
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# File: benchmarks/bench_registrations.py
+"""
+Compare query counts and latency of two-step/lazy registration loading vs. joined loading
+
+Usage:
+    python -m benchmarks.bench_registrations --users 50 --per-user 300
+
+Registers --users alumni for --per-user events each, then measures:
+- a user's registered events, the old way (registrations, then events
+  with in_(), then is_registered) against event_service.user_events,
+  the single join behind /registrations/my-events;
+- an admin page of registrations with user and event details loaded
+  lazily (one query per row), with selectinload and with joinedload.
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.common import print_table, summarize, timed
+from benchmarks.bench_search import seed
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from app import models, schemas
+from app.database import SessionLocal, engine
+from app.services.event_service import registered_event_ids, user_events
+
+_statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(*args) -> None:
+    global _statements
+    _statements += 1
+
+
+def seed_registrations(users: int, per_user: int) -> list:
+    seed(users)
+    with engine.begin() as connection:
+        user_ids = connection.execute(select(models.User.id).order_by(models.User.id).limit(users)).scalars().all()
+        events = connection.execute(func.count(models.Event.id).select()).scalar()
+        if events < per_user:
+            start = datetime(2030, 1, 1)
+            connection.execute(insert(models.Event), [
+                {"title": f"Registration bench {i}", "description": "", "location": "Online",
+                 "event_date": start + timedelta(days=i), "price": 10.0, "registered_count": 0}
+                for i in range(events, per_user)
+            ])
+        event_ids = connection.execute(
+            select(models.Event.id).order_by(models.Event.id).limit(per_user)
+        ).scalars().all()
+        taken = set(connection.execute(select(models.Registration.user_id, models.Registration.event_id)).all())
+        rows = [
+            {"user_id": user_id, "event_id": event_id, "payment_status": "paid", "amount_paid": 10.0}
+            for user_id in user_ids for event_id in event_ids if (user_id, event_id) not in taken
+        ]
+        if rows:
+            connection.execute(insert(models.Registration), rows)
+    return list(user_ids)
+
+
+def my_events_two_step(db, user_id: int) -> list:
+    registrations = db.query(models.Registration).filter(models.Registration.user_id == user_id).all()
+    event_ids = [reg.event_id for reg in registrations]
+    events = db.query(models.Event).filter(models.Event.id.in_(event_ids)).all()
+    # The old handler loaded the user, then looked up its registrations for the page
+    registered_ids = registered_event_ids(db, db.get(models.User, user_id).id, event_ids)
+    for e in events:
+        e.is_registered = e.id in registered_ids
+    return events
+
+
+def my_events_joined(db, user_id: int) -> list:
+    return user_events(db, user_id)
+
+
+def _details(loader):
+    def run(db, limit: int) -> list:
+        query = db.query(models.Registration)
+        if loader is not None:
+            query = query.options(loader(models.Registration.event), loader(models.Registration.user))
+        registrations = query.order_by(models.Registration.id).limit(limit).all()
+        return [
+            schemas.RegistrationDetail.model_validate(r, from_attributes=True).model_dump(mode="json")
+            for r in registrations
+        ]
+    return run
+
+
+def _measure(name: str, fn, arg, repeat: int) -> dict:
+    global _statements
+    samples, statements = [], 0
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            _statements = 0
+            with timed() as t:
+                rows = len(fn(db, arg))
+            statements = _statements
+        finally:
+            db.close()
+        samples.append(t["elapsed"])
+    stats = summarize(samples)
+    return {"case": name, "rows": rows, "queries": statements, "p50_ms": stats["p50_ms"], "p95_ms": stats["p95_ms"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--per-user", type=int, default=300)
+    parser.add_argument("--page", type=int, default=500, help="Rows per admin page")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    user_ids = seed_registrations(args.users, args.per_user)
+    user_id = user_ids[len(user_ids) // 2]
+    print_table([
+        _measure("my-events two-step", my_events_two_step, user_id, args.repeat),
+        _measure("my-events join", my_events_joined, user_id, args.repeat),
+        _measure("details lazy (N+1)", _details(None), args.page, args.repeat),
+        _measure("details selectinload", _details(selectinload), args.page, args.repeat),
+        _measure("details joinedload", _details(joinedload), args.page, args.repeat),
+    ])
+
+
+if __name__ == "__main__":
+    main()
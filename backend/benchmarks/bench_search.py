@@ -0,0 +1,115 @@
+# File: benchmarks/bench_search.py
+"""
+Compare directory search latency of the plain ILIKE filter path and the indexed path
+
+Usage:
+    python -m benchmarks.bench_search --users 1000000
+
+Seeds DATABASE_URL (a SQLite file by default) with synthetic alumni, then
+runs the same queries through search_service with backend="filter" and
+with the indexed backend ("memory" on SQLite, "postgres" on Postgres).
+Seeding is skipped when the users table already holds enough rows.
+"""
+import argparse
+import random
+
+from benchmarks.common import print_table, summarize, timed
+
+from sqlalchemy import func, insert
+
+from app import models
+from app.database import Base, SessionLocal, engine
+from app.services import search_service
+
+FIRST_NAMES = ["James", "Mary", "Wei", "Aisha", "Carlos", "Olga", "Kenji", "Priya", "Liam", "Fatima",
+               "Noah", "Elena", "Mateo", "Yuki", "Omar", "Sofia", "Ivan", "Amara", "Lucas", "Mei"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Novak", "Tanaka", "Patel", "Murphy", "Haddad", "Rossi",
+              "Kim", "Silva", "Nguyen", "Ivanova", "Mendez", "Cohen", "Singh", "Muller", "Dubois", "Ali"]
+MAJORS = ["Computer Science", "Economics", "Mechanical Engineering", "Biology", "History",
+          "Mathematics", "Architecture", "Psychology", "Chemistry", "Philosophy"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries",
+             "Wayne Enterprises", "Wonka", "Tyrell", "Cyberdyne", None]
+LOCATIONS = ["New York", "London", "Sydney", "Toronto", "Berlin", "Singapore",
+             "San Francisco", "Perth", "Melbourne", "Tokyo", None]
+
+QUERIES = [
+    {"name": "chen"},
+    {"name": "ar"},
+    {"major": "engineering", "location": "perth"},
+    {"company": "wayne", "graduation_year": 2010},
+    {"q": "patel singapore"},
+    {"name": "zzzz"},
+]
+
+
+def seed(count: int, seed_value: int = 42, batch_size: int = 10000) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        existing = connection.execute(func.count(models.User.id).select()).scalar()
+        if existing >= count:
+            return
+        rng = random.Random(seed_value)
+        rows = []
+        for i in range(existing, count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            rows.append({
+                "email": f"{first.lower()}.{last.lower()}.{i}@alumni.example",
+                "hashed_password": "!",
+                "first_name": first,
+                "last_name": last,
+                "graduation_year": rng.randint(1970, 2024),
+                "major": rng.choice(MAJORS),
+                "company": rng.choice(COMPANIES),
+                "location": rng.choice(LOCATIONS),
+                "is_admin": False,
+            })
+            if len(rows) >= batch_size:
+                connection.execute(insert(models.User), rows)
+                rows = []
+        if rows:
+            connection.execute(insert(models.User), rows)
+
+
+def run(backend: str, repeat: int) -> dict:
+    db = SessionLocal()
+    try:
+        build = {"elapsed": 0.0}
+        if backend == "memory":
+            with timed() as build:
+                search_service.get_memory_index(db)
+        samples = []
+        for _ in range(repeat):
+            for query in QUERIES:
+                with timed() as t:
+                    search_service.search_users(db, limit=20, backend=backend, **query)
+                samples.append(t["elapsed"])
+        stats = summarize(samples)
+        return {
+            "backend": backend,
+            "queries": stats["count"],
+            "index_build_s": build["elapsed"],
+            "mean_ms": stats["mean_ms"],
+            "p50_ms": stats["p50_ms"],
+            "p99_ms": stats["p99_ms"],
+        }
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with timed() as t:
+        seed(args.users, args.seed)
+    print(f"Seeded {args.users} users in {t['elapsed']:.1f}s")
+
+    indexed = "postgres" if engine.dialect.name == "postgresql" else "memory"
+    print_table([run("filter", args.repeat), run(indexed, args.repeat)])
+
+
+if __name__ == "__main__":
+    main()
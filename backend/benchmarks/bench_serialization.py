@@ -0,0 +1,142 @@
+# File: benchmarks/bench_serialization.py
+"""
+Compare CPU cost of FastAPI response_model serialization and the row serializer
+
+Usage:
+    python -m benchmarks.bench_serialization --page 100 --requests 500
+
+Seeds users and events, then measures per page of --page items:
+- serialization alone: FastAPI validating ORM objects against
+  List[schemas.User]/List[schemas.Event] and encoding with JSONResponse
+  (what read_users and read_events did before), against RowSerializer
+  over row tuples and ORJSONResponse; the bodies must be identical;
+- GET /users/ as an admin and GET /events/ anonymously through the ASGI
+  app, by CPU time per request and latency, with the response cache off.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from benchmarks.common import print_table, summarize
+from benchmarks.bench_event_cache import seed_events
+from benchmarks.bench_search import seed
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app import models, schemas
+from app.core.cache import NullCache, set_response_cache
+from app.core.security import create_access_token
+from app.core.serialization import ORJSONResponse, RowSerializer
+from app.database import SessionLocal
+
+ADMIN_EMAIL = "serialization.admin@alumni.example"
+
+
+def admin_token() -> str:
+    db = SessionLocal()
+    try:
+        admin = db.query(models.User).filter(models.User.email == ADMIN_EMAIL).first()
+        if admin is None:
+            admin = models.User(email=ADMIN_EMAIL, hashed_password="!", first_name="Bench", last_name="Admin",
+                                is_admin=True)
+            db.add(admin)
+            db.commit()
+        return create_access_token(subject=admin.id)
+    finally:
+        db.close()
+
+
+def _cpu_ms(fn, repeat: int) -> float:
+    fn()
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def compare_serialization(schema, model, page: int, repeat: int) -> List[dict]:
+    db = SessionLocal()
+    try:
+        rows_serializer = RowSerializer(schema, model)
+        objects = db.query(model).order_by(model.id).limit(page).all()
+        rows = rows_serializer.query(db).order_by(model.id).limit(page).all()
+    finally:
+        db.close()
+    field = create_model_field("Response", List[schema], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def legacy() -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=objects, is_coroutine=False)
+        )
+        return JSONResponse(content).body
+
+    def row_path() -> bytes:
+        return ORJSONResponse(rows_serializer.dump(rows)).body
+
+    identical = legacy() == row_path()
+    results = [
+        {"schema": schema.__name__, "path": "response_model + JSONResponse", "cpu_ms": _cpu_ms(legacy, repeat)},
+        {"schema": schema.__name__, "path": "RowSerializer + ORJSONResponse", "cpu_ms": _cpu_ms(row_path, repeat)},
+    ]
+    loop.close()
+    for result in results:
+        result.update(items=len(rows), bytes=len(row_path()), identical=identical)
+    return results
+
+
+async def _endpoint(client, path: str, params: dict, headers: dict, requests: int) -> dict:
+    await client.get(path, params=params, headers=headers)
+    latencies = []
+    cpu_start = time.process_time()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(path, params=params, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    cpu_ms = (time.process_time() - cpu_start) * 1000 / requests
+    stats = summarize(latencies)
+    return {"endpoint": f"GET {path}", "items": len(response.json()), "cpu_ms_per_req": cpu_ms,
+            "p50_ms": stats["p50_ms"], "p99_ms": stats["p99_ms"]}
+
+
+async def compare_endpoints(page: int, requests: int) -> List[dict]:
+    import httpx
+
+    from app.main import app
+
+    admin = {"Authorization": f"Bearer {admin_token()}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return [
+            await _endpoint(client, "/users/", {"limit": page}, admin, requests),
+            await _endpoint(client, "/events/", {"limit": page}, {}, requests),
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--page", type=int, default=100, help="Items per page")
+    parser.add_argument("--repeat", type=int, default=500, help="Pages serialized per path")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    args = parser.parse_args()
+
+    seed(args.users)
+    seed_events(args.events)
+    print_table(
+        compare_serialization(schemas.User, models.User, args.page, args.repeat)
+        + compare_serialization(schemas.Event, models.Event, args.page, args.repeat)
+    )
+    print()
+
+    set_response_cache(NullCache())
+    print_table(asyncio.run(compare_endpoints(args.page, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
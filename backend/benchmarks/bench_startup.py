@@ -0,0 +1,107 @@
+# File: benchmarks/bench_startup.py
+"""
+Measure how long a worker takes to import the app, run startup and serve its first request
+
+Usage:
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --runs 10 --max-ready-ms 1500 --json startup.json
+
+Each run is a fresh interpreter against a migrated temporary SQLite
+database: it times `import app.main`, the startup handlers and a first
+GET / through the ASGI app. The "eager imports" row imports stripe,
+passlib and httpx up front, as app.main used to, for comparison.
+With --max-ready-ms the command exits non-zero when the lazy p50
+exceeds the budget, so CI can track regressions; --json writes the rows.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import print_table, summarize
+
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import asyncio, json, time
+start = time.perf_counter()
+if {eager!r}:
+    import httpx, passlib.context, stripe
+import app.main
+imported = time.perf_counter()
+
+async def first_request():
+    await app.main.app.router.startup()
+    started = time.perf_counter()
+    messages = []
+    async def receive():
+        return {{"type": "http.request", "body": b"", "more_body": False}}
+    async def send(message):
+        messages.append(message)
+    scope = {{"type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/", "raw_path": b"/", "query_string": b"", "root_path": "",
+             "headers": [], "client": ("127.0.0.1", 1), "server": ("testserver", 80)}}
+    await app.main.app(scope, receive, send)
+    assert messages[0]["status"] == 200
+    return started
+
+started = asyncio.run(first_request())
+end = time.perf_counter()
+print(json.dumps({{"import": imported - start, "startup": started - imported,
+                  "request": end - started, "ready": end - start}}))
+"""
+
+
+def boot(eager: bool, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER.format(eager=eager)],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(name: str, eager: bool, env: dict, runs: int) -> dict:
+    results = [boot(eager, env) for _ in range(runs)]
+    row = {"mode": name, "runs": runs}
+    for phase in ("import", "startup", "request", "ready"):
+        row[f"{phase}_p50_ms"] = summarize([r[phase] for r in results])["p50_ms"]
+    row["ready_p95_ms"] = summarize([r["ready"] for r in results])["p95_ms"]
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--skip-eager", action="store_true", help="Only measure the lazy startup")
+    parser.add_argument("--max-ready-ms", type=float, default=None,
+                        help="Exit 1 if the p50 time to first response exceeds this")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        # No webhook worker or warm-up thread: measure the worker becoming ready
+        env = dict(os.environ, DATABASE_URL=url, SCHEMA_CHECK="error", WEBHOOK_WORKERS="0", WARM_UP_IMPORTS="false")
+        os.environ["DATABASE_URL"] = url
+        command.upgrade(Config(os.path.join(BACKEND_DIR, "alembic.ini")), "head")
+
+        rows = [measure("lazy imports", False, env, args.runs)]
+        if not args.skip_eager:
+            rows.append(measure("eager imports", True, env, args.runs))
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    if args.max_ready_ms is not None and rows[0]["ready_p50_ms"] > args.max_ready_ms:
+        print(f"Startup regression: ready p50 {rows[0]['ready_p50_ms']:.0f} ms > {args.max_ready_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# File: benchmarks/bench_suite.py
+"""
+Run the API load-test scenarios in process and save comparable results
+
+Usage:
+    python -m benchmarks.bench_suite --json suite.json [--compare previous.json]
+    python -m benchmarks.bench_suite --scenarios events_public search --requests 1000
+
+Seeds the database (users, events and one member, reusing the seeders of
+the other benchmarks), then drives the app through an in-process ASGI
+client, --concurrency requests in flight, one scenario at a time:
+- login: POST /auth/login with a bcrypt password (--logins requests)
+- events_public / events_member: first page of GET /events/
+- event_detail: GET /events/{id} as a member
+- search: GET /users/search with a rotating set of directory queries
+- registration: POST /registrations/ by distinct users on a fresh event
+- webhook_burst: signed payment_intent.succeeded deliveries to
+  POST /payments/webhook, with redeliveries
+Each scenario reports throughput, p50/p95/p99 latency, errors and SQL
+statements per request. Random choices are seeded, so two runs on the
+same database issue the same requests. --json writes the rows together
+with the commit and settings they were measured on; --compare prints
+the change against such a file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.common import print_table, summarize
+
+os.environ.setdefault("STRIPE_WEBHOOK_SECRET", "whsec_benchmark")
+# Background workers would add database work the scenarios did not cause
+os.environ["WEBHOOK_WORKERS"] = "0"
+os.environ["WAITLIST_WORKERS"] = "0"
+
+from sqlalchemy import event, insert, select  # noqa: E402
+
+from benchmarks.bench_event_cache import member_token, seed_events  # noqa: E402
+from benchmarks.bench_search import QUERIES, seed  # noqa: E402
+from benchmarks.bench_webhooks import build_deliveries  # noqa: E402
+
+from app import models  # noqa: E402
+from app.core.cache import NullCache, set_response_cache  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+
+LOGIN_EMAIL = "suite.login@alumni.example"
+LOGIN_PASSWORD = "correct horse battery staple"
+
+SCENARIOS = ["login", "events_public", "events_member", "event_detail", "search", "registration", "webhook_burst"]
+
+# Result columns compared by --compare, and whether higher is better
+COMPARED = {"req_per_s": True, "p50_ms": False, "p95_ms": False, "p99_ms": False, "sql_per_req": False}
+
+_statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(*args) -> None:
+    global _statements
+    _statements += 1
+
+
+# A request factory takes the request number and returns (method, path, httpx keyword arguments)
+Request = Callable[[int], tuple]
+
+
+def login_user() -> None:
+    """Create the user the login scenario signs in as, with a real bcrypt hash"""
+    db = SessionLocal()
+    try:
+        if db.query(models.User.id).filter(models.User.email == LOGIN_EMAIL).first() is None:
+            db.add(models.User(
+                email=LOGIN_EMAIL, hashed_password=get_password_hash(LOGIN_PASSWORD),
+                first_name="Suite", last_name="Login", is_admin=False,
+            ))
+            db.commit()
+    finally:
+        db.close()
+
+
+def registration_requests(count: int) -> Request:
+    """POST /registrations/ by count distinct users on a new, unlimited free event"""
+    with engine.begin() as connection:
+        event_id = connection.execute(insert(models.Event).values(
+            title=f"Suite registration {uuid.uuid4().hex[:8]}", description="", location="Main Hall",
+            event_date=datetime(2030, 6, 1), price=0.0, registered_count=0,
+        )).inserted_primary_key[0]
+        user_ids = connection.execute(
+            select(models.User.id).where(models.User.email.like("%@alumni.example"))
+            .order_by(models.User.id).limit(count)
+        ).scalars().all()
+    tokens = [create_access_token(user_id) for user_id in user_ids]
+    if len(tokens) < count:
+        raise SystemExit(f"registration needs {count} seeded users, pass --users {count} or more")
+
+    def request(i: int) -> tuple:
+        return "POST", "/registrations/", {
+            "json": {"event_id": event_id, "payment_intent_id": f"pi_suite_{i}"},
+            "headers": {"Authorization": f"Bearer {tokens[i]}"},
+        }
+    return request
+
+
+def webhook_requests(count: int) -> Request:
+    """Signed webhook deliveries, a fifth of them redelivered"""
+    db = SessionLocal()
+    try:
+        user_ids = [row.id for row in db.query(models.User.id).limit(1000)]
+    finally:
+        db.close()
+    deliveries = build_deliveries(count, 0.2, user_ids, uuid.uuid4().hex[:8])[:count]
+
+    def request(i: int) -> tuple:
+        payload, header = deliveries[i]
+        return "POST", "/payments/webhook", {
+            "content": payload,
+            "headers": {"stripe-signature": header, "content-type": "application/json"},
+        }
+    return request
+
+
+def build_scenarios(args, names: List[str]) -> Dict[str, tuple]:
+    """Request factory and request count of each selected scenario"""
+    rng = random.Random(args.seed)
+    member = {"Authorization": f"Bearer {member_token()}"}
+    db = SessionLocal()
+    try:
+        event_ids = [row.id for row in db.query(models.Event.id).order_by(models.Event.id).limit(200)]
+    finally:
+        db.close()
+    detail_ids = [rng.choice(event_ids) for _ in range(args.requests)]
+    searches = [rng.choice(QUERIES) for _ in range(args.requests)]
+
+    factories: Dict[str, Callable[[], tuple]] = {
+        "login": lambda: (lambda i: ("POST", "/auth/login", {
+            "data": {"username": LOGIN_EMAIL, "password": LOGIN_PASSWORD},
+        }), args.logins),
+        "events_public": lambda: (lambda i: ("GET", "/events/", {"params": {"limit": 20}}), args.requests),
+        "events_member": lambda: (lambda i: ("GET", "/events/", {
+            "params": {"limit": 20}, "headers": member,
+        }), args.requests),
+        "event_detail": lambda: (lambda i: ("GET", f"/events/{detail_ids[i]}", {"headers": member}), args.requests),
+        "search": lambda: (lambda i: ("GET", "/users/search", {
+            "params": searches[i], "headers": member,
+        }), args.requests),
+        "registration": lambda: (registration_requests(args.requests), args.requests),
+        "webhook_burst": lambda: (webhook_requests(args.requests), args.requests),
+    }
+    return {name: factories[name]() for name in names}
+
+
+async def run_scenario(client, name: str, request: Request, count: int, concurrency: int) -> Dict[str, Any]:
+    global _statements
+    latencies: List[float] = []
+    errors = 0
+    queue = list(range(count))
+
+    async def client_loop() -> None:
+        nonlocal errors
+        while queue:
+            method, path, kwargs = request(queue.pop(0))
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    # One unmeasured request so first-use imports and connections are not timed
+    method, path, kwargs = request(count - 1)
+    if name not in ("registration", "webhook_burst"):
+        await client.request(method, path, **kwargs)
+
+    _statements = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stats = summarize(latencies)
+    return {
+        "scenario": name,
+        "requests": stats["count"],
+        "errors": errors,
+        "req_per_s": stats["count"] / elapsed if elapsed else 0.0,
+        "p50_ms": stats["p50_ms"],
+        "p95_ms": stats["p95_ms"],
+        "p99_ms": stats["p99_ms"],
+        "sql_per_req": _statements / stats["count"] if stats["count"] else 0.0,
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(rows: List[Dict[str, Any]], previous: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Percentage change of each compared column against an earlier --json file"""
+    before = {row["scenario"]: row for row in previous["scenarios"]}
+    changes = []
+    for row in rows:
+        old = before.get(row["scenario"])
+        if old is None:
+            continue
+        change: Dict[str, Any] = {"scenario": row["scenario"], "errors": f"{old['errors']} -> {row['errors']}"}
+        for column, higher_is_better in COMPARED.items():
+            if not old.get(column):
+                change[column] = None
+                continue
+            delta = (row[column] - old[column]) / old[column] * 100
+            better = delta > 0 if higher_is_better else delta < 0
+            # Changes under 10% are within run-to-run noise on a busy machine
+            change[column] = f"{delta:+.1f}%{'' if abs(delta) < 10 else (' better' if better else ' worse')}"
+        changes.append(change)
+    return changes
+
+
+async def _run(args, scenarios: Dict[str, tuple]) -> List[Dict[str, Any]]:
+    import httpx
+
+    from app.main import app
+
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name, (request, count) in scenarios.items():
+            rows.append(await run_scenario(client, name, request, count, args.concurrency))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--users", type=int, default=10000, help="Seeded alumni (at least --requests)")
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--logins", type=int, default=50, help="Requests of the login scenario (bcrypt bound)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Requests in flight; keep it within the connection pool")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Keep the event response cache on (default: off, to measure the queries)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Write the results to this file")
+    parser.add_argument("--compare", default=None, help="Compare with the results in this --json file")
+    args = parser.parse_args()
+
+    seed(args.users)
+    seed_events(args.events)
+    if "login" in args.scenarios:
+        login_user()
+    if not args.response_cache:
+        set_response_cache(NullCache())
+
+    rows = asyncio.run(_run(args, build_scenarios(args, args.scenarios)))
+    print_table(rows)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"\nChange against {previous['meta'].get('commit') or args.compare}:")
+        print_table(compare(rows, previous))
+
+    if args.json:
+        meta = {
+            "commit": _commit(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "settings": {"REQUEST_METRICS": settings.REQUEST_METRICS, "DB_ASYNC": settings.DB_ASYNC,
+                         "STATELESS_AUTH": settings.STATELESS_AUTH, "DB_POOL_SIZE": settings.DB_POOL_SIZE},
+            "args": {key: value for key, value in vars(args).items() if key not in ("json", "compare")},
+        }
+        with open(args.json, "w") as f:
+            json.dump({"meta": meta, "scenarios": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# File: benchmarks/bench_waiting_room.py
+"""
+Simulate a registration launch with and without the waiting room
+
+Usage:
+    python -m benchmarks.bench_waiting_room --clients 50000 --admit-per-second 500
+
+Seeds --clients users and two free events, then, through the ASGI app:
+- without a waiting room, every client POSTs /registrations/ at once;
+- with one, every client joins the queue at once, polls the status
+  endpoint as told by Retry-After, and registers once admitted.
+
+The waiting room runs on a simulated clock advanced one second per
+tick, so a 100 s launch does not take 100 s of waiting; requests and
+database work are real. The table shows how many requests reached the
+registration path and how many SQL statements ran per second (wall
+seconds without the room, simulated seconds with it), the latency of
+the registration requests, and the polls and statements the queue
+itself cost.
+
+Registrations in flight are capped at --concurrency (default: the
+connection pool size plus overflow), as a worker's concurrency limit
+would; past that, requests only queue for a connection and the
+latencies measure the pool rather than the database.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime
+
+from benchmarks.common import print_table, summarize
+
+from sqlalchemy import event, func, insert, select
+
+from app import models
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.database import Base, engine
+from app.services.waiting_room_service import QUEUE_TOKEN_HEADER, waiting_room
+
+EMAIL_PREFIX = "launch.bench"
+
+_statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(*args) -> None:
+    global _statements
+    _statements += 1
+
+
+def seed(clients: int) -> tuple:
+    """Create the benchmark users and two fresh free events; return (user ids, event ids)"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        existing = connection.execute(
+            select(func.count(models.User.id)).where(models.User.email.like(f"{EMAIL_PREFIX}.%"))
+        ).scalar()
+        if existing < clients:
+            connection.execute(insert(models.User), [
+                {"email": f"{EMAIL_PREFIX}.{i}@alumni.example", "hashed_password": "!",
+                 "first_name": "Launch", "last_name": str(i), "is_admin": False, "token_version": 0}
+                for i in range(existing, clients)
+            ])
+        user_ids = connection.execute(
+            select(models.User.id).where(models.User.email.like(f"{EMAIL_PREFIX}.%"))
+            .order_by(models.User.id).limit(clients)
+        ).scalars().all()
+        event_ids = [
+            connection.execute(insert(models.Event).values(
+                title=f"Launch bench {mode}", description="", location="Main Hall",
+                event_date=datetime(2030, 6, 1), price=0.0, registered_count=0,
+            )).inserted_primary_key[0]
+            for mode in ("no room", "waiting room")
+        ]
+    return list(user_ids), event_ids
+
+
+def _peak(per_second: Counter) -> int:
+    return max(per_second.values(), default=0)
+
+
+async def no_waiting_room(client, limit: asyncio.Semaphore, tokens: dict, event_id: int) -> dict:
+    global _statements
+    completions, latencies = Counter(), []
+    statements_at = Counter()
+    start = time.perf_counter()
+    _statements = 0
+
+    async def register(user_id: int) -> None:
+        sent = time.perf_counter()
+        async with limit:
+            await client.post("/registrations/", json={"event_id": event_id, "payment_intent_id": "pi_bench"},
+                              headers={"Authorization": f"Bearer {tokens[user_id]}"})
+        done = time.perf_counter()
+        latencies.append(done - sent)
+        second = int(done - start)
+        completions[second] += 1
+        statements_at[second] = _statements
+
+    await asyncio.gather(*(register(user_id) for user_id in tokens))
+    # Statement counts were sampled cumulatively; turn them into per-second counts
+    per_second, previous = Counter(), 0
+    for second in sorted(statements_at):
+        per_second[second] = statements_at[second] - previous
+        previous = statements_at[second]
+    stats = summarize(latencies)
+    return {
+        "mode": "no waiting room", "clients": len(tokens), "seconds": round(time.perf_counter() - start, 1),
+        "registrations": len(latencies), "peak_reg_per_s": _peak(completions), "peak_sql_per_s": _peak(per_second),
+        "reg_p50_ms": stats["p50_ms"], "reg_p99_ms": stats["p99_ms"], "polls": 0, "queue_sql": 0,
+    }
+
+
+async def with_waiting_room(client, limit: asyncio.Semaphore, tokens: dict, event_id: int,
+                            rate: float, burst: int) -> dict:
+    global _statements
+    now = [time.time()]
+    waiting_room.clock = lambda: now[0]
+    waiting_room.open(event_id, rate, burst)
+
+    headers = {user_id: {"Authorization": f"Bearer {token}"} for user_id, token in tokens.items()}
+    tickets, next_poll, polls, queue_sql = {}, {}, 0, 0
+    registrations, sql_per_tick, latencies = Counter(), Counter(), []
+
+    async def join(user_id: int) -> None:
+        response = await client.post(f"/events/{event_id}/waiting-room/join", headers=headers[user_id])
+        body = response.json()
+        tickets[user_id] = body["token"]
+        next_poll[user_id] = 0 if body["admitted"] else body["retry_after"]
+
+    async def poll(user_id: int) -> dict:
+        response = await client.get(f"/events/{event_id}/waiting-room/status",
+                                    headers={QUEUE_TOKEN_HEADER: tickets[user_id]})
+        return response.json()
+
+    async def register(user_id: int) -> None:
+        sent = time.perf_counter()
+        async with limit:
+            await client.post("/registrations/", json={"event_id": event_id, "payment_intent_id": "pi_bench"},
+                              headers={**headers[user_id], QUEUE_TOKEN_HEADER: tickets[user_id]})
+        latencies.append(time.perf_counter() - sent)
+
+    _statements = 0
+    await asyncio.gather(*(join(user_id) for user_id in tokens))
+    queue_sql += _statements
+
+    tick = 0
+    while next_poll:
+        due = [user_id for user_id, at in next_poll.items() if at <= tick]
+        _statements = 0
+        statuses = await asyncio.gather(*(poll(user_id) for user_id in due))
+        polls += len(due)
+        queue_sql += _statements
+        admitted = []
+        for user_id, body in zip(due, statuses):
+            if body["admitted"]:
+                admitted.append(user_id)
+                del next_poll[user_id]
+            else:
+                next_poll[user_id] = tick + body["retry_after"]
+        _statements = 0
+        await asyncio.gather(*(register(user_id) for user_id in admitted))
+        registrations[tick] = len(admitted)
+        sql_per_tick[tick] = _statements
+        tick += 1
+        now[0] += 1.0
+
+    waiting_room.close(event_id)
+    stats = summarize(latencies)
+    return {
+        "mode": f"waiting room {rate:g}/s", "clients": len(tokens), "seconds": tick,
+        "registrations": len(latencies), "peak_reg_per_s": _peak(registrations), "peak_sql_per_s": _peak(sql_per_tick),
+        "reg_p50_ms": stats["p50_ms"], "reg_p99_ms": stats["p99_ms"], "polls": polls, "queue_sql": queue_sql,
+    }
+
+
+async def _run(args, user_ids: list, event_ids: list) -> list:
+    import httpx
+
+    from app.main import app
+
+    # Queue joins authenticate from token claims, as in production with STATELESS_AUTH
+    settings.STATELESS_AUTH = True
+    tokens = {user_id: create_access_token(user_id, claims={"adm": False, "ver": 0}) for user_id in user_ids}
+    baseline_tokens = dict(list(tokens.items())[:args.baseline_clients or len(tokens)])
+
+    limit = asyncio.Semaphore(args.concurrency or settings.DB_POOL_SIZE + max(settings.DB_MAX_OVERFLOW, 0))
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        if args.baseline_clients != 0:
+            rows.append(await no_waiting_room(client, limit, baseline_tokens, event_ids[0]))
+        rows.append(await with_waiting_room(client, limit, tokens, event_ids[1], args.admit_per_second, args.burst))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50000)
+    parser.add_argument("--admit-per-second", type=float, default=500.0)
+    parser.add_argument("--burst", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Registrations in flight at once (default: pool size plus overflow)")
+    parser.add_argument("--baseline-clients", type=int, default=None,
+                        help="Clients in the no-waiting-room run (default: --clients, 0 skips it)")
+    args = parser.parse_args()
+
+    user_ids, event_ids = seed(args.clients)
+    print_table(asyncio.run(_run(args, user_ids, event_ids)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# File: benchmarks/bench_waitlist.py
+"""
+Measure waitlist polling cost and promotion throughput
+
+Usage:
+    python -m benchmarks.bench_waitlist --waiting 20000 --cancellations 500
+
+Fills a --cancellations seat event and puts --waiting users on its
+waitlist, then through the ASGI app:
+- compares what a waitlisted user polls: the event itself (what clients
+  polled for a free seat before) against /events/{id}/waitlist/me, by
+  latency, SQL statements and response size per call;
+- cancels every registration and times the promotion worker offering
+  the freed seats down the line.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+
+from benchmarks.common import print_table, summarize, timed
+
+# Promotion is driven by hand below instead of by the background worker
+os.environ["WAITLIST_WORKERS"] = "0"
+
+from sqlalchemy import event, func, insert, select
+
+from app import models
+from app.core.cache import NullCache, set_response_cache
+from app.core.security import create_access_token
+from app.database import Base, engine
+from app.services.waitlist_service import WAITING, drain
+
+EMAIL_PREFIX = "waitlist.bench"
+
+_statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(*args) -> None:
+    global _statements
+    _statements += 1
+
+
+def seed(waiting: int, seats: int) -> tuple:
+    """Create a full event with a waitlist; return (event id, registered user ids, waitlisted user ids)"""
+    Base.metadata.create_all(bind=engine)
+    users = waiting + seats
+    with engine.begin() as connection:
+        existing = connection.execute(
+            select(func.count(models.User.id)).where(models.User.email.like(f"{EMAIL_PREFIX}.%"))
+        ).scalar()
+        if existing < users:
+            connection.execute(insert(models.User), [
+                {"email": f"{EMAIL_PREFIX}.{i}@alumni.example", "hashed_password": "!",
+                 "first_name": "Waitlist", "last_name": str(i), "is_admin": False, "token_version": 0}
+                for i in range(existing, users)
+            ])
+        user_ids = connection.execute(
+            select(models.User.id).where(models.User.email.like(f"{EMAIL_PREFIX}.%"))
+            .order_by(models.User.id).limit(users)
+        ).scalars().all()
+        registered, waitlisted = user_ids[:seats], user_ids[seats:]
+
+        event_id = connection.execute(insert(models.Event).values(
+            title="Waitlist bench", description="", location="Main Hall", event_date=datetime(2030, 6, 1),
+            price=0.0, capacity=seats, registered_count=seats, waitlist_issued=len(waitlisted),
+        )).inserted_primary_key[0]
+        connection.execute(insert(models.Registration), [
+            {"user_id": user_id, "event_id": event_id, "payment_status": "paid", "amount_paid": 0.0}
+            for user_id in registered
+        ])
+        connection.execute(insert(models.WaitlistEntry), [
+            {"event_id": event_id, "user_id": user_id, "position": position, "status": WAITING}
+            for position, user_id in enumerate(waitlisted, start=1)
+        ])
+    return event_id, list(registered), list(waitlisted)
+
+
+async def _poll(client, path: str, label: str, tokens: list, requests: int) -> dict:
+    global _statements
+    latencies, sizes = [], 0
+    _statements = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(path, headers={"Authorization": f"Bearer {random.choice(tokens)}"})
+        latencies.append(time.perf_counter() - start)
+        sizes += len(response.content)
+    stats = summarize(latencies)
+    return {"poll": label, "requests": requests, "p50_ms": stats["p50_ms"], "p99_ms": stats["p99_ms"],
+            "sql_per_call": round(_statements / requests, 2), "bytes_per_call": sizes // requests}
+
+
+async def _cancel(client, event_id: int, tokens: list) -> float:
+    with timed() as elapsed:
+        for token in tokens:
+            await client.delete(f"/registrations/{event_id}", headers={"Authorization": f"Bearer {token}"})
+    return elapsed["elapsed"]
+
+
+async def _run(args) -> None:
+    import httpx
+
+    from app.main import app
+
+    event_id, registered, waitlisted = seed(args.waiting, args.cancellations)
+    tokens = [create_access_token(user_id) for user_id in waitlisted]
+    random.seed(0)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print_table([
+            await _poll(client, f"/events/{event_id}", "GET /events/{id}", tokens, args.requests),
+            await _poll(client, f"/events/{event_id}/waitlist/me", "GET /events/{id}/waitlist/me",
+                        tokens, args.requests),
+        ])
+        print()
+
+        cancel_seconds = await _cancel(client, event_id, [create_access_token(user_id) for user_id in registered])
+        with timed() as promotion:
+            changed = drain()
+        with engine.connect() as connection:
+            offered_through = connection.execute(
+                select(models.Event.waitlist_offered_through).where(models.Event.id == event_id)
+            ).scalar()
+
+    print_table([{
+        "cancellations": len(registered),
+        "cancel_ms_each": cancel_seconds * 1000 / len(registered),
+        "offers": changed,
+        "promotion_ms": promotion["elapsed"] * 1000,
+        "offered_through": offered_through,
+    }])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--waiting", type=int, default=20000)
+    parser.add_argument("--cancellations", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Measure the database work of the event read, not the response cache
+    set_response_cache(NullCache())
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
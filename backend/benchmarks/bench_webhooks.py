@@ -0,0 +1,161 @@
+# File: benchmarks/bench_webhooks.py
+"""
+Measure webhook ingestion and outbox processing throughput under a delivery burst
+
+Usage:
+    python -m benchmarks.bench_webhooks --events 5000 --duplicate-rate 0.2 --workers 2
+
+Builds signed payment_intent.succeeded deliveries (membership purchases
+for seeded users), with a share of them redelivered the way Stripe
+retries do, and POSTs them concurrently to /payments/webhook. The
+background worker is disabled during the burst; afterwards the outbox is
+drained by --workers threads and the created memberships are counted to
+confirm that every event was applied exactly once.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import print_table, summarize
+
+os.environ.setdefault("STRIPE_WEBHOOK_SECRET", "whsec_benchmark")
+os.environ["WEBHOOK_WORKERS"] = "0"
+
+from benchmarks.bench_search import seed  # noqa: E402
+
+from app import models  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.services.webhook_service import drain  # noqa: E402
+
+
+def build_deliveries(count: int, duplicate_rate: float, user_ids: list, run_id: str) -> list:
+    """Signed (payload, header) pairs, including redeliveries, shuffled"""
+    rng = random.Random(7)
+    deliveries = []
+    for i in range(count):
+        payload = json.dumps({
+            "id": f"evt_{run_id}_{i}",
+            "object": "event",
+            "type": "payment_intent.succeeded",
+            "data": {"object": {
+                "id": f"pi_{run_id}_{i}",
+                "object": "payment_intent",
+                "amount": 5000,
+                "metadata": {
+                    "user_id": str(user_ids[i % len(user_ids)]),
+                    "type": "membership",
+                    "membership_type": "annual",
+                },
+            }},
+        }).encode()
+        timestamp = int(time.time())
+        signature = hmac.new(
+            settings.STRIPE_WEBHOOK_SECRET.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+        ).hexdigest()
+        delivery = (payload, f"t={timestamp},v1={signature}")
+        deliveries.append(delivery)
+        if rng.random() < duplicate_rate:
+            deliveries.append(delivery)
+    rng.shuffle(deliveries)
+    return deliveries
+
+
+async def ingest(deliveries: list, concurrency: int) -> dict:
+    import httpx
+
+    from app.main import app
+
+    latencies, errors = [], 0
+    queue = list(deliveries)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def client_loop():
+            nonlocal errors
+            while queue:
+                payload, header = queue.pop()
+                start = time.perf_counter()
+                response = await client.post(
+                    "/payments/webhook", content=payload,
+                    headers={"stripe-signature": header, "content-type": "application/json"},
+                )
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    stats = summarize(latencies)
+    return {
+        "phase": "ingest",
+        "items": stats["count"],
+        "errors": errors,
+        "per_s": stats["count"] / elapsed,
+        "seconds": elapsed,
+        "p50_ms": stats["p50_ms"],
+        "p99_ms": stats["p99_ms"],
+    }
+
+
+def process(workers: int, batch_size: int) -> dict:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        processed = sum(pool.map(lambda _: drain(batch_size), range(workers)))
+    elapsed = time.perf_counter() - start
+    return {
+        "phase": "process",
+        "items": processed,
+        "errors": 0,
+        "per_s": processed / elapsed if elapsed else 0.0,
+        "seconds": elapsed,
+        "p50_ms": None,
+        "p99_ms": None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=settings.WEBHOOK_BATCH_SIZE)
+    args = parser.parse_args()
+
+    seed(1000)
+    db = SessionLocal()
+    try:
+        user_ids = [row.id for row in db.query(models.User.id).limit(1000)]
+    finally:
+        db.close()
+
+    run_id = uuid.uuid4().hex[:8]
+    deliveries = build_deliveries(args.events, args.duplicate_rate, user_ids, run_id)
+    rows = [asyncio.run(ingest(deliveries, args.concurrency))]
+    rows.append(process(args.workers, args.batch_size))
+    print_table(rows)
+
+    db = SessionLocal()
+    try:
+        created = (
+            db.query(models.Membership)
+            .filter(models.Membership.payment_id.like(f"pi_{run_id}_%"))
+            .count()
+        )
+    finally:
+        db.close()
+    print(f"{len(deliveries)} deliveries of {args.events} events -> {created} memberships created")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# File: benchmarks/common.py
+"""
+Shared helpers for the backend benchmarks
+
+Benchmarks are run from the backend directory, e.g.:
+    python -m benchmarks.bench_hashing
+
+Settings that the app requires are given throwaway defaults here so a
+benchmark can run without a .env file. Import this module before any
+app module.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+# Benchmarks build their tables with create_all rather than migrations
+os.environ.setdefault("SCHEMA_CHECK", "off")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) of samples using nearest rank"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) as milliseconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+@contextmanager
+def timed() -> Iterator[Dict[str, float]]:
+    """Measure wall time of a block; the yielded dict gets an 'elapsed' key"""
+    result: Dict[str, float] = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["elapsed"] = time.perf_counter() - start
+
+
+def print_table(rows: List[Dict[str, object]]) -> None:
+    """Print a list of dicts as an aligned text table"""
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    cells = [[_format(row.get(c)) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def _format(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
@@ -0,0 +1,331 @@
+# File: benchmarks/dataset.py
+"""
+Generate a synthetic alumni dataset at a given scale
+
+Usage:
+    python -m benchmarks.dataset --tier 100k [--seed 42] [--reset]
+    python -m benchmarks.dataset --users 250000 --events 3000
+
+Tiers are 10k, 100k and 1m alumni, with one event per 100 alumni. The
+same seed always produces the same rows:
+- users with names, majors, companies and locations, whose passwords
+  come from a small pool hashed once (user i has password
+  "alumni-<i % --password-pool>"), so seeding never waits on bcrypt
+  per row;
+- events over five years back and one ahead, with Zipf-skewed
+  popularity: a few events draw most registrations, and some sell out;
+- registrations (about 60% of users, a handful each) with
+  registered_count and capacity consistent with them;
+- membership histories (about 40% of users, renewing monthly, annual or
+  lifetime terms), with the daily rollup rebuilt afterwards.
+
+Rows are written with COPY on Postgres and batched executemany
+elsewhere. The tables must be empty; --reset clears them first.
+"""
+import argparse
+import bisect
+import csv
+import io
+import math
+import random
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Iterator, List, Sequence
+
+from benchmarks.common import print_table, timed
+from benchmarks.bench_search import COMPANIES, FIRST_NAMES, LAST_NAMES, LOCATIONS, MAJORS
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.engine import Connection
+
+from app import models
+from app.core.security import get_password_hash
+from app.database import Base, SessionLocal, engine
+
+TIERS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Today is fixed so a seed gives the same dataset whatever day it runs
+TODAY = date(2026, 1, 1)
+
+EVENT_KINDS = ["Reunion", "Networking Night", "Career Panel", "Gala Dinner", "Guest Lecture",
+               "Homecoming", "Workshop", "Mentoring Breakfast", "Sports Day", "Webinar"]
+PRICES = [0.0, 0.0, 10.0, 25.0, 50.0, 100.0]
+MEMBERSHIP_TERMS = {"monthly": (30, 10.0), "annual": (365, 100.0), "lifetime": (99 * 365, 1000.0)}
+
+# Tables written, in dependency order
+TABLES = [models.User, models.Event, models.Registration, models.Membership]
+
+
+def _events_for(users: int) -> int:
+    return max(50, users // 100)
+
+
+class Copier:
+    """Bulk writer: COPY on Postgres (psycopg2), executemany batches elsewhere"""
+
+    def __init__(self, connection: Connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.copy = connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+
+    def write(self, model, rows: Iterator[Dict]) -> int:
+        written, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                written += self._flush(model, batch)
+                batch = []
+        if batch:
+            written += self._flush(model, batch)
+        return written
+
+    def _flush(self, model, rows: List[Dict]) -> int:
+        if not self.copy:
+            self.connection.execute(insert(model), rows)
+            return len(rows)
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # Unquoted empty fields are NULL in COPY's csv format
+            writer.writerow(["" if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        cursor = self.connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+        return len(rows)
+
+
+def password_pool(size: int) -> List[str]:
+    """bcrypt hashes of alumni-0 .. alumni-<size - 1>"""
+    return [get_password_hash(f"alumni-{k}") for k in range(size)]
+
+
+def users(count: int, seed: int, hashes: Sequence[str]) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "id": i + 1,
+            "email": f"{first.lower()}.{last.lower()}.{i}@alumni.example",
+            "hashed_password": hashes[i % len(hashes)],
+            "first_name": first,
+            "last_name": last,
+            "graduation_year": rng.randint(1970, 2025),
+            "major": rng.choice(MAJORS),
+            "company": rng.choice(COMPANIES),
+            "location": rng.choice(LOCATIONS),
+            "is_admin": False,
+            "token_version": 0,
+        }
+
+
+def registration_pairs(users_count: int, events_count: int, seed: int) -> Iterator[tuple]:
+    """
+    (user id, event id) of every registration, in user order
+
+    Event popularity follows a Zipf law over a shuffled event order, so
+    the most popular events are spread over the calendar. The stream is
+    regenerated from the seed, so it can be walked twice without being
+    held in memory.
+    """
+    rng = random.Random(seed + 1)
+    ranked = list(range(1, events_count + 1))
+    rng.shuffle(ranked)
+    cumulative = list(accumulate(1 / (rank + 1) ** 1.1 for rank in range(events_count)))
+    total = cumulative[-1]
+    for user_id in range(1, users_count + 1):
+        if rng.random() >= 0.6:
+            continue
+        wanted = min(events_count // 2, 1 + int(rng.expovariate(1 / 2.5)))
+        chosen = set()
+        while len(chosen) < wanted:
+            chosen.add(ranked[bisect.bisect_left(cumulative, rng.random() * total)])
+        for event_id in sorted(chosen):
+            yield user_id, event_id
+
+
+def events(count: int, seed: int, popularity: Dict[int, int]) -> Iterator[Dict]:
+    rng = random.Random(seed + 2)
+    start = datetime.combine(TODAY, datetime.min.time()) - timedelta(days=5 * 365)
+    for event_id in range(1, count + 1):
+        taken = popularity.get(event_id, 0)
+        roll = rng.random()
+        if roll < 0.2:
+            capacity = None
+        elif roll < 0.3:
+            # Sold out
+            capacity = max(taken, 1)
+        else:
+            capacity = max(20, math.ceil(taken * rng.uniform(1.05, 1.6)))
+        kind = rng.choice(EVENT_KINDS)
+        yield {
+            "id": event_id,
+            "title": f"{kind} #{event_id}",
+            "description": f"{kind} for alumni of all years. " * 3,
+            "event_date": start + timedelta(days=rng.randint(0, 6 * 365), hours=rng.choice([9, 12, 18, 19])),
+            "location": rng.choice([loc for loc in LOCATIONS if loc]),
+            "price": rng.choice(PRICES),
+            "capacity": capacity,
+            "is_members_only": rng.random() < 0.25,
+            "registered_count": taken,
+        }
+
+
+def registrations(users_count: int, events_count: int, seed: int, event_rows: Dict[int, tuple]) -> Iterator[Dict]:
+    rng = random.Random(seed + 3)
+    now = datetime.combine(TODAY, datetime.min.time())
+    for i, (user_id, event_id) in enumerate(registration_pairs(users_count, events_count, seed), start=1):
+        event_date, price = event_rows[event_id]
+        yield {
+            "id": i,
+            "user_id": user_id,
+            "event_id": event_id,
+            "payment_status": "paid",
+            "payment_intent_id": f"pi_gen_{i}" if price else None,
+            "amount_paid": price,
+            "registered_at": event_date - timedelta(days=rng.randint(1, 90)),
+            "attended": event_date < now and rng.random() < 0.7,
+        }
+
+
+def memberships(users_count: int, seed: int) -> Iterator[Dict]:
+    rng = random.Random(seed + 4)
+    membership_id = 0
+    for user_id in range(1, users_count + 1):
+        if rng.random() >= 0.4:
+            continue
+        start = TODAY - timedelta(days=rng.randint(0, 10 * 365))
+        renewals = 1 + int(rng.expovariate(1 / 1.5))
+        for term in range(renewals):
+            membership_type = rng.choices(["monthly", "annual", "lifetime"], weights=[5, 12, 1])[0]
+            days, price = MEMBERSHIP_TERMS[membership_type]
+            end = start + timedelta(days=days)
+            last = term == renewals - 1 or membership_type == "lifetime"
+            membership_id += 1
+            yield {
+                "id": membership_id,
+                "user_id": user_id,
+                "start_date": start,
+                "end_date": end,
+                "membership_type": membership_type,
+                "payment_id": f"pi_member_{membership_id}",
+                "amount_paid": price,
+                "is_active": last and end >= TODAY,
+            }
+            if last:
+                break
+            start = end
+
+
+def _reset_sequences(connection: Connection) -> None:
+    # Rows carry explicit ids; move the serial sequences past them
+    for model in TABLES:
+        table = model.__tablename__
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 1)) FROM {table}"
+        ))
+
+
+def generate(users_count: int, events_count: int, seed: int, pool_size: int, batch_size: int) -> List[Dict]:
+    """Write the whole dataset in one transaction; return a row count and time per table"""
+    report = []
+    with timed() as elapsed:
+        hashes = password_pool(pool_size)
+    report.append({"step": "password pool", "rows": pool_size, "seconds": elapsed["elapsed"]})
+
+    with timed() as elapsed:
+        popularity: Dict[int, int] = {}
+        for _, event_id in registration_pairs(users_count, events_count, seed):
+            popularity[event_id] = popularity.get(event_id, 0) + 1
+    report.append({"step": "event popularity", "rows": sum(popularity.values()), "seconds": elapsed["elapsed"]})
+
+    with engine.begin() as connection:
+        copier = Copier(connection, batch_size)
+        with timed() as elapsed:
+            written = copier.write(models.User, users(users_count, seed, hashes))
+        report.append({"step": "users", "rows": written, "seconds": elapsed["elapsed"]})
+
+        event_rows: Dict[int, tuple] = {}
+
+        def tracked_events() -> Iterator[Dict]:
+            for row in events(events_count, seed, popularity):
+                event_rows[row["id"]] = (row["event_date"], row["price"])
+                yield row
+
+        with timed() as elapsed:
+            written = copier.write(models.Event, tracked_events())
+        report.append({"step": "events", "rows": written, "seconds": elapsed["elapsed"]})
+
+        with timed() as elapsed:
+            written = copier.write(models.Registration, registrations(users_count, events_count, seed, event_rows))
+        report.append({"step": "registrations", "rows": written, "seconds": elapsed["elapsed"]})
+
+        with timed() as elapsed:
+            written = copier.write(models.Membership, memberships(users_count, seed))
+        report.append({"step": "memberships", "rows": written, "seconds": elapsed["elapsed"]})
+
+        if connection.dialect.name == "postgresql":
+            _reset_sequences(connection)
+            connection.execute(text(f"ANALYZE {', '.join(model.__tablename__ for model in TABLES)}"))
+
+    from app.services.membership_service import rebuild_membership_stats
+
+    db = SessionLocal()
+    try:
+        with timed() as elapsed:
+            written = rebuild_membership_stats(db)
+    finally:
+        db.close()
+    report.append({"step": "membership rollup", "rows": written, "seconds": elapsed["elapsed"]})
+    return report
+
+
+def _existing_rows(connection: Connection) -> Dict[str, int]:
+    counts = {
+        model.__tablename__: connection.execute(select(func.count()).select_from(model)).scalar()
+        for model in TABLES
+    }
+    return {table: count for table, count in counts.items() if count}
+
+
+def reset() -> None:
+    """Delete every row the generator writes, and the rows that depend on them"""
+    with engine.begin() as connection:
+        for model in [models.WaitlistEntry, models.WebhookEvent, models.MembershipDailyStat, *reversed(TABLES)]:
+            connection.execute(delete(model))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tier", choices=sorted(TIERS), default="10k")
+    parser.add_argument("--users", type=int, default=None, help="Alumni to generate (overrides --tier)")
+    parser.add_argument("--events", type=int, default=None, help="Events to generate (default: one per 100 alumni)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password-pool", type=int, default=16, help="Distinct passwords, each hashed once")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per executemany batch or COPY")
+    parser.add_argument("--reset", action="store_true", help="Delete existing rows first")
+    args = parser.parse_args()
+
+    users_count = args.users or TIERS[args.tier]
+    events_count = args.events or _events_for(users_count)
+
+    Base.metadata.create_all(bind=engine)
+    if args.reset:
+        reset()
+    with engine.connect() as connection:
+        existing = _existing_rows(connection)
+    if existing:
+        raise SystemExit(f"Tables are not empty ({existing}); pass --reset to replace their rows")
+
+    report = generate(users_count, events_count, args.seed, args.password_pool, args.batch_size)
+    print_table(report)
+    print(f"Passwords: <name>.<i>@alumni.example signs in with alumni-<i % {args.password_pool}>")
+
+
+if __name__ == "__main__":
+    main()
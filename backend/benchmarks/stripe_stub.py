@@ -0,0 +1,98 @@
+# File: benchmarks/stripe_stub.py
+"""
+Minimal local stand-in for the Stripe API
+
+Usage:
+    python -m benchmarks.stripe_stub --port 12111 --delay-ms 150 --fail-rate 0.1
+
+Answers POST /v1/payment_intents with a fake PaymentIntent after an
+artificial delay, and fails a fraction of requests with a 500 so retries
+can be exercised. Point the app at it with STRIPE_API_BASE.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qsl
+
+
+class StripeStubHandler(BaseHTTPRequestHandler):
+    # Keep connections open so clients can reuse them
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+    fail_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: dict) -> None:
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.send_header("Request-Id", f"req_{uuid.uuid4().hex[:14]}")
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = dict(parse_qsl(self.rfile.read(length).decode()))
+        time.sleep(self.delay)
+
+        if self.path != "/v1/payment_intents":
+            self._reply(404, {"error": {"type": "invalid_request_error", "message": "Unrecognized request URL"}})
+            return
+        if random.random() < self.fail_rate:
+            self._reply(500, {"error": {"type": "api_error", "message": "Stub failure"}})
+            return
+
+        intent_id = f"pi_{uuid.uuid4().hex[:24]}"
+        self._reply(200, {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": int(form.get("amount", 0)),
+            "currency": form.get("currency", "usd"),
+            "client_secret": f"{intent_id}_secret_{uuid.uuid4().hex[:24]}",
+            "metadata": {k[len("metadata["):-1]: v for k, v in form.items() if k.startswith("metadata[")},
+            "status": "requires_payment_method",
+        })
+
+
+def start_stub(port: int = 0, delay: float = 0.0, fail_rate: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Serve the stub from a background thread
+
+    Returns:
+        (server, base_url) - call server.shutdown() to stop it
+    """
+    handler = type("ConfiguredStripeStubHandler", (StripeStubHandler,), {
+        "delay": delay,
+        "fail_rate": fail_rate,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub(args.port, args.delay_ms / 1000, args.fail_rate)
+    print(f"Stripe stub listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# File: tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time: point the app at a scratch SQLite database
+# (or TEST_DATABASE_URL, e.g. an empty Postgres database) before importing it
+_scratch = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = os.environ.get(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(_scratch.name, 'test.db')}"
+)
+os.environ.setdefault("SECRET_KEY", "test")
+
+
+@pytest.fixture(scope="session")
+def migrated_engine():
+    """Engine for the test database, upgraded to the latest migration"""
+    from alembic import command
+    from alembic.config import Config
+
+    from app.database import engine
+
+    command.upgrade(Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini")), "head")
+    yield engine
+    engine.dispose()
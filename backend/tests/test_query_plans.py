@@ -0,0 +1,20 @@
+# File: tests/test_query_plans.py
+import pytest
+
+from app.core.query_plans import HOT_QUERIES, check_query_plans
+
+
+@pytest.fixture(scope="module")
+def plan_checks(migrated_engine):
+    with migrated_engine.begin() as connection:
+        return {check.name: check for check in check_query_plans(connection)}
+
+
+def test_every_hot_query_is_checked(plan_checks):
+    assert set(plan_checks) == set(HOT_QUERIES)
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_its_index(plan_checks, name):
+    check = plan_checks[name]
+    assert check.ok, f"{name} does not use {check.index}:\n" + "\n".join(check.plan)